@@ -0,0 +1,9 @@
+"""Run the command-line interface: `python -m alanube --help`."""
+
+import sys
+
+from alanube.do.cli import main
+
+
+if __name__ == "__main__":
+    sys.exit(main())
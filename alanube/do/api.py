@@ -1,12 +1,26 @@
+from __future__ import annotations
+
+import copy
+import gzip
+import json
 import logging
-import requests
-from dataclasses import dataclass
+import time
+from dataclasses import dataclass, replace
 from datetime import date, datetime
 from decimal import Decimal
-from typing import Any, Dict, List, Optional
-
-from alanube.utils import build_url
-from .exceptions import handle_response_error
+from functools import cached_property
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, get_args, get_type_hints
+
+from alanube.utils import build_url, lazy_import
+from .credentials import Credential, CredentialProvider
+from .exceptions import UnexpectedResponseCodeError, handle_response_error
+from .metrics import Metrics
+from .models import Document, ReceivedDocument
+from .responses import validate_response
+from .singleflight import SingleFlight
+from .streaming import DocumentStream
+from .transports import RequestsTransport, Transport, make_transport
 from .validators import (
     validate_document_status,
     validate_environment,
@@ -27,74 +41,96 @@ from .types import (
 )
 
 
+if TYPE_CHECKING:
+    from .cache import CompanyCache, ReportCache
+    from .circuit import CircuitBreakers
+    from .hedging import HedgingPolicy
+
+requests = lazy_import("requests")
+
 logger = logging.getLogger(__package__)
 
 
 @dataclass(frozen=True)
 class APIConfig:
+    """
+    Connection settings and the endpoint URLs derived from them.
+
+    The config is immutable, so every endpoint URL is computed once on first
+    access and then served from the instance.
+    """
     token: str
     developer_mode: bool
     api_version: str = "v1"
 
-    @property
+    @cached_property
+    def endpoints(self) -> MappingProxyType:
+        """Read-only registry of every endpoint URL, keyed by name without the `endpoint_` prefix."""
+        return MappingProxyType({
+            name[len("endpoint_"):]: getattr(self, name)
+            for name in dir(type(self))
+            if name.startswith("endpoint_")
+        })
+
+    @cached_property
     def base_url(self):
         if self.developer_mode:
             return 'https://sandbox.alanube.co/dom'
         return 'https://api.alanube.co/dom'
 
-    @property
+    @cached_property
     def api_url(self):
         return f"{self.base_url}/{self.api_version}"
 
-    @property
+    @cached_property
     def endpoint_company(self):  # 31
         return f"{self.api_url}/company"
 
-    @property
+    @cached_property
     def endpoint_fiscal_invoices(self):  # 31
         return f"{self.api_url}/fiscal-invoices"
 
-    @property
+    @cached_property
     def endpoint_invoices(self):  # 32
         return f"{self.api_url}/invoices"
 
-    @property
+    @cached_property
     def endpoint_debit_notes(self):  # 33
         return f"{self.api_url}/debit-notes"
 
-    @property
+    @cached_property
     def endpoint_credit_notes(self):  # 34
         return f"{self.api_url}/credit-notes"
 
-    @property
+    @cached_property
     def endpoint_purchases(self):  # 41
         return f"{self.api_url}/purchases"
 
-    @property
+    @cached_property
     def endpoint_minorexpenses(self):  # 43
         return f"{self.api_url}/minor-expenses"
 
-    @property
+    @cached_property
     def endpoint_special_regimes(self):  # 44
         return f"{self.api_url}/special-regimes"
 
-    @property
+    @cached_property
     def endpoint_gubernamentals(self):  # 45
         return f"{self.api_url}/gubernamentals"
 
-    @property
+    @cached_property
     def endpoint_export_supports(self):  # 46
         return f"{self.api_url}/export-supports"
 
-    @property
+    @cached_property
     def endpoint_payment_abroad_supports(self):  # 47
         return f"{self.api_url}/payment-abroad-supports"
 
-    @property
+    @cached_property
     def endpoint_cancellations(self):
         return f"{self.api_url}/cancellations"
 
-    @property
+    @cached_property
     def endpoint_received_documents(self):
         """
         Constructs the URL for the received documents endpoint.
@@ -108,7 +144,7 @@ class APIConfig:
         """
         return f"{self.api_url}/received-documents"
 
-    @property
+    @cached_property
     def endpoint_check_directory(self):
         """
         Constructs the URL for the 'check-directory' endpoint.
@@ -122,7 +158,7 @@ class APIConfig:
         """
         return f"{self.api_url}/check-directory"
 
-    @property
+    @cached_property
     def endpoint_check_dgii_status(self):
         """
         Constructs the URL for checking the DGII status.
@@ -139,112 +175,395 @@ class APIConfig:
         """
         return f"{self.api_url}/check-dgii-status"
 
-    @property
+    @cached_property
     def endpoint_reports_companies_documents_total(self):
         return f"{self.api_url}/reports/companies/{{idCompany}}/documents/total"
 
-    @property
+    @cached_property
     def endpoint_reports_users_documents_total(self):
         return f"{self.api_url}/reports/users/documents/total"
 
-    @property
+    @cached_property
     def endpoint_reports_companies_emitted_documents(self):
         return f"{self.api_url}/companies/{{id}}/emitted-documents"
 
-    @property
+    @cached_property
     def endpoint_reports_companies_emitted_documents_monthly(self):
         return f"{self.endpoint_reports_companies_emitted_documents}/monthly"
 
-    @property
+    @cached_property
     def endpoint_reports_companies_emitted_documents_15_days(self):
         return f"{self.endpoint_reports_companies_emitted_documents}/15-days"
 
-    @property
+    @cached_property
     def endpoint_reports_companies_accepted_documents(self):
         return f"{self.api_url}/companies/{{id}}/accepted-documents"
 
-    @property
+    @cached_property
     def endpoint_reports_companies_accepted_documents_monthly(self):
         return f"{self.endpoint_reports_companies_accepted_documents}/monthly"
 
-    @property
+    @cached_property
     def endpoint_reports_companies_accepted_documents_15_days(self):
         return f"{self.endpoint_reports_companies_accepted_documents}/15-days"
 
 
 class AlanubeAPI:
     config: APIConfig
+    report_cache: Optional[ReportCache] = None
+    company_cache: Optional[CompanyCache] = None
+    transport: Transport = RequestsTransport()
+    # `http2` of the last `connect`, to replace the transport only when it changes.
+    _http2: bool = False
+    metrics = Metrics()
+    # Request bodies of at least `compression_threshold` bytes are sent
+    # gzip-compressed (Content-Encoding: gzip) when enabled.
+    compress_requests: bool = False
+    compression_threshold: int = 16 * 1024
+    compression_level: int = 6
+    # Check responses against `alanube.do.types` (see `alanube.do.responses`).
+    validate_responses: bool = False
+    # Fail fast per endpoint family while the API is unhealthy (see `alanube.do.circuit`).
+    circuit_breakers: Optional[CircuitBreakers] = None
+    # Concurrent identical GETs (same URL, params and token) share one request;
+    # each caller gets its own copy of the response and of its parsed data.
+    coalesce_gets: bool = True
+    _single_flight = SingleFlight()
+    credentials: Optional[CredentialProvider] = None
+    # Hedged GETs with adaptive timeouts (see `alanube.do.hedging`).
+    hedging: Optional[HedgingPolicy] = None
 
     @classmethod
-    def connect(cls, token: str, developer_mode: bool = False, api_version: str = "v1"):
+    def connect(
+        cls,
+        token: Optional[str] = None,
+        developer_mode: bool = False,
+        api_version: str = "v1",
+        report_cache: Optional[ReportCache] = None,
+        company_cache: Optional[CompanyCache] = None,
+        http2: bool = False,
+        compress_requests: bool = False,
+        validate_responses: bool = False,
+        circuit_breakers: Optional[CircuitBreakers] = None,
+        credentials: Optional[CredentialProvider] = None,
+        hedging: Optional[HedgingPolicy] = None,
+        transport: Optional[Transport] = None,
+    ):
         """
         Connect to the Alanube API using the token, base_url and API version.
+
+        Instead of `token`, a `CredentialProvider` may be given in
+        `credentials` to rotate the token later without reconnecting (see
+        `rotate_token` and `alanube.do.credentials`).
+
+        If `report_cache` is given, report endpoints are served from it. If
+        `company_cache` is given, `get_company` is served from it. With
+        `http2=True` requests are multiplexed over HTTP/2 when `httpx[http2]`
+        is installed (see `alanube.do.transports`). With
+        `compress_requests=True` large request bodies are gzip-compressed.
+        With `validate_responses=True` document responses are validated and
+        coerced (see `alanube.do.responses`). If `circuit_breakers` is given,
+        calls to an unhealthy endpoint family fail fast with
+        `CircuitOpenError` (see `alanube.do.circuit`). If `hedging` is given,
+        slow GETs are hedged and get timeouts adapted to each endpoint (see
+        `alanube.do.hedging`).
+
+        The current transport (and its pooled connections) is kept unless
+        `http2` changes or a `transport` is given, so a transport installed by
+        hand (e.g. a `RecordingTransport`) survives reconnecting.
+        """
+        if credentials is None:
+            credentials = CredentialProvider(token)
+        cls.credentials = credentials
+        cls.config = APIConfig(credentials.token, developer_mode, api_version)
+        credentials.subscribe(cls._credential_rotated)
+        cls.report_cache = report_cache
+        cls.company_cache = company_cache
+        cls.compress_requests = compress_requests
+        cls.validate_responses = validate_responses
+        cls.circuit_breakers = circuit_breakers
+        if cls.hedging is not None and cls.hedging is not hedging:
+            cls.hedging.close()
+        cls.hedging = hedging
+        if transport is not None or http2 != cls._http2:
+            if transport is not cls.transport:
+                cls.transport.close()
+            cls.transport = transport if transport is not None else make_transport(http2)
+        cls._http2 = http2
+
+    @classmethod
+    def rotate_token(cls, token: str):
         """
-        cls.config = APIConfig(token, developer_mode, api_version)
+        Replace the API token. Requests in flight keep the previous token and
+        the transport, with its pooled connections, is kept.
+        """
+        if cls.credentials is None:
+            raise RuntimeError("API not connected. Call AlanubeAPI.connect first.")
+        return cls.credentials.rotate(token)
+
+    @classmethod
+    def _credential_rotated(cls, credential: Credential):
+        # Only the token changes, the cached endpoint URLs stay valid, but a
+        # new config keeps `config.token` current. A provider replaced by a
+        # later `connect` no longer updates the config.
+        if credential.token != cls.config.token and cls.credentials is not None \
+                and cls.credentials.current is credential:
+            cls.config = replace(cls.config, token=credential.token)
 
     @staticmethod
     def get_headers():
-        if AlanubeAPI.config is None:
+        """Return the headers of the current credential, as a new dict."""
+        if AlanubeAPI.credentials is None:
             raise RuntimeError("API not connected. Call AlanubeAPI.connect first.")
-        return {
-            "Authorization": f"Bearer {AlanubeAPI.config.token}",
-            "Content-Type": "application/json",
-            "Accept": "application/json",
-        }
+        return dict(AlanubeAPI.credentials.current.headers)
 
     @staticmethod
-    def request(endpoint, method='GET', params=None, data=None, expected_response_code=None):
-        headers = AlanubeAPI.get_headers()
+    def request(
+        endpoint,
+        method='GET',
+        params=None,
+        data=None,
+        expected_response_code=None,
+        headers=None,
+        body=None,
+        stream=False,
+        timeout=None,
+    ):
+        """
+        Send a request through the configured transport.
+
+        `data` is sent as JSON. `body` is sent as is (already encoded bytes),
+        in which case the matching headers (e.g. `Content-Encoding`) must be
+        given in `headers`. With `stream` the body is not downloaded upfront.
+        `timeout` overrides the timeout of the transport, in seconds.
+        """
+        headers = {**AlanubeAPI.get_headers(), **headers} if headers else AlanubeAPI.get_headers()
         logger.info(f"{method}: {endpoint} | Params: {params}")
         if data:
             logger.debug(f"Data: {data}")
-        response = requests.request(method, endpoint, headers=headers, params=params, json=data)
+        elif body:
+            logger.debug(f"Body: {len(body)} bytes")
+        response = AlanubeAPI.transport.request(
+            method,
+            endpoint,
+            headers=headers,
+            params=params,
+            json=data,
+            data=body,
+            stream=stream or None,
+            timeout=timeout,
+        )
         return response
 
     @staticmethod
-    def get(endpoint, params=None, expected_response_code=None):
-        response = AlanubeAPI.request(endpoint, "GET", params=params)
-        return AlanubeAPI.process_response(response, expected_response_code=expected_response_code)
+    def get(endpoint, params=None, expected_response_code=None, headers=None):
+        def send(timeout=None):
+            return AlanubeAPI.request(endpoint, "GET", params=params, headers=headers, timeout=timeout)
+
+        def fetch():
+            hedging = AlanubeAPI.hedging
+            return AlanubeAPI._call(
+                endpoint,
+                "GET",
+                send if hedging is None else lambda: hedging.call(endpoint, send),
+                expected_response_code,
+            )
+
+        if not AlanubeAPI.coalesce_gets:
+            return fetch()
+        if AlanubeAPI.credentials is None:
+            raise RuntimeError("API not connected. Call AlanubeAPI.connect first.")
+        key = (
+            endpoint,
+            tuple(sorted(params.items())) if params else None,
+            tuple(sorted(headers.items())) if headers else None,
+            AlanubeAPI.credentials.token,
+            expected_response_code,
+        )
+        return AlanubeAPI._single_flight.do(key, fetch, copy=AlanubeAPI._copy_response)
 
     @staticmethod
     def post(endpoint, params=None, data=None, expected_response_code=None):
-        data = AlanubeAPI.serialize(data)
-        response = AlanubeAPI.request(endpoint, "POST", params=params, data=data)
-        return AlanubeAPI.process_response(response, expected_response_code=expected_response_code)
+        return AlanubeAPI._call(
+            endpoint,
+            "POST",
+            lambda: AlanubeAPI._request_with_body(endpoint, "POST", params=params, data=data),
+            expected_response_code,
+        )
 
     @staticmethod
     def put(endpoint, params=None, data=None, expected_response_code=None):
-        data = AlanubeAPI.serialize(data)
-        response = AlanubeAPI.request(endpoint, "PUT", params=params, data=data)
-        return AlanubeAPI.process_response(response, expected_response_code=expected_response_code)
+        return AlanubeAPI._call(
+            endpoint,
+            "PUT",
+            lambda: AlanubeAPI._request_with_body(endpoint, "PUT", params=params, data=data),
+            expected_response_code,
+        )
 
     @staticmethod
     def patch(endpoint, params=None, data=None, expected_response_code=None):
+        return AlanubeAPI._call(
+            endpoint,
+            "PATCH",
+            lambda: AlanubeAPI._request_with_body(endpoint, "PATCH", params=params, data=data),
+            expected_response_code,
+        )
+
+    @staticmethod
+    def _request_with_body(endpoint, method, params=None, data=None):
+        """
+        Serialize `data` and send it, gzip-compressed when `compress_requests`
+        is enabled and the encoded body reaches `compression_threshold` bytes.
+        """
         data = AlanubeAPI.serialize(data)
-        response = AlanubeAPI.request(endpoint, "PATCH", params=params, data=data)
-        return AlanubeAPI.process_response(response, expected_response_code=expected_response_code)
+        if AlanubeAPI.compress_requests and data is not None:
+            body = AlanubeAPI.encode(data)
+            if len(body) >= AlanubeAPI.compression_threshold:
+                return AlanubeAPI._request_with_encoded_body(endpoint, method, body, params=params)
+        return AlanubeAPI.request(endpoint, method, params=params, data=data)
+
+    @staticmethod
+    def _request_with_encoded_body(endpoint, method, body: bytes, params=None):
+        if AlanubeAPI.compress_requests and len(body) >= AlanubeAPI.compression_threshold:
+            return AlanubeAPI.request(
+                endpoint,
+                method,
+                params=params,
+                body=AlanubeAPI._gzip(body),
+                headers={"Content-Encoding": "gzip"},
+            )
+        return AlanubeAPI.request(endpoint, method, params=params, body=body)
+
+    @staticmethod
+    def encode(data) -> bytes:
+        """Encode already serialized data as a compact UTF-8 JSON body."""
+        return json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+    @staticmethod
+    def post_raw(endpoint, body: bytes, params=None, expected_response_code=None):
+        """
+        POST an already JSON-encoded body (see `encode`), e.g. one prepared
+        in another process by `alanube.do.pipeline`.
+        """
+        return AlanubeAPI._call(
+            endpoint,
+            "POST",
+            lambda: AlanubeAPI._request_with_encoded_body(endpoint, "POST", body, params=params),
+            expected_response_code,
+        )
+
+    @staticmethod
+    def _gzip(body: bytes) -> bytes:
+        start = time.perf_counter()
+        compressed = gzip.compress(body, compresslevel=AlanubeAPI.compression_level, mtime=0)
+        metrics = AlanubeAPI.metrics
+        metrics.incr("request.compression.count")
+        metrics.incr("request.compression.bytes_saved", len(body) - len(compressed))
+        metrics.observe("request.compression.ratio", len(compressed) / len(body))
+        metrics.observe("request.compression.seconds", time.perf_counter() - start)
+        return compressed
+
+    @staticmethod
+    def _record_response_compression(response):
+        headers = getattr(response, "headers", None)
+        if not isinstance(headers, dict) and not hasattr(headers, "lower_items"):
+            return
+        encoding = headers.get("Content-Encoding")
+        length = headers.get("Content-Length")
+        if not encoding or not length or not str(length).isdigit():
+            return
+        metrics = AlanubeAPI.metrics
+        metrics.incr(f"response.compression.{encoding}")
+        content = response.content
+        if content:
+            metrics.observe("response.compression.ratio", int(length) / len(content))
 
     @staticmethod
     def delete(endpoint, params=None, expected_response_code=None):
-        response = AlanubeAPI.request(endpoint, "DELETE", params=params)
-        return AlanubeAPI.process_response(response, expected_response_code=expected_response_code)
+        return AlanubeAPI._call(
+            endpoint,
+            "DELETE",
+            lambda: AlanubeAPI.request(endpoint, "DELETE", params=params),
+            expected_response_code,
+        )
 
     @staticmethod
     def options(endpoint, expected_response_code=None):
-        response = AlanubeAPI.request(endpoint, "OPTIONS")
-        return AlanubeAPI.process_response(response, expected_response_code=expected_response_code)
+        return AlanubeAPI._call(
+            endpoint,
+            "OPTIONS",
+            lambda: AlanubeAPI.request(endpoint, "OPTIONS"),
+            expected_response_code,
+        )
+
+    @staticmethod
+    def _call(endpoint, method, send, expected_response_code=None):
+        """
+        Send a request with `send` and process its response, through the
+        circuit breaker of the endpoint family when `circuit_breakers` is set.
+        """
+        def call():
+            return AlanubeAPI.process_response(send(), expected_response_code=expected_response_code)
+
+        breakers = AlanubeAPI.circuit_breakers
+        if breakers is None:
+            return call()
+        return breakers.call(method, endpoint, call)
 
     @staticmethod
     def process_response(response: requests.Response, expected_response_code: Optional[int] = None):
+        AlanubeAPI._memoize_json(response)
+        AlanubeAPI._record_response_compression(response)
         handle_response_error(response, expected_response_code=expected_response_code)
         logger.info(f"Response: {response.status_code}")
         try:
             logger.debug(f"JSON: {response.json()}")
         except ValueError:
-            logger.error("Error parsing response as JSON")
+            if response.status_code != 304:  # Not Modified responses have no body
+                logger.error("Error parsing response as JSON")
             logger.debug(f"Text: {response.text}")
         return response
 
+    @staticmethod
+    def _memoize_json(response):
+        """
+        Make `response.json()` parse the body only once.
+
+        The body is otherwise decoded by the error handling, the debug log and
+        the calling method.
+        """
+        parse = response.json
+        parsed = []
+
+        def json(**kwargs):
+            if kwargs:
+                return parse(**kwargs)
+            if not parsed:
+                parsed.append(parse())
+            return parsed[0]
+
+        response.json = json
+
+    @staticmethod
+    def _copy_response(response):
+        """
+        Copy of a response shared by coalesced GETs, whose `json()` returns
+        a private deep copy of the shared parsed data.
+        """
+        shared = response.json
+        private = copy.copy(response)
+        parsed = []
+
+        def json(**kwargs):
+            if kwargs:
+                return shared(**kwargs)
+            if not parsed:
+                parsed.append(copy.deepcopy(shared()))
+            return parsed[0]
+
+        private.json = json
+        return private
+
     @classmethod
     def serialize(cls, value):
         if value is None:
@@ -262,6 +581,55 @@ class AlanubeAPI:
         else:
             return value
 
+    @classmethod
+    def decode(cls, response, response_type):
+        """
+        Return the JSON body of `response`, validated against `response_type`
+        when `validate_responses` is enabled.
+        """
+        data = response.json()
+        if not cls.validate_responses:
+            return data
+        return validate_response(data, response_type, response=response)
+
+    @classmethod
+    def _get_list(cls, url, response_type, model, parse=False, stream=False, fields=None):
+        """
+        Get a list page. With `stream` the documents are returned as a
+        `DocumentStream`; with `fields` they are projected on those keys.
+        """
+        if not stream and fields is None:
+            response = cls.get(url, expected_response_code=200)
+            data = cls.decode(response, response_type)
+            return cls._parse_list(data, model) if parse else data
+
+        item_type = get_args(get_type_hints(response_type)["documents"])[0]
+
+        def transform(document):
+            if cls.validate_responses:
+                document = validate_response(document, item_type, response=documents.response)
+            return model.from_dict(document) if parse else document
+
+        documents = cls.get_stream(url, fields=fields, transform=transform)
+        return documents if stream else documents.read()
+
+    @staticmethod
+    def get_stream(endpoint, params=None, fields=None, transform=None) -> DocumentStream:
+        """
+        GET a list endpoint and return its documents as a `DocumentStream`,
+        decoded from the response stream (see `alanube.do.streaming`).
+        """
+        def send():
+            response = AlanubeAPI.request(endpoint, "GET", params=params, stream=True)
+            if response.status_code != 200:
+                # Raises the matching error.
+                AlanubeAPI.process_response(response, expected_response_code=200)
+            return response
+
+        breakers = AlanubeAPI.circuit_breakers
+        response = send() if breakers is None else breakers.call("GET", endpoint, send)
+        return DocumentStream(response, fields=fields, transform=transform)
+
     @staticmethod
     def _validate_document_list_params(status=None, legal_status=None, limit: int = 25, page: int = 1):
         status = validate_document_status(status)
@@ -269,12 +637,45 @@ class AlanubeAPI:
         validate_pagination(limit, page)
         return status, legal_status
 
+    @staticmethod
+    def _parse_list(data, model):
+        """Replace the documents of a list response with `model` instances."""
+        if isinstance(data, dict) and data.get("documents"):
+            # A new dict is built since the response data may be shared with
+            # other callers (see `get`).
+            data = dict(data, documents=[model.from_dict(document) for document in data["documents"]])
+        return data
+
     @staticmethod
     def _validate_required_legal_status(legal_status):
         result = validate_legal_status(legal_status, required=True)
         assert result is not None  # logic guard for mypy type checker because of required=True
         return result
 
+    @classmethod
+    def _get_report(
+        cls,
+        url: str,
+        endpoint: str,
+        company_id: Optional[str] = None,
+        date_from: Optional[str] = None,
+        date_until: Optional[str] = None,
+        **extra,
+    ):
+        """
+        Fetch a report, going through `report_cache` when one is configured.
+
+        `endpoint` is the unformatted endpoint URL, used with the company and
+        date range to build the cache key.
+        """
+        def fetch():
+            response = cls.get(url, expected_response_code=200)
+            return response.json()
+
+        if cls.report_cache is None:
+            return fetch()
+        return cls.report_cache.get_or_fetch(fetch, endpoint, company_id, date_from, date_until, **extra)
+
     @classmethod
     def create_company(cls, payload: Dict) -> Dict[str, Any]:
         """
@@ -295,7 +696,16 @@ class AlanubeAPI:
         """
         url = cls.config.endpoint_company + (f"/{company_id}" if company_id else "")
         response = cls.patch(url, data=payload, expected_response_code=200)
-        return response.json()
+        data = response.json()
+        cache = cls.company_cache
+        if cache is not None:
+            if cache.refresh_on_update:
+                cache.store(company_id, data)
+            else:
+                cache.invalidate(company_id)
+            if isinstance(data, dict) and data.get("id") and data["id"] != company_id:
+                cache.invalidate(data["id"])
+        return data
 
     @classmethod
     def get_company(cls, company_id: Optional[str] = None) -> Dict[str, Any]:
@@ -303,8 +713,30 @@ class AlanubeAPI:
         Consultar la información de una empresa
         """
         url = cls.config.endpoint_company + (f"/{company_id}" if company_id else "")
-        response = cls.get(url, expected_response_code=200)
-        return response.json()
+        cache = cls.company_cache
+        if cache is None:
+            response = cls.get(url, expected_response_code=200)
+            return response.json()
+
+        entry, fresh = cache.lookup(company_id)
+        if entry is not None and fresh:
+            return entry["data"]
+
+        conditional_headers = cache.conditional_headers(entry)
+        if not conditional_headers:
+            response = cls.get(url, expected_response_code=200)
+        else:
+            response = cls.get(url, headers=conditional_headers)
+            if entry is not None and response.status_code == 304:
+                cache.refresh(company_id, entry)
+                return entry["data"]
+            if response.status_code != 200:
+                raise UnexpectedResponseCodeError(200, response.status_code, response=response)
+
+        data = response.json()
+        response_headers = getattr(response, "headers", None) or {}
+        cache.store(company_id, data, response_headers.get("ETag"), response_headers.get("Last-Modified"))
+        return data
 
     @classmethod
     def send_fiscal_invoice(cls, payload: Dict) -> DocumentResponse:
@@ -313,7 +745,7 @@ class AlanubeAPI:
         """
         url = cls.config.endpoint_fiscal_invoices
         response = cls.post(url, data=payload, expected_response_code=201)
-        return response.json()
+        return cls.decode(response, DocumentResponse)
 
     @classmethod
     def get_fiscal_invoice(cls, id_: str, company_id: Optional[str] = None) -> DocumentResponse:
@@ -322,7 +754,7 @@ class AlanubeAPI:
         """
         url = build_url(cls.config.endpoint_fiscal_invoices, company_id, id_)
         response = cls.get(url, expected_response_code=200)
-        return response.json()
+        return cls.decode(response, DocumentResponse)
 
     @classmethod
     def get_fiscal_invoices(
@@ -335,6 +767,9 @@ class AlanubeAPI:
         page: int = 1,
         start: Optional[int] = None,
         end: Optional[int] = None,
+        parse: bool = False,
+        stream: bool = False,
+        fields: Optional[Iterable[str]] = None,
     ) -> ListDocumentResponse:
         """
         Consultar las Facturas de Crédito Fiscal Electrónicas (31)
@@ -351,8 +786,7 @@ class AlanubeAPI:
             start=start,
             end=end,
         )
-        response = cls.get(url, expected_response_code=200)
-        return response.json()
+        return cls._get_list(url, ListDocumentResponse, Document, parse=parse, stream=stream, fields=fields)
 
     @classmethod
     def send_invoice(cls, payload: Dict) -> DocumentResponse:
@@ -361,7 +795,7 @@ class AlanubeAPI:
         """
         url = cls.config.endpoint_invoices
         response = cls.post(url, data=payload, expected_response_code=201)
-        return response.json()
+        return cls.decode(response, DocumentResponse)
 
     @classmethod
     def get_invoice(cls, id_: str, company_id: Optional[str] = None) -> DocumentResponse:
@@ -370,7 +804,7 @@ class AlanubeAPI:
         """
         url = build_url(cls.config.endpoint_invoices, company_id, id_)
         response = cls.get(url, expected_response_code=200)
-        return response.json()
+        return cls.decode(response, DocumentResponse)
 
     @classmethod
     def get_invoices(
@@ -383,6 +817,9 @@ class AlanubeAPI:
         page: int = 1,
         start: Optional[int] = None,
         end: Optional[int] = None,
+        parse: bool = False,
+        stream: bool = False,
+        fields: Optional[Iterable[str]] = None,
     ) -> ListDocumentResponse:
         """
         Consultar las Facturas de Consumo Electrónicas (32)
@@ -399,8 +836,7 @@ class AlanubeAPI:
             start=start,
             end=end,
         )
-        response = cls.get(url, expected_response_code=200)
-        return response.json()
+        return cls._get_list(url, ListDocumentResponse, Document, parse=parse, stream=stream, fields=fields)
 
     @classmethod
     def send_debit_note(cls, payload: Dict) -> DocumentResponse:
@@ -409,7 +845,7 @@ class AlanubeAPI:
         """
         url = cls.config.endpoint_debit_notes
         response = cls.post(url, data=payload, expected_response_code=201)
-        return response.json()
+        return cls.decode(response, DocumentResponse)
 
     @classmethod
     def get_debit_note(cls, id_: str, company_id: Optional[str] = None) -> DocumentResponse:
@@ -418,7 +854,7 @@ class AlanubeAPI:
         """
         url = build_url(cls.config.endpoint_debit_notes, company_id, id_)
         response = cls.get(url, expected_response_code=200)
-        return response.json()
+        return cls.decode(response, DocumentResponse)
 
     @classmethod
     def get_debit_notes(
@@ -431,6 +867,9 @@ class AlanubeAPI:
         page: int = 1,
         start: Optional[int] = None,
         end: Optional[int] = None,
+        parse: bool = False,
+        stream: bool = False,
+        fields: Optional[Iterable[str]] = None,
     ) -> ListDocumentResponse:
         """
         Consultar las Notas de Débito Electrónicas (33)
@@ -447,8 +886,7 @@ class AlanubeAPI:
             start=start,
             end=end,
         )
-        response = cls.get(url, expected_response_code=200)
-        return response.json()
+        return cls._get_list(url, ListDocumentResponse, Document, parse=parse, stream=stream, fields=fields)
 
     @classmethod
     def send_credit_note(cls, payload: Dict) -> DocumentResponse:
@@ -457,7 +895,7 @@ class AlanubeAPI:
         """
         url = cls.config.endpoint_credit_notes
         response = cls.post(url, data=payload, expected_response_code=201)
-        return response.json()
+        return cls.decode(response, DocumentResponse)
 
     @classmethod
     def get_credit_note(cls, id_: str, company_id: Optional[str] = None) -> DocumentResponse:
@@ -466,7 +904,7 @@ class AlanubeAPI:
         """
         url = build_url(cls.config.endpoint_credit_notes, company_id, id_)
         response = cls.get(url, expected_response_code=200)
-        return response.json()
+        return cls.decode(response, DocumentResponse)
 
     @classmethod
     def get_credit_notes(
@@ -479,6 +917,9 @@ class AlanubeAPI:
         page: int = 1,
         start: Optional[int] = None,
         end: Optional[int] = None,
+        parse: bool = False,
+        stream: bool = False,
+        fields: Optional[Iterable[str]] = None,
     ) -> ListDocumentResponse:
         """
         Consultar las Notas de Crédito Electrónicas (34)
@@ -495,8 +936,7 @@ class AlanubeAPI:
             start=start,
             end=end,
         )
-        response = cls.get(url, expected_response_code=200)
-        return response.json()
+        return cls._get_list(url, ListDocumentResponse, Document, parse=parse, stream=stream, fields=fields)
 
     @classmethod
     def send_purchase(cls, payload: Dict) -> DocumentResponse:
@@ -505,7 +945,7 @@ class AlanubeAPI:
         """
         url = cls.config.endpoint_purchases
         response = cls.post(url, data=payload, expected_response_code=201)
-        return response.json()
+        return cls.decode(response, DocumentResponse)
 
     @classmethod
     def get_purchase(cls, id_: str, company_id: Optional[str] = None) -> DocumentResponse:
@@ -514,7 +954,7 @@ class AlanubeAPI:
         """
         url = build_url(cls.config.endpoint_purchases, company_id, id_)
         response = cls.get(url, expected_response_code=200)
-        return response.json()
+        return cls.decode(response, DocumentResponse)
 
     @classmethod
     def get_purchases(
@@ -527,6 +967,9 @@ class AlanubeAPI:
         page: int = 1,
         start: Optional[int] = None,
         end: Optional[int] = None,
+        parse: bool = False,
+        stream: bool = False,
+        fields: Optional[Iterable[str]] = None,
     ) -> ListDocumentResponse:
         """
         Consultar los documentos de Compra Electrónicos (41)
@@ -543,8 +986,7 @@ class AlanubeAPI:
             start=start,
             end=end,
         )
-        response = cls.get(url, expected_response_code=200)
-        return response.json()
+        return cls._get_list(url, ListDocumentResponse, Document, parse=parse, stream=stream, fields=fields)
 
     @classmethod
     def send_minor_expense(cls, payload: Dict) -> DocumentResponse:
@@ -553,7 +995,7 @@ class AlanubeAPI:
         """
         url = cls.config.endpoint_minorexpenses
         response = cls.post(url, data=payload, expected_response_code=201)
-        return response.json()
+        return cls.decode(response, DocumentResponse)
 
     @classmethod
     def get_minor_expense(cls, id_: str, company_id: Optional[str] = None) -> DocumentResponse:
@@ -562,7 +1004,7 @@ class AlanubeAPI:
         """
         url = build_url(cls.config.endpoint_minorexpenses, company_id, id_)
         response = cls.get(url, expected_response_code=200)
-        return response.json()
+        return cls.decode(response, DocumentResponse)
 
     @classmethod
     def get_minor_expenses(
@@ -575,6 +1017,9 @@ class AlanubeAPI:
         page: int = 1,
         start: Optional[int] = None,
         end: Optional[int] = None,
+        parse: bool = False,
+        stream: bool = False,
+        fields: Optional[Iterable[str]] = None,
     ) -> ListDocumentResponse:
         """
         Consultar los documentos de Gasto Menor Electrónicos (43)
@@ -591,8 +1036,7 @@ class AlanubeAPI:
             start=start,
             end=end,
         )
-        response = cls.get(url, expected_response_code=200)
-        return response.json()
+        return cls._get_list(url, ListDocumentResponse, Document, parse=parse, stream=stream, fields=fields)
 
     @classmethod
     def send_special_regime(cls, payload: Dict) -> DocumentResponse:
@@ -601,7 +1045,7 @@ class AlanubeAPI:
         """
         url = cls.config.endpoint_special_regimes
         response = cls.post(url, data=payload, expected_response_code=201)
-        return response.json()
+        return cls.decode(response, DocumentResponse)
 
     @classmethod
     def get_special_regime(cls, id_: str, company_id: Optional[str] = None) -> DocumentResponse:
@@ -610,7 +1054,7 @@ class AlanubeAPI:
         """
         url = build_url(cls.config.endpoint_special_regimes, company_id, id_)
         response = cls.get(url, expected_response_code=200)
-        return response.json()
+        return cls.decode(response, DocumentResponse)
 
     @classmethod
     def get_special_regimes(
@@ -623,6 +1067,9 @@ class AlanubeAPI:
         page: int = 1,
         start: Optional[int] = None,
         end: Optional[int] = None,
+        parse: bool = False,
+        stream: bool = False,
+        fields: Optional[Iterable[str]] = None,
     ) -> ListDocumentResponse:
         """
         Consultar los documentos de Régimen Especial Electrónicos (44)
@@ -639,8 +1086,7 @@ class AlanubeAPI:
             start=start,
             end=end,
         )
-        response = cls.get(url, expected_response_code=200)
-        return response.json()
+        return cls._get_list(url, ListDocumentResponse, Document, parse=parse, stream=stream, fields=fields)
 
     @classmethod
     def send_gubernamental(cls, payload: Dict) -> DocumentResponse:
@@ -649,7 +1095,7 @@ class AlanubeAPI:
         """
         url = cls.config.endpoint_gubernamentals
         response = cls.post(url, data=payload, expected_response_code=201)
-        return response.json()
+        return cls.decode(response, DocumentResponse)
 
     @classmethod
     def get_gubernamental(cls, id_: str, company_id: Optional[str] = None) -> DocumentResponse:
@@ -658,7 +1104,7 @@ class AlanubeAPI:
         """
         url = build_url(cls.config.endpoint_gubernamentals, company_id, id_)
         response = cls.get(url, expected_response_code=200)
-        return response.json()
+        return cls.decode(response, DocumentResponse)
 
     @classmethod
     def get_gubernamentals(
@@ -671,6 +1117,9 @@ class AlanubeAPI:
         page: int = 1,
         start: Optional[int] = None,
         end: Optional[int] = None,
+        parse: bool = False,
+        stream: bool = False,
+        fields: Optional[Iterable[str]] = None,
     ) -> ListDocumentResponse:
         """
         Consultar los documentos Gubernamentales Electrónicos (45)
@@ -687,8 +1136,7 @@ class AlanubeAPI:
             start=start,
             end=end,
         )
-        response = cls.get(url, expected_response_code=200)
-        return response.json()
+        return cls._get_list(url, ListDocumentResponse, Document, parse=parse, stream=stream, fields=fields)
 
     @classmethod
     def send_export_support(cls, payload: Dict) -> DocumentResponse:
@@ -697,7 +1145,7 @@ class AlanubeAPI:
         """
         url = cls.config.endpoint_export_supports
         response = cls.post(url, data=payload, expected_response_code=201)
-        return response.json()
+        return cls.decode(response, DocumentResponse)
 
     @classmethod
     def get_export_support(cls, id_: str, company_id: Optional[str] = None) -> DocumentResponse:
@@ -706,7 +1154,7 @@ class AlanubeAPI:
         """
         url = build_url(cls.config.endpoint_export_supports, company_id, id_)
         response = cls.get(url, expected_response_code=200)
-        return response.json()
+        return cls.decode(response, DocumentResponse)
 
     @classmethod
     def get_export_supports(
@@ -719,6 +1167,9 @@ class AlanubeAPI:
         page: int = 1,
         start: Optional[int] = None,
         end: Optional[int] = None,
+        parse: bool = False,
+        stream: bool = False,
+        fields: Optional[Iterable[str]] = None,
     ) -> ListDocumentResponse:
         """
         Consultar los documentos de Soporte de Exportación Electrónico (46)
@@ -735,8 +1186,7 @@ class AlanubeAPI:
             start=start,
             end=end,
         )
-        response = cls.get(url, expected_response_code=200)
-        return response.json()
+        return cls._get_list(url, ListDocumentResponse, Document, parse=parse, stream=stream, fields=fields)
 
     @classmethod
     def send_payment_abroad_support(cls, payload: Dict) -> DocumentResponse:
@@ -745,7 +1195,7 @@ class AlanubeAPI:
         """
         url = cls.config.endpoint_payment_abroad_supports
         response = cls.post(url, data=payload, expected_response_code=201)
-        return response.json()
+        return cls.decode(response, DocumentResponse)
 
     @classmethod
     def get_payment_abroad_support(cls, id_: str, company_id: Optional[str] = None) -> DocumentResponse:
@@ -754,7 +1204,7 @@ class AlanubeAPI:
         """
         url = build_url(cls.config.endpoint_payment_abroad_supports, company_id, id_)
         response = cls.get(url, expected_response_code=200)
-        return response.json()
+        return cls.decode(response, DocumentResponse)
 
     @classmethod
     def get_payment_abroad_supports(
@@ -767,6 +1217,9 @@ class AlanubeAPI:
         page: int = 1,
         start: Optional[int] = None,
         end: Optional[int] = None,
+        parse: bool = False,
+        stream: bool = False,
+        fields: Optional[Iterable[str]] = None,
     ) -> ListDocumentResponse:
         """
         Consultar los documentos de Soporte de Pagos al Exterior Electrónico (47)
@@ -783,8 +1236,7 @@ class AlanubeAPI:
             start=start,
             end=end,
         )
-        response = cls.get(url, expected_response_code=200)
-        return response.json()
+        return cls._get_list(url, ListDocumentResponse, Document, parse=parse, stream=stream, fields=fields)
 
     @classmethod
     def send_cancellation(cls, payload: Dict) -> Dict[str, str]:
@@ -829,7 +1281,7 @@ class AlanubeAPI:
         """
         url = build_url(cls.config.endpoint_received_documents, company_id, id_)
         response = cls.get(url, expected_response_code=200)
-        return response.json()
+        return cls.decode(response, ReceivedDocumentsResponse)
 
     @classmethod
     def get_received_documents(
@@ -839,6 +1291,9 @@ class AlanubeAPI:
         page: int = 1,
         start: Optional[str] = None,
         end: Optional[str] = None,
+        parse: bool = False,
+        stream: bool = False,
+        fields: Optional[Iterable[str]] = None,
     ) -> ListReceivedDocumentsResponse:
         """
         Consultar varios 'documentos recibidos'
@@ -853,6 +1308,11 @@ class AlanubeAPI:
         - `end`: Fecha de fin de la consulta basada en la fecha de emisión del
             documento(s). Formato: YYYY-MM-DD. Si no se envía, se tomará la
             fecha actual en zona horaria UTC.
+        - `parse`: Si es True, los documentos se retornan como instancias de
+            `ReceivedDocument` en lugar de diccionarios.
+        - `stream`: Si es True, se retorna un `DocumentStream` que decodifica
+            los documentos a medida que se leen (ver `alanube.do.streaming`).
+        - `fields`: Campos a conservar de cada documento; el resto se descarta.
 
         Retorna:
         - response (ListReceivedDocumentsResponse): La respuesta de la API con
@@ -861,8 +1321,7 @@ class AlanubeAPI:
         validate_pagination(limit, page)
         url = cls.config.endpoint_received_documents
         url = build_url(url, company_id=company_id, limit=limit, page=page, start=start, end=end)
-        response = cls.get(url, expected_response_code=200)
-        return response.json()
+        return cls._get_list(url, ListReceivedDocumentsResponse, ReceivedDocument, parse=parse, stream=stream, fields=fields)
 
     @classmethod
     def check_directory(cls, rnc: Optional[str] = None, company_id: Optional[str] = None):
@@ -943,10 +1402,14 @@ class AlanubeAPI:
             Si no se especifica, se toma la fecha actual.
         """
         legal_status = cls._validate_required_legal_status(legal_status)
-        url = cls.config.endpoint_reports_companies_documents_total.format(idCompany=company_id)
-        url = build_url(url, legal_status=legal_status, date_from=date_from, date_until=date_until)
-        response = cls.get(url, expected_response_code=200)
-        return response.json()
+        endpoint = cls.config.endpoint_reports_companies_documents_total
+        url = build_url(
+            endpoint.format(idCompany=company_id),
+            legal_status=legal_status,
+            date_from=date_from,
+            date_until=date_until,
+        )
+        return cls._get_report(url, endpoint, company_id, date_from, date_until, legal_status=legal_status)
 
     @classmethod
     def get_report_users_documents_total(
@@ -969,10 +1432,9 @@ class AlanubeAPI:
             Si no se especifica, se toma la fecha actual.
         """
         legal_status = validate_legal_status(legal_status, required=True)
-        url = cls.config.endpoint_reports_users_documents_total
-        url = build_url(url, legal_status=legal_status, date_from=date_from, date_until=date_until)
-        response = cls.get(url, expected_response_code=200)
-        return response.json()
+        endpoint = cls.config.endpoint_reports_users_documents_total
+        url = build_url(endpoint, legal_status=legal_status, date_from=date_from, date_until=date_until)
+        return cls._get_report(url, endpoint, None, date_from, date_until, legal_status=legal_status)
 
     @classmethod
     def get_report_company_emitted_documents(
@@ -982,9 +1444,8 @@ class AlanubeAPI:
         """
         Consulta el total de documentos electrónicos emitidos por una compañía específica.
         """
-        url = cls.config.endpoint_reports_companies_emitted_documents.format(id=company_id)
-        response = cls.get(url, expected_response_code=200)
-        return response.json()
+        endpoint = cls.config.endpoint_reports_companies_emitted_documents
+        return cls._get_report(endpoint.format(id=company_id), endpoint, company_id)
 
     @classmethod
     def get_report_company_emitted_documents_monthly(
@@ -995,9 +1456,8 @@ class AlanubeAPI:
         Consulta el total de documentos electrónicos emitidos por una compañía
         específica durante los últimos 12 meses.
         """
-        url = cls.config.endpoint_reports_companies_emitted_documents_monthly.format(id=company_id)
-        response = cls.get(url, expected_response_code=200)
-        return response.json()
+        endpoint = cls.config.endpoint_reports_companies_emitted_documents_monthly
+        return cls._get_report(endpoint.format(id=company_id), endpoint, company_id)
 
     @classmethod
     def get_report_company_emitted_documents_15_days(
@@ -1008,9 +1468,8 @@ class AlanubeAPI:
         Consulta el total de documentos electrónicos emitidos por una compañía
         específica durante los últimos 15 días.
         """
-        url = cls.config.endpoint_reports_companies_emitted_documents_15_days.format(id=company_id)
-        response = cls.get(url, expected_response_code=200)
-        return response.json()
+        endpoint = cls.config.endpoint_reports_companies_emitted_documents_15_days
+        return cls._get_report(endpoint.format(id=company_id), endpoint, company_id)
 
     @classmethod
     def get_report_company_accepted_documents(
@@ -1021,9 +1480,8 @@ class AlanubeAPI:
         Consulta el total de documentos electrónicos aceptados por la DGII
         para una compañía específica.
         """
-        url = cls.config.endpoint_reports_companies_accepted_documents.format(id=company_id)
-        response = cls.get(url, expected_response_code=200)
-        return response.json()
+        endpoint = cls.config.endpoint_reports_companies_accepted_documents
+        return cls._get_report(endpoint.format(id=company_id), endpoint, company_id)
 
     @classmethod
     def get_report_company_accepted_documents_monthly(
@@ -1034,9 +1492,8 @@ class AlanubeAPI:
         Consulta el total de documentos electrónicos aceptados por la DGII
         para una compañía específica durante los últimos 12 meses.
         """
-        url = cls.config.endpoint_reports_companies_accepted_documents_monthly.format(id=company_id)
-        response = cls.get(url, expected_response_code=200)
-        return response.json()
+        endpoint = cls.config.endpoint_reports_companies_accepted_documents_monthly
+        return cls._get_report(endpoint.format(id=company_id), endpoint, company_id)
 
     @classmethod
     def get_report_company_accepted_documents_15_days(
@@ -1047,6 +1504,5 @@ class AlanubeAPI:
         Consulta el total de documentos electrónicos aceptados por la DGII
         para una compañía específica durante los últimos 15 días.
         """
-        url = cls.config.endpoint_reports_companies_accepted_documents_15_days.format(id=company_id)
-        response = cls.get(url, expected_response_code=200)
-        return response.json()
+        endpoint = cls.config.endpoint_reports_companies_accepted_documents_15_days
+        return cls._get_report(endpoint.format(id=company_id), endpoint, company_id)
@@ -0,0 +1,241 @@
+"""Download of document artifacts (XML and PDF).
+
+`DocumentResponse` exposes the signed XML and the PDF representation of a
+document as URLs (`xml`, `pdf`). `ArtifactFetcher` archives them to disk:
+
+- Files are streamed in chunks, never buffered whole in memory.
+- Downloads share a pooled `requests.Session` and run concurrently, with a
+  bound on the number of in-flight downloads.
+- A `.sha256` file is written next to each completed artifact; artifacts
+  whose content still matches it are skipped on later runs.
+- Interrupted downloads are kept as `.part` files and resumed with an HTTP
+  `Range` request when the server supports it.
+
+Example:
+----------
+```python
+from alanube.do.artifacts import ArtifactFetcher
+from alanube.do.pagination import paginate
+
+with ArtifactFetcher("archive", max_workers=16) as fetcher:
+    for result in fetcher.fetch_many(paginate(AlanubeAPI.get_fiscal_invoices)):
+        if result.status == "failed":
+            print(result.url, result.error)
+```
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any, Iterable, Iterator, List, Optional, Sequence, Set
+
+from alanube.utils import lazy_import
+
+
+requests = lazy_import("requests")
+
+logger = logging.getLogger(__package__)
+
+
+ARTIFACT_EXTENSIONS = {
+    "xml": "xml",
+    "pdf": "pdf",
+}
+
+DOWNLOADED = "downloaded"
+RESUMED = "resumed"
+SKIPPED = "skipped"
+FAILED = "failed"
+
+
+@dataclass
+class ArtifactResult:
+    url: Optional[str]
+    path: str
+    status: str
+    kind: Optional[str] = None
+    document_id: Optional[str] = None
+    sha256: Optional[str] = None
+    size: int = 0
+    error: Optional[str] = None
+
+
+def file_sha256(path: str, chunk_size: int = 1024 * 1024) -> str:
+    """Return the hex SHA-256 digest of a file, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _read_text(path: str) -> Optional[str]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+class ArtifactFetcher:
+    """
+    Concurrent, resumable downloader of document artifacts.
+
+    Args:
+    ----------
+    - `directory` (str): Root directory of the archive.
+    - `max_workers` (int): Maximum number of concurrent downloads. It also
+      sizes the connection pool of the session.
+    - `chunk_size` (int): Size of the chunks streamed to disk.
+    - `timeout` (float): Connect/read timeout of each request.
+    - `verify_existing` (bool): Re-hash archived files before skipping them.
+      When False, the presence of the `.sha256` file is trusted.
+    - `session` (requests.Session): Optional session to use instead of
+      creating a pooled one.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        max_workers: int = 8,
+        chunk_size: int = 64 * 1024,
+        timeout: float = 60,
+        verify_existing: bool = True,
+        session: Optional[requests.Session] = None,
+    ):
+        if max_workers <= 0:
+            raise ValueError("max_workers must be greater than zero.")
+        self.directory = directory
+        self.max_workers = max_workers
+        self.chunk_size = chunk_size
+        self.timeout = timeout
+        self.verify_existing = verify_existing
+        self._owns_session = session is None
+        if session is None:
+            from requests.adapters import HTTPAdapter
+
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+        self.session = session
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if self._owns_session:
+            self.session.close()
+
+    def path_for(self, document: Any, kind: str) -> str:
+        """
+        Return the archive path of an artifact:
+        `<directory>/<companyIdentification>/<documentNumber>.<ext>`.
+        """
+        company = document.get("companyIdentification") or "unknown"
+        name = document.get("documentNumber") or document.get("id")
+        if not name:
+            raise ValueError("Document has neither documentNumber nor id.")
+        extension = ARTIFACT_EXTENSIONS.get(kind, kind)
+        return os.path.join(self.directory, str(company), f"{name}.{extension}")
+
+    def is_archived(self, path: str) -> bool:
+        """Whether `path` holds a complete artifact matching its `.sha256`."""
+        expected = _read_text(path + ".sha256")
+        if not expected or not os.path.exists(path):
+            return False
+        return not self.verify_existing or file_sha256(path) == expected
+
+    def fetch(self, url: str, path: str) -> ArtifactResult:
+        """
+        Download `url` into `path`, resuming a previous partial download.
+
+        Raises `requests.RequestException` on network or HTTP errors; the
+        partial file is kept so the next call can resume it.
+        """
+        if self.is_archived(path):
+            return ArtifactResult(url, path, SKIPPED, sha256=_read_text(path + ".sha256"), size=os.path.getsize(path))
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        part_path = path + ".part"
+        offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+        headers = {"Range": f"bytes={offset}-"} if offset else {}
+
+        with self.session.get(url, headers=headers, stream=True, timeout=self.timeout) as response:
+            if offset and response.status_code == 416:
+                # The partial file is not usable for this resource, start over.
+                os.remove(part_path)
+                return self.fetch(url, path)
+            response.raise_for_status()
+
+            digest = hashlib.sha256()
+            resumed = offset > 0 and response.status_code == 206
+            if resumed:
+                with open(part_path, "rb") as f:
+                    for chunk in iter(lambda: f.read(self.chunk_size), b""):
+                        digest.update(chunk)
+                mode = "ab"
+            else:
+                offset, mode = 0, "wb"
+
+            size = offset
+            with open(part_path, mode) as f:
+                for chunk in response.iter_content(chunk_size=self.chunk_size):
+                    if chunk:
+                        f.write(chunk)
+                        digest.update(chunk)
+                        size += len(chunk)
+
+        os.replace(part_path, path)
+        sha256 = digest.hexdigest()
+        with open(path + ".sha256", "w", encoding="utf-8") as f:
+            f.write(sha256)
+        return ArtifactResult(url, path, RESUMED if resumed else DOWNLOADED, sha256=sha256, size=size)
+
+    def _fetch_safe(self, url: str, path: str, kind: str, document_id: Optional[str]) -> ArtifactResult:
+        try:
+            result = self.fetch(url, path)
+        except (requests.RequestException, OSError) as e:
+            logger.warning(f"Error downloading {url}: {e}")
+            result = ArtifactResult(url, path, FAILED, error=str(e))
+        result.kind = kind
+        result.document_id = document_id
+        return result
+
+    def _jobs(self, documents: Iterable[Any], kinds: Sequence[str]):
+        for document in documents:
+            for kind in kinds:
+                url = document.get(kind)
+                if url:
+                    yield url, self.path_for(document, kind), kind, document.get("id")
+
+    def fetch_many(self, documents: Iterable[Any], kinds: Sequence[str] = ("xml", "pdf")) -> Iterator[ArtifactResult]:
+        """
+        Download the artifacts of many documents concurrently.
+
+        `documents` is consumed lazily, so it can be a generator such as
+        `paginate(...)`; at most `2 * max_workers` downloads are queued at a
+        time. Results are yielded as downloads complete. Failures are
+        reported with status `failed` instead of being raised.
+        """
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            pending: Set[Future] = set()
+            for job in self._jobs(documents, kinds):
+                if len(pending) >= 2 * self.max_workers:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield future.result()
+                pending.add(executor.submit(self._fetch_safe, *job))
+            for future in wait(pending).done:
+                yield future.result()
+
+    def fetch_document(self, document: Any, kinds: Sequence[str] = ("xml", "pdf")) -> List[ArtifactResult]:
+        """Download the artifacts of a single document."""
+        return [self._fetch_safe(*job) for job in self._jobs([document], kinds)]
@@ -0,0 +1,425 @@
+"""Caching helpers for Alanube API responses.
+
+Report endpoints are read far more often than their data changes: the totals
+for a month that already ended are final, only the running period moves.
+`ReportCache` keys report responses by endpoint, company and date range and
+stores them with a TTL that depends on whether the requested period is closed.
+`CompanyCache` keeps company profiles, which change rarely, for a fixed TTL
+and revalidates them with the validators (ETag/Last-Modified) sent by the API.
+
+The storage is pluggable. Three backends are provided:
+
+- `MemoryCacheBackend`: in-process LRU, the default.
+- `SQLiteCacheBackend`: a SQLite file, shared by processes on one host.
+- `DirectoryCacheBackend`: one JSON file per entry, suitable for a shared
+  (e.g. network mounted) directory.
+
+Any object implementing `get`, `set`, `delete` and `clear` can be used.
+"""
+
+from __future__ import annotations
+
+import copy
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from typing import Any, Callable, Dict, Optional, Protocol, Tuple
+
+
+class CacheBackend(Protocol):
+    """Interface expected from cache storages."""
+
+    def get(self, key: str) -> Optional[Any]:
+        ...
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        ...
+
+    def delete(self, key: str) -> None:
+        ...
+
+    def clear(self) -> None:
+        ...
+
+
+@dataclass
+class CacheStats:
+    """Counters describing how a cache has been used."""
+    hits: int = 0
+    misses: int = 0
+    sets: int = 0
+    invalidations: int = 0
+    revalidations: int = 0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def incr(self, name: str, amount: int = 1):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + amount)
+
+    def as_dict(self):
+        return {k: v for k, v in self.__dict__.items() if not k.startswith('_')}
+
+
+def _expires_at(ttl: Optional[float]) -> Optional[float]:
+    return None if ttl is None else time.time() + ttl
+
+
+def _is_expired(expires_at: Optional[float]) -> bool:
+    return expires_at is not None and expires_at <= time.time()
+
+
+class MemoryCacheBackend:
+    """
+    Thread-safe in-memory LRU cache.
+
+    Values are copied when stored and when read, like the other backends
+    deserialize a fresh copy, so callers mutating a cached response do not
+    change what later reads get.
+    """
+
+    def __init__(self, maxsize: int = 1024):
+        if maxsize <= 0:
+            raise ValueError("maxsize must be greater than zero.")
+        self.maxsize = maxsize
+        self._data: "OrderedDict[str, Tuple[Optional[float], Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires_at, value = item
+            if _is_expired(expires_at):
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+        return copy.deepcopy(value)
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        value = copy.deepcopy(value)
+        with self._lock:
+            self._data[key] = (_expires_at(ttl), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class SQLiteCacheBackend:
+    """
+    Cache stored in a SQLite database.
+
+    Values must be JSON serializable. A connection is opened per thread, so
+    the backend can be shared by the threads of a process and, through the
+    database file, by several processes.
+    """
+
+    def __init__(self, path: str, table: str = "alanube_cache"):
+        if not table.isidentifier():
+            raise ValueError(f"Invalid table name: {table!r}")
+        self.path = path
+        self.table = table
+        self._local = threading.local()
+        with self._connection() as conn:
+            conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.table} "
+                "(key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL)"
+            )
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> Optional[Any]:
+        conn = self._connection()
+        row = conn.execute(f"SELECT value, expires_at FROM {self.table} WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        value, expires_at = row
+        if _is_expired(expires_at):
+            self.delete(key)
+            return None
+        return json.loads(value)
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        with self._connection() as conn:
+            conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, json.dumps(value), _expires_at(ttl)),
+            )
+
+    def delete(self, key: str) -> None:
+        with self._connection() as conn:
+            conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+
+    def clear(self) -> None:
+        with self._connection() as conn:
+            conn.execute(f"DELETE FROM {self.table}")
+
+
+class DirectoryCacheBackend:
+    """
+    Cache stored as JSON files in a directory.
+
+    Writes go to a temporary file that is then renamed over the target, so
+    readers on other hosts never observe a partially written entry.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, f"{digest}.json")
+
+    def get(self, key: str) -> Optional[Any]:
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if _is_expired(entry.get("expires_at")):
+            self.delete(key)
+            return None
+        return entry.get("value")
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        entry = {"key": key, "expires_at": _expires_at(ttl), "value": value}
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(entry, f)
+            os.replace(tmp_path, self._path(key))
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def delete(self, key: str) -> None:
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def clear(self) -> None:
+        for name in os.listdir(self.directory):
+            if name.endswith(".json"):
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except FileNotFoundError:
+                    pass
+
+
+def _to_date(value) -> Optional[date]:
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    try:
+        return date.fromisoformat(str(value)[:10])
+    except ValueError:
+        return None
+
+
+class ReportCache:
+    """
+    Cache for report endpoints keyed by endpoint, company and date range.
+
+    A report whose range ended before today covers a closed period and is
+    cached for `closed_ttl` seconds (forever by default). Reports over a
+    range that includes today, or over a rolling window such as "last 12
+    months", are cached for `current_ttl` seconds only.
+
+    Args:
+    ----------
+    - `backend`: Storage for the entries. Defaults to `MemoryCacheBackend`.
+    - `current_ttl` (float): TTL for reports covering the current period.
+    - `closed_ttl` (float): TTL for reports over closed periods, `None` to
+      keep them until evicted by the backend.
+    """
+
+    def __init__(
+        self,
+        backend: Optional[CacheBackend] = None,
+        current_ttl: float = 60,
+        closed_ttl: Optional[float] = None,
+        today: Callable[[], date] = date.today,
+    ):
+        self.backend = backend if backend is not None else MemoryCacheBackend()
+        self.current_ttl = current_ttl
+        self.closed_ttl = closed_ttl
+        self.today = today
+        self.stats = CacheStats()
+
+    def make_key(
+        self,
+        endpoint: str,
+        company_id: Optional[str] = None,
+        date_from=None,
+        date_until=None,
+        **extra,
+    ) -> str:
+        """
+        Build the cache key for a report request.
+
+        Rolling reports (no explicit range) are keyed by the current month so
+        that an entry stored on the last day of a month is never served once
+        the month has rolled over.
+        """
+        parts = [endpoint, company_id or "", str(date_from or ""), str(date_until or "")]
+        if date_from is None and date_until is None:
+            parts.append(self.today().strftime("%Y-%m"))
+        parts.extend(f"{k}={extra[k]}" for k in sorted(extra) if extra[k] is not None)
+        return "|".join(parts)
+
+    def ttl_for(self, date_until=None) -> Optional[float]:
+        """Return the TTL for a report whose range ends at `date_until`."""
+        until = _to_date(date_until)
+        if until is not None and until < self.today():
+            return self.closed_ttl
+        return self.current_ttl
+
+    def get_or_fetch(
+        self,
+        fetch: Callable[[], Any],
+        endpoint: str,
+        company_id: Optional[str] = None,
+        date_from=None,
+        date_until=None,
+        **extra,
+    ):
+        """Return the cached report or call `fetch` and store its result."""
+        key = self.make_key(endpoint, company_id, date_from, date_until, **extra)
+        value = self.backend.get(key)
+        if value is not None:
+            self.stats.incr("hits")
+            return value
+        self.stats.incr("misses")
+        value = fetch()
+        self.backend.set(key, value, ttl=self.ttl_for(date_until))
+        self.stats.incr("sets")
+        return value
+
+    def invalidate(self, endpoint: str, company_id: Optional[str] = None, date_from=None, date_until=None, **extra):
+        """Remove a single report from the cache."""
+        self.backend.delete(self.make_key(endpoint, company_id, date_from, date_until, **extra))
+        self.stats.incr("invalidations")
+
+    def clear(self):
+        """Remove every cached report."""
+        self.backend.clear()
+        self.stats.incr("invalidations")
+
+
+class CompanyCache:
+    """
+    Cache for company profiles returned by `get_company`.
+
+    Entries are fresh for `ttl` seconds. Stale entries are kept for up to
+    `max_stale` more seconds so that, when the API sent an `ETag` or
+    `Last-Modified` header, they can be revalidated with a conditional request
+    instead of being downloaded again. `update_company` invalidates the
+    company, or stores the updated profile when `refresh_on_update` is set.
+
+    Args:
+    ----------
+    - `ttl` (float): Seconds an entry is served without contacting the API.
+    - `backend`: Storage for the entries. Defaults to `MemoryCacheBackend`.
+    - `revalidate` (bool): Use conditional requests for stale entries.
+    - `max_stale` (float): Seconds a stale entry is kept for revalidation.
+    - `refresh_on_update` (bool): Store the `update_company` response
+      instead of invalidating the entry.
+    """
+
+    def __init__(
+        self,
+        ttl: float = 300,
+        backend: Optional[CacheBackend] = None,
+        revalidate: bool = True,
+        max_stale: float = 86400,
+        refresh_on_update: bool = False,
+    ):
+        self.ttl = ttl
+        self.backend = backend if backend is not None else MemoryCacheBackend()
+        self.revalidate = revalidate
+        self.max_stale = max_stale
+        self.refresh_on_update = refresh_on_update
+        self.stats = CacheStats()
+
+    @staticmethod
+    def make_key(company_id: Optional[str]) -> str:
+        return f"company|{company_id or ''}"
+
+    def lookup(self, company_id: Optional[str]) -> Tuple[Optional[dict], bool]:
+        """
+        Return `(entry, fresh)` for a company.
+
+        `entry` holds the cached `data` and its validators; it is `None` on a
+        miss. Counts a hit only for fresh entries.
+        """
+        entry = self.backend.get(self.make_key(company_id))
+        if entry is None:
+            self.stats.incr("misses")
+            return None, False
+        fresh = not _is_expired(entry.get("fresh_until"))
+        self.stats.incr("hits" if fresh else "misses")
+        return entry, fresh
+
+    def conditional_headers(self, entry: Optional[dict]) -> Dict[str, str]:
+        """Headers for revalidating a stale entry, empty if not possible."""
+        if not entry or not self.revalidate:
+            return {}
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def store(self, company_id: Optional[str], data: Any, etag: Optional[str] = None, last_modified: Optional[str] = None):
+        entry = {
+            "data": data,
+            "etag": etag,
+            "last_modified": last_modified,
+            "fresh_until": _expires_at(self.ttl),
+        }
+        self.backend.set(self.make_key(company_id), entry, ttl=self.ttl + self.max_stale)
+        self.stats.incr("sets")
+
+    def refresh(self, company_id: Optional[str], entry: dict):
+        """Mark a revalidated entry (HTTP 304) as fresh again."""
+        self.store(company_id, entry["data"], entry.get("etag"), entry.get("last_modified"))
+        self.stats.incr("revalidations")
+
+    def invalidate(self, company_id: Optional[str]):
+        self.backend.delete(self.make_key(company_id))
+        self.stats.incr("invalidations")
+
+    def clear(self):
+        self.backend.clear()
+        self.stats.incr("invalidations")
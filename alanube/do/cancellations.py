@@ -0,0 +1,244 @@
+"""Batch cancellation of eNCF numbers.
+
+`send_cancellation` takes one payload of numbering ranges. `cancel_encfs`
+takes an arbitrary collection of eNCF numbers instead, compacts them into
+the minimal contiguous ranges per document type, sends one cancellation per
+type concurrently and then tracks the results in a single paginated pass
+over `get_cancellations`.
+
+An eNCF is made of the series letter `E`, the two digit document type and a
+ten digit sequence, e.g. `E310000000001`.
+
+Example:
+----------
+```python
+from alanube.do.cancellations import cancel_encfs
+
+batch = cancel_encfs(
+    ["E310000000007", "E310000000005", "E310000000006", "E320000000100"],
+    base={"sender": {"rnc": "101010101"}},
+)
+for result in batch.results:
+    print(result.encf_type, result.ranges, result.status)
+```
+
+The cancellation body is built by `payload_factory(encf_type, ranges,
+**base)`; the default, `build_cancellation_payload`, follows the layout of
+the DGII cancellation (ANECF) document. Pass your own factory if your
+account expects different field names.
+"""
+
+from __future__ import annotations
+
+import logging
+import re
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .api import AlanubeAPI
+from .pagination import paginate
+
+
+logger = logging.getLogger(__package__)
+
+
+_ENCF_RE = re.compile(r"E(\d{2})(\d{10})")
+
+# Inclusive range of eNCF sequences of a single document type.
+Range = Tuple[int, int]
+
+SENT = "sent"
+FAILED = "failed"
+
+
+def parse_encf(encf: str) -> Tuple[int, int]:
+    """Split an eNCF into its document type and sequence number."""
+    match = _ENCF_RE.fullmatch(encf.strip().upper())
+    if match is None:
+        raise ValueError(f"Invalid eNCF: {encf!r}")
+    return int(match.group(1)), int(match.group(2))
+
+
+def format_encf(encf_type: int, sequence: int) -> str:
+    return f"E{encf_type:02d}{sequence:010d}"
+
+
+def compact_ranges(sequences: Iterable[int]) -> List[Range]:
+    """Compact sequence numbers into the minimal sorted list of inclusive ranges."""
+    ranges: List[Range] = []
+    for sequence in sorted(set(sequences)):
+        if ranges and sequence == ranges[-1][1] + 1:
+            ranges[-1] = (ranges[-1][0], sequence)
+        else:
+            ranges.append((sequence, sequence))
+    return ranges
+
+
+def compact_encf_ranges(encfs: Iterable[str]) -> Dict[int, List[Range]]:
+    """
+    Group eNCF numbers by document type and compact each group into
+    contiguous ranges. Duplicates are ignored.
+
+    >>> compact_encf_ranges(["E310000000002", "E310000000001", "E320000000009"])
+    {31: [(1, 2)], 32: [(9, 9)]}
+    """
+    sequences: Dict[int, List[int]] = {}
+    for encf in encfs:
+        encf_type, sequence = parse_encf(encf)
+        sequences.setdefault(encf_type, []).append(sequence)
+    return {encf_type: compact_ranges(sequences[encf_type]) for encf_type in sorted(sequences)}
+
+
+def range_size(ranges: Iterable[Range]) -> int:
+    return sum(end - start + 1 for start, end in ranges)
+
+
+def build_cancellation_payload(encf_type: int, ranges: Sequence[Range], **base) -> Dict[str, Any]:
+    """
+    Default cancellation body: the DGII ANECF layout in camelCase, with one
+    cancellation line for `encf_type` holding its ranges. `base` holds the
+    remaining header fields (e.g. the sender).
+    """
+    quantity = range_size(ranges)
+    return {
+        **base,
+        "cancelledEncfQuantity": quantity,
+        "cancellationDetail": [
+            {
+                "lineNumber": 1,
+                "encfType": encf_type,
+                "cancelledEncfQuantity": quantity,
+                "cancelledSequenceRanges": [
+                    {"encfFrom": format_encf(encf_type, start), "encfTo": format_encf(encf_type, end)}
+                    for start, end in ranges
+                ],
+            },
+        ],
+    }
+
+
+@dataclass
+class CancellationResult:
+    encf_type: int
+    ranges: List[Range]
+    status: str
+    response: Optional[Dict[str, Any]] = None
+    error: Optional[BaseException] = None
+    # Latest record of the cancellation returned by `get_cancellations`.
+    record: Optional[Dict[str, Any]] = None
+
+    @property
+    def id(self) -> Optional[str]:
+        return (self.response or {}).get("id")
+
+    @property
+    def quantity(self) -> int:
+        return range_size(self.ranges)
+
+
+@dataclass
+class CancellationBatch:
+    results: List[CancellationResult] = field(default_factory=list)
+
+    @property
+    def failed(self) -> List[CancellationResult]:
+        return [result for result in self.results if result.status == FAILED]
+
+    @property
+    def pending(self) -> List[CancellationResult]:
+        """Sent cancellations not found yet by `track`."""
+        return [result for result in self.results if result.status == SENT and result.record is None]
+
+
+def _chunks(ranges: List[Range], size: Optional[int]) -> List[List[Range]]:
+    if not size:
+        return [ranges]
+    return [ranges[i:i + size] for i in range(0, len(ranges), size)]
+
+
+def send_cancellations(
+    encfs: Iterable[str],
+    base: Optional[Dict[str, Any]] = None,
+    payload_factory: Callable[..., Dict[str, Any]] = build_cancellation_payload,
+    max_ranges: Optional[int] = None,
+    max_workers: int = 4,
+) -> CancellationBatch:
+    """
+    Compact `encfs` and send the cancellations, one per document type (or
+    per `max_ranges` ranges of a type), concurrently.
+
+    Failed requests are reported in the batch, they do not stop the others.
+    """
+    base = base or {}
+    jobs = [
+        (encf_type, chunk)
+        for encf_type, ranges in compact_encf_ranges(encfs).items()
+        for chunk in _chunks(ranges, max_ranges)
+    ]
+
+    def send(job) -> CancellationResult:
+        encf_type, ranges = job
+        try:
+            response = AlanubeAPI.send_cancellation(payload_factory(encf_type, ranges, **base))
+        except Exception as e:
+            logger.warning(f"Cancellation of type {encf_type} {ranges} failed: {e!r}")
+            return CancellationResult(encf_type, ranges, FAILED, error=e)
+        return CancellationResult(encf_type, ranges, SENT, response=response)
+
+    if not jobs:
+        return CancellationBatch()
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(jobs))) as executor:
+        return CancellationBatch(list(executor.map(send, jobs)))
+
+
+def track_cancellations(
+    batch: CancellationBatch,
+    company_id: Optional[str] = None,
+    limit: int = 100,
+    **params,
+) -> CancellationBatch:
+    """
+    Fill `record` of the sent cancellations of `batch` with their latest
+    state, in a single pass over every page of `get_cancellations`.
+    """
+    wanted = {result.id: result for result in batch.results if result.id}
+    if not wanted:
+        return batch
+    for record in paginate(AlanubeAPI.get_cancellations, limit=limit, company_id=company_id, **params):
+        result = wanted.pop(record.get("id"), None)
+        if result is not None:
+            result.record = record
+            if not wanted:
+                break
+    return batch
+
+
+def cancel_encfs(
+    encfs: Iterable[str],
+    base: Optional[Dict[str, Any]] = None,
+    company_id: Optional[str] = None,
+    payload_factory: Callable[..., Dict[str, Any]] = build_cancellation_payload,
+    max_ranges: Optional[int] = None,
+    max_workers: int = 4,
+    track: bool = True,
+) -> CancellationBatch:
+    """
+    Cancel an arbitrary collection of eNCF numbers.
+
+    Args:
+    ----------
+    - `encfs`: eNCF numbers to cancel, in any order, duplicates allowed.
+    - `base` (dict): Fields common to every cancellation body.
+    - `company_id` (str): Optional, company used to track the cancellations.
+    - `payload_factory`: `(encf_type, ranges, **base) -> payload`.
+    - `max_ranges` (int): Optional, maximum number of ranges per request.
+    - `max_workers` (int): Number of cancellations sent concurrently.
+    - `track` (bool): Look the cancellations up with `get_cancellations`.
+    """
+    batch = send_cancellations(
+        encfs, base=base, payload_factory=payload_factory, max_ranges=max_ranges, max_workers=max_workers,
+    )
+    if track:
+        track_cancellations(batch, company_id=company_id)
+    return batch
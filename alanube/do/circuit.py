@@ -0,0 +1,270 @@
+"""Circuit breakers per endpoint family.
+
+When Alanube or the DGII degrade, requests keep timing out and every caller
+holds a thread for the full timeout. A circuit breaker tracks the outcome
+of the last calls of an endpoint family and, once too many of them fail or
+are too slow, rejects new calls immediately with `CircuitOpenError`
+instead of sending them.
+
+States:
+
+- closed: calls go through; outcomes are recorded in a rolling window.
+- open: calls are rejected until `open_timeout` seconds have passed.
+- half-open: up to `half_open_calls` probe calls go through. If they all
+  succeed the circuit closes, otherwise it opens again.
+
+A call fails when the request raises (timeouts, connection errors) or the
+API answers with a 5xx status; client errors (4xx) mean the API is up and
+count as successes. A call is slow when it takes longer than
+`slow_call_duration` seconds.
+
+Calls are grouped by endpoint family (see `endpoint_family`): documents
+`send` and `query`, `received` documents, `directory`, `reports` and
+`company`, so an outage of the document reception does not block queries.
+
+Example:
+----------
+```python
+from alanube.do.api import AlanubeAPI
+from alanube.do.circuit import CircuitBreakers
+
+breakers = CircuitBreakers(metrics=AlanubeAPI.metrics, open_timeout=60)
+Alanube.connect("token", developer_mode=False, circuit_breakers=breakers)
+```
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+from .exceptions import APIError, CircuitOpenError
+
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half-open"
+
+DOCUMENT_SEGMENTS = frozenset({
+    "fiscal-invoices",
+    "invoices",
+    "debit-notes",
+    "credit-notes",
+    "purchases",
+    "minor-expenses",
+    "special-regimes",
+    "gubernamentals",
+    "export-supports",
+    "payment-abroad-supports",
+    "cancellations",
+})
+
+SEGMENT_FAMILIES = {
+    "received-documents": "received",
+    "check-directory": "directory",
+    "check-dgii-status": "directory",
+    "reports": "reports",
+    "companies": "reports",
+    "company": "company",
+}
+
+
+def endpoint_family(method: str, url: str) -> str:
+    """
+    Return the family of an endpoint URL: `send` and `query` for documents,
+    `received`, `directory`, `reports`, `company` or `other`.
+    """
+    # Path is /dom/<version>/<segment>/...
+    parts = urlsplit(url).path.strip("/").split("/")
+    segment = parts[2] if len(parts) > 2 else ""
+    if segment in DOCUMENT_SEGMENTS:
+        return "send" if method.upper() == "POST" else "query"
+    return SEGMENT_FAMILIES.get(segment, "other")
+
+
+def is_failure(error: BaseException) -> bool:
+    """Whether an error raised by a call means the service is unhealthy."""
+    if isinstance(error, APIError):
+        return error.status_code is None or error.status_code >= 500
+    # `requests.HTTPError` raised for error responses without a JSON body.
+    status_code = getattr(getattr(error, "response", None), "status_code", None)
+    return not isinstance(status_code, int) or status_code >= 500
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker of a single endpoint family.
+
+    Args:
+    ----------
+    - `name` (str): Name of the circuit, used in errors and metrics.
+    - `window_size` (int): Number of recent calls the rates are computed on.
+    - `minimum_calls` (int): Calls needed in the window before opening.
+    - `failure_rate` (float): Failure rate opening the circuit.
+    - `slow_call_rate` (float): Slow call rate opening the circuit.
+    - `slow_call_duration` (float): Seconds after which a call is slow.
+    - `open_timeout` (float): Seconds the circuit stays open.
+    - `half_open_calls` (int): Probe calls allowed while half-open.
+    - `clock`: Time source, `time.monotonic` by default.
+    """
+
+    def __init__(
+        self,
+        name: str = "default",
+        window_size: int = 20,
+        minimum_calls: int = 10,
+        failure_rate: float = 0.5,
+        slow_call_rate: float = 0.8,
+        slow_call_duration: float = 10.0,
+        open_timeout: float = 30.0,
+        half_open_calls: int = 2,
+        clock: Callable[[], float] = time.monotonic,
+        on_state_change: Optional[Callable[[str, str], None]] = None,
+    ):
+        self.name = name
+        self.window_size = window_size
+        self.minimum_calls = minimum_calls
+        self.failure_rate = failure_rate
+        self.slow_call_rate = slow_call_rate
+        self.slow_call_duration = slow_call_duration
+        self.open_timeout = open_timeout
+        self.half_open_calls = half_open_calls
+        self.clock = clock
+        self.on_state_change = on_state_change
+        self._lock = threading.Lock()
+        # (failed, slow) of the last calls.
+        self._window: Deque[Tuple[bool, bool]] = deque(maxlen=window_size)
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probes = 0
+        self._probe_successes = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._refresh()
+            return self._state
+
+    def _set_state(self, state: str):
+        if state == self._state:
+            return
+        self._state = state
+        if state == OPEN:
+            self._opened_at = self.clock()
+        elif state == HALF_OPEN:
+            self._probes = 0
+            self._probe_successes = 0
+        elif state == CLOSED:
+            self._window.clear()
+        if self.on_state_change is not None:
+            self.on_state_change(self.name, state)
+
+    def _refresh(self):
+        if self._state == OPEN and self.clock() - self._opened_at >= self.open_timeout:
+            self._set_state(HALF_OPEN)
+
+    def retry_after(self) -> float:
+        """Seconds until an open circuit lets probe calls through."""
+        with self._lock:
+            if self._state != OPEN:
+                return 0.0
+            return max(0.0, self.open_timeout - (self.clock() - self._opened_at))
+
+    def acquire(self):
+        """Reserve a call, raising `CircuitOpenError` if it is not allowed."""
+        with self._lock:
+            self._refresh()
+            if self._state == CLOSED:
+                return
+            if self._state == HALF_OPEN and self._probes < self.half_open_calls:
+                self._probes += 1
+                return
+            retry_after = max(0.0, self.open_timeout - (self.clock() - self._opened_at)) if self._state == OPEN else 0.0
+        raise CircuitOpenError(self.name, retry_after)
+
+    def record(self, failed: bool, duration: float):
+        """Record the outcome of a call allowed by `acquire`."""
+        slow = duration >= self.slow_call_duration
+        with self._lock:
+            if self._state == HALF_OPEN:
+                if failed or slow:
+                    self._set_state(OPEN)
+                    return
+                self._probe_successes += 1
+                if self._probe_successes >= self.half_open_calls:
+                    self._set_state(CLOSED)
+                return
+            if self._state != CLOSED:
+                return
+            self._window.append((failed, slow))
+            calls = len(self._window)
+            if calls < self.minimum_calls:
+                return
+            failures = sum(1 for f, _ in self._window if f)
+            slow_calls = sum(1 for _, s in self._window if s)
+            if failures / calls >= self.failure_rate or slow_calls / calls >= self.slow_call_rate:
+                self._set_state(OPEN)
+
+    def call(self, func: Callable[[], Any]) -> Any:
+        """Run `func` through the circuit breaker."""
+        self.acquire()
+        start = self.clock()
+        try:
+            result = func()
+        except BaseException as e:
+            self.record(is_failure(e), self.clock() - start)
+            raise
+        self.record(False, self.clock() - start)
+        return result
+
+    def reset(self):
+        with self._lock:
+            self._set_state(CLOSED)
+
+
+class CircuitBreakers:
+    """
+    Registry of circuit breakers, one per endpoint family, created on first
+    use with the settings given here (see `CircuitBreaker`).
+    """
+
+    def __init__(self, metrics=None, **settings):
+        self.settings = settings
+        self.metrics = metrics
+        self._lock = threading.Lock()
+        self._breakers: Dict[str, CircuitBreaker] = {}
+
+    def get(self, family: str) -> CircuitBreaker:
+        breaker = self._breakers.get(family)
+        if breaker is None:
+            with self._lock:
+                breaker = self._breakers.get(family)
+                if breaker is None:
+                    breaker = CircuitBreaker(family, on_state_change=self._state_changed, **self.settings)
+                    self._breakers[family] = breaker
+        return breaker
+
+    def _state_changed(self, family: str, state: str):
+        if self.metrics is not None:
+            self.metrics.set_gauge(f"circuit.{family}.state", state)
+            self.metrics.incr(f"circuit.{family}.{state.replace('-', '_')}")
+
+    def call(self, method: str, url: str, func: Callable[[], Any]) -> Any:
+        """Run `func`, a call to `url`, through the breaker of its family."""
+        breaker = self.get(endpoint_family(method, url))
+        try:
+            return breaker.call(func)
+        except CircuitOpenError:
+            if self.metrics is not None:
+                self.metrics.incr(f"circuit.{breaker.name}.rejected")
+            raise
+
+    def states(self) -> Dict[str, str]:
+        return {family: breaker.state for family, breaker in self._breakers.items()}
+
+    def reset(self):
+        for breaker in list(self._breakers.values()):
+            breaker.reset()
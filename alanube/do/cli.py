@@ -0,0 +1,396 @@
+"""Command-line interface for bulk jobs, run as `python -m alanube`.
+
+Subcommands:
+
+- `send`: submit the documents of a JSONL file, one
+  `{"encf_type": 31, "payload": {...}}` record per line.
+- `poll`: fetch the status of documents, one `{"encf_type": 31, "id": "..."}`
+  record per line (the output of `send` can be used as is).
+- `export`: write every document of a list endpoint to a file (see
+  `alanube.do.export`). `--start`/`--end` take `YYYY-MM-DD` dates or Unix
+  timestamps, converted to what the list endpoint filters by.
+
+`send` and `poll` stream their input and keep at most `--concurrency`
+requests in flight, at most `--rate` requests per second, so memory does
+not depend on the size of the input. Each processed record is appended to
+`--output` as a JSON line with its line number and status (and to
+`--errors` when it failed). With `--checkpoint`, progress is saved after
+every record and an interrupted run resumes where it stopped.
+
+The token is read from `--token` or the `ALANUBE_TOKEN` environment
+variable.
+
+Example:
+----------
+```
+python -m alanube --sandbox send documents.jsonl -o sent.jsonl --checkpoint sent.ckpt --concurrency 16 --rate 20
+python -m alanube --sandbox poll sent.jsonl -o status.jsonl
+python -m alanube --sandbox export 31 invoices.csv --start 2024-01-01 --end 2024-12-31
+```
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from collections import deque
+from datetime import date, datetime, timedelta, timezone
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Set, Tuple
+
+from .exceptions import ValidationError
+from .pipeline import FAILED, INVALID, SENT
+
+
+logger = logging.getLogger(__package__)
+
+OK = "ok"
+
+# (line number, offset just after the line, record)
+Record = Tuple[int, int, Dict[str, Any]]
+
+
+def read_records(path: str, offset: int = 0, line: int = 0) -> Iterator[Record]:
+    """
+    Yield the records of a JSONL file starting at byte `offset`, which is
+    the start of line `line + 1`. Blank lines are skipped; lines that are
+    not valid JSON objects are yielded as `{"_error": ...}`.
+    """
+    with open(path, "rb") as file:
+        file.seek(offset)
+        for raw in file:
+            line += 1
+            offset += len(raw)
+            if not raw.strip():
+                continue
+            try:
+                record = json.loads(raw)
+            except ValueError as e:
+                record = {"_error": f"Invalid JSON: {e}"}
+            if not isinstance(record, dict):
+                record = {"_error": "Record is not a JSON object"}
+            yield line, offset, record
+
+
+class Checkpoint:
+    """
+    Progress of a run over an input file.
+
+    Records finish out of order, so the checkpoint keeps the offset up to
+    which every record is done plus the line numbers of the records done
+    after it. Saved atomically to `path`.
+    """
+
+    def __init__(self, path: Optional[str], input_path: str):
+        self.path = path
+        self.input_path = input_path
+        self.offset = 0
+        self.line = 0
+        self.done: Set[int] = set()
+        self._dispatched: Deque[Tuple[int, int]] = deque()
+        if path and os.path.exists(path):
+            with open(path, encoding="utf-8") as file:
+                state = json.load(file)
+            if state.get("input") != os.path.abspath(input_path):
+                raise ValueError(f"Checkpoint {path} belongs to {state.get('input')}")
+            self.offset = state["offset"]
+            self.line = state["line"]
+            self.done = set(state.get("done", ()))
+
+    def dispatched(self, line: int, offset: int):
+        self._dispatched.append((line, offset))
+
+    def complete(self, line: int):
+        self.done.add(line)
+        while self._dispatched and self._dispatched[0][0] in self.done:
+            self.line, self.offset = self._dispatched.popleft()
+        self.done = {n for n in self.done if n > self.line}
+        self.save()
+
+    def save(self):
+        if not self.path:
+            return
+        state = {
+            "input": os.path.abspath(self.input_path),
+            "offset": self.offset,
+            "line": self.line,
+            "done": sorted(self.done),
+        }
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as file:
+            json.dump(state, file)
+        os.replace(tmp, self.path)
+
+
+class RateLimiter:
+    """Token bucket allowing `rate` calls per second, in bursts of `burst`."""
+
+    def __init__(self, rate: Optional[float], burst: int = 1, clock=time.monotonic, sleep=time.sleep):
+        self.rate = rate
+        self.burst = burst
+        self.clock = clock
+        self.sleep = sleep
+        self._tokens = float(burst)
+        self._updated = clock()
+
+    def acquire(self):
+        if not self.rate:
+            return
+        now = self.clock()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        if self._tokens < 1:
+            self.sleep((1 - self._tokens) / self.rate)
+            self._updated = self.clock()
+            self._tokens = 1.0
+        self._tokens -= 1
+
+
+def _json_line(result: Dict[str, Any]) -> str:
+    return json.dumps(result, ensure_ascii=False, default=str) + "\n"
+
+
+def run_records(
+    records: Iterator[Record],
+    handle: Callable[[Dict[str, Any]], Dict[str, Any]],
+    output,
+    errors=None,
+    checkpoint: Optional[Checkpoint] = None,
+    concurrency: int = 8,
+    rate: Optional[float] = None,
+) -> Dict[str, int]:
+    """
+    Run `handle` on every record, with at most `concurrency` calls in flight
+    and at most `rate` calls per second, writing each result to `output`.
+
+    `handle` returns a dict with at least a `status`; records it raises on
+    are reported as `failed`. Returns the number of records per status.
+    """
+    limiter = RateLimiter(rate, burst=max(1, concurrency))
+    counts: Dict[str, int] = {}
+    in_flight: Dict[Future, int] = {}
+
+    def finish(done):
+        for future in done:
+            line = in_flight.pop(future)
+            try:
+                result = {"line": line, **future.result()}
+            except ValidationError as e:
+                result = {"line": line, "status": INVALID, "error": str(e), "errors": e.errors}
+            except Exception as e:
+                result = {"line": line, "status": FAILED, "error": f"{type(e).__name__}: {e}"}
+            # The checkpoint is saved before the result is written: after a
+            # crash in between, the record is not sent again (only its output
+            # line is missing), instead of being sent twice.
+            if checkpoint is not None:
+                checkpoint.complete(line)
+            text = _json_line(result)
+            output.write(text)
+            output.flush()
+            if errors is not None and result["status"] in (FAILED, INVALID):
+                errors.write(text)
+                errors.flush()
+            counts[result["status"]] = counts.get(result["status"], 0) + 1
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for line, offset, record in records:
+            if checkpoint is not None:
+                checkpoint.dispatched(line, offset)
+                if line in checkpoint.done:
+                    continue
+            if len(in_flight) >= concurrency:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                finish(done)
+            if "_error" not in record:
+                limiter.acquire()
+            in_flight[executor.submit(handle, record)] = line
+        while in_flight:
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            finish(done)
+    return counts
+
+
+def _check_record(record: Dict[str, Any]):
+    if "_error" in record:
+        raise ValueError(record["_error"])
+
+
+def send_record(record: Dict[str, Any], validate: bool = False) -> Dict[str, Any]:
+    """Send the document of a `{"encf_type", "payload"}` record."""
+    from .client import Alanube
+
+    _check_record(record)
+    response = Alanube.send_document(int(record["encf_type"]), record["payload"], validate=validate)
+    return {"status": SENT, "encf_type": record["encf_type"], "response": response}
+
+
+def poll_record(record: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Get the document of a `{"encf_type", "id", "company_id"}` record, or of
+    a line written by `send` (the id is read from its `response`).
+    """
+    from .client import Alanube
+
+    _check_record(record)
+    document_id = record.get("id") or (record.get("response") or {}).get("id")
+    if not document_id:
+        raise ValueError("Record has no document id")
+    response = Alanube.get_document(int(record["encf_type"]), document_id, record.get("company_id"))
+    return {"status": OK, "encf_type": record["encf_type"], "id": document_id, "response": response}
+
+
+def _open_outputs(args):
+    output = open(args.output, "a", encoding="utf-8") if args.output != "-" else sys.stdout
+    errors = open(args.errors, "a", encoding="utf-8") if args.errors else None
+    return output, errors
+
+
+def _run(args, handle) -> int:
+    checkpoint = Checkpoint(args.checkpoint, args.input)
+    if checkpoint.line or checkpoint.done:
+        logger.info(f"Resuming {args.input} after line {checkpoint.line}")
+    output, errors = _open_outputs(args)
+    try:
+        counts = run_records(
+            read_records(args.input, checkpoint.offset, checkpoint.line),
+            handle,
+            output,
+            errors=errors,
+            checkpoint=checkpoint,
+            concurrency=args.concurrency,
+            rate=args.rate,
+        )
+    finally:
+        if output is not sys.stdout:
+            output.close()
+        if errors is not None:
+            errors.close()
+    print(json.dumps(counts, sort_keys=True), file=sys.stderr)
+    return 1 if counts.get(FAILED) or counts.get(INVALID) else 0
+
+
+def command_send(args) -> int:
+    return _run(args, lambda record: send_record(record, validate=args.validate))
+
+
+def command_poll(args) -> int:
+    return _run(args, poll_record)
+
+
+def command_export(args) -> int:
+    from .api import AlanubeAPI
+    from .client import Alanube
+    from .export import columns_for, export_documents
+    from .scans import TIMESTAMP, bound_format
+    from .types import ReceivedDocumentsResponse
+
+    params: Dict[str, Any] = {"company_id": args.company_id}
+    columns = None
+    if args.type == "received":
+        func = AlanubeAPI.get_received_documents
+        columns = columns_for(ReceivedDocumentsResponse)
+    else:
+        func = Alanube.get_documents_func_map.get(int(args.type))
+        if func is None:
+            raise SystemExit(f"Unknown document type: {args.type}")
+        params.update(status=args.status, legal_status=args.legal_status)
+    timestamps = bound_format(func) == TIMESTAMP
+    params.update(
+        start=_convert_bound(args.start, timestamps, is_end=False),
+        end=_convert_bound(args.end, timestamps, is_end=True),
+    )
+    count = export_documents(
+        func,
+        args.output,
+        format=args.format,
+        columns=columns,
+        limit=args.limit,
+        **{k: v for k, v in params.items() if v is not None},
+    )
+    print(json.dumps({"exported": count}), file=sys.stderr)
+    return 0
+
+
+def _page_size(value: str):
+    return value if value == "auto" else int(value)
+
+
+def _bound(value: str):
+    """`--start`/`--end`: a Unix timestamp or a `YYYY-MM-DD` date."""
+    if value.isdigit():
+        return int(value)
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected a YYYY-MM-DD date or a Unix timestamp, got {value!r}")
+
+
+def _convert_bound(value, timestamps: bool, is_end: bool):
+    # Document lists filter by timestamps, received documents by dates.
+    # Dates are inclusive: a date `--end` covers its whole day.
+    if value is None:
+        return None
+    if timestamps:
+        if isinstance(value, int):
+            return value
+        day = datetime(value.year, value.month, value.day, tzinfo=timezone.utc)
+        return int((day + timedelta(days=1)).timestamp()) - 1 if is_end else int(day.timestamp())
+    if isinstance(value, int):
+        value = datetime.fromtimestamp(value, tz=timezone.utc).date()
+    return value.isoformat()
+
+
+def _add_run_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("input", help="JSONL input file")
+    parser.add_argument("-o", "--output", default="-", help="JSONL file results are appended to (default: stdout)")
+    parser.add_argument("--errors", help="JSONL file failed records are also appended to")
+    parser.add_argument("--checkpoint", help="File progress is saved to, to resume interrupted runs")
+    parser.add_argument("--concurrency", type=int, default=8, help="Requests in flight (default: 8)")
+    parser.add_argument("--rate", type=float, help="Maximum requests per second")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m alanube", description="Bulk jobs against the Alanube API.")
+    parser.add_argument("--token", default=os.environ.get("ALANUBE_TOKEN"), help="API token (default: $ALANUBE_TOKEN)")
+    parser.add_argument("--sandbox", action="store_true", help="Use the sandbox environment")
+    parser.add_argument("--http2", action="store_true", help="Use the HTTP/2 transport")
+    parser.add_argument("-v", "--verbose", action="store_true")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    send = subparsers.add_parser("send", help="Send documents from a JSONL file")
+    _add_run_arguments(send)
+    send.add_argument("--validate", action="store_true", help="Validate payloads before sending them")
+    send.set_defaults(func=command_send)
+
+    poll = subparsers.add_parser("poll", help="Fetch the status of documents from a JSONL file")
+    _add_run_arguments(poll)
+    poll.set_defaults(func=command_poll)
+
+    export = subparsers.add_parser("export", help="Export the documents of a type to a file")
+    export.add_argument("type", help="eNCF type (e.g. 31) or 'received'")
+    export.add_argument("output", help="Output file")
+    export.add_argument("--format", default="jsonl", choices=("csv", "jsonl", "parquet", "arrow"))
+    export.add_argument("--company-id")
+    export.add_argument("--status")
+    export.add_argument("--legal-status")
+    export.add_argument("--start", type=_bound, help="First date (YYYY-MM-DD) or Unix timestamp")
+    export.add_argument("--end", type=_bound, help="Last date (YYYY-MM-DD, included) or Unix timestamp")
+    export.add_argument("--limit", type=_page_size, default=100, help="Page size or 'auto' (default: 100)")
+    export.set_defaults(func=command_export)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.WARNING)
+    if not args.token:
+        raise SystemExit("An API token is required: use --token or set ALANUBE_TOKEN.")
+
+    from .api import AlanubeAPI
+
+    AlanubeAPI.connect(args.token, developer_mode=args.sandbox, http2=args.http2)
+    return args.func(args)
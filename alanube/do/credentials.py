@@ -0,0 +1,185 @@
+"""API credentials with hot token rotation.
+
+A `CredentialProvider` holds the current `Credential`: the token, a
+version number and the request headers built from it once, as a read-only
+mapping. `AlanubeAPI.get_headers` returns a copy of them.
+
+`rotate` swaps the current credential atomically. Requests already in
+flight finish with the credential they started with, new requests use the
+new one, and the transport (and its pooled connections) is left alone,
+unlike calling `connect` again. Callbacks registered with `subscribe` run
+after every rotation; `AlanubeAPI` uses one to keep `config.token` current.
+
+Watchers pick up new tokens from the environment or from a file (e.g. a
+mounted secret) in a background thread.
+
+Example:
+----------
+```python
+from alanube.do.api import AlanubeAPI
+from alanube.do.credentials import CredentialProvider, FileTokenWatcher
+
+credentials = CredentialProvider(open("/run/secrets/alanube").read().strip())
+AlanubeAPI.connect(credentials=credentials)
+watcher = FileTokenWatcher(credentials, "/run/secrets/alanube", interval=30).start()
+
+AlanubeAPI.rotate_token("new-token")  # or rotate by hand
+```
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Callable, List, Mapping, Optional
+
+
+logger = logging.getLogger(__package__)
+
+
+def build_headers(token: str) -> Mapping[str, str]:
+    """Return the read-only request headers for `token`."""
+    return MappingProxyType({
+        "Authorization": f"Bearer {token}",
+        "Content-Type": "application/json",
+        "Accept": "application/json",
+        "Accept-Encoding": "gzip, deflate",
+    })
+
+
+@dataclass(frozen=True)
+class Credential:
+    token: str
+    version: int
+    headers: Mapping[str, str]
+
+
+class CredentialProvider:
+    """
+    Thread-safe holder of the current API credential.
+
+    Args:
+    ----------
+    - `token` (str): Initial API token.
+    """
+
+    def __init__(self, token: str):
+        if not token:
+            raise ValueError("A token is required")
+        self._lock = threading.Lock()
+        self._current = Credential(token, 1, build_headers(token))
+        self._subscribers: List[Callable[[Credential], None]] = []
+
+    @property
+    def current(self) -> Credential:
+        # Reading an attribute is atomic; the credential itself is immutable.
+        return self._current
+
+    @property
+    def token(self) -> str:
+        return self._current.token
+
+    def subscribe(self, callback: Callable[[Credential], None]):
+        """Call `callback` with the new credential after each rotation."""
+        with self._lock:
+            if callback not in self._subscribers:
+                self._subscribers.append(callback)
+
+    def rotate(self, token: str) -> Credential:
+        """Make `token` the current credential. Rotating to the same token is a no-op."""
+        if not token:
+            raise ValueError("A token is required")
+        with self._lock:
+            if token == self._current.token:
+                return self._current
+            credential = self._current = Credential(token, self._current.version + 1, build_headers(token))
+            subscribers = list(self._subscribers)
+        logger.info(f"API token rotated (version {credential.version})")
+        for callback in subscribers:
+            callback(credential)
+        return credential
+
+
+class TokenWatcher:
+    """
+    Base class of the watchers: every `interval` seconds reads a token with
+    `read` and rotates `provider` to it when it changed.
+    """
+
+    def __init__(self, provider: CredentialProvider, interval: float = 30.0):
+        self.provider = provider
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def read(self) -> Optional[str]:
+        raise NotImplementedError
+
+    def check(self) -> bool:
+        """Read the token once, returning whether the credential rotated."""
+        try:
+            token = self.read()
+        except OSError as e:
+            logger.warning(f"Could not read the API token: {e}")
+            return False
+        if not token or token == self.provider.token:
+            return False
+        self.provider.rotate(token)
+        return True
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.check()
+
+    def start(self):
+        """Start watching in a daemon thread."""
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name=f"alanube-{type(self).__name__}", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+class EnvTokenWatcher(TokenWatcher):
+    """Watch an environment variable, `ALANUBE_TOKEN` by default."""
+
+    def __init__(self, provider: CredentialProvider, name: str = "ALANUBE_TOKEN", interval: float = 30.0):
+        super().__init__(provider, interval)
+        self.name = name
+
+    def read(self) -> Optional[str]:
+        return os.environ.get(self.name)
+
+
+class FileTokenWatcher(TokenWatcher):
+    """Watch a file holding the token; it is read again only when it changes."""
+
+    def __init__(self, provider: CredentialProvider, path: str, interval: float = 30.0):
+        super().__init__(provider, interval)
+        self.path = path
+        self._signature = None
+        self._token: Optional[str] = None
+
+    def read(self) -> Optional[str]:
+        stat = os.stat(self.path)
+        signature = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+        if signature != self._signature:
+            with open(self.path, encoding="utf-8") as file:
+                self._token = file.read().strip()
+            self._signature = signature
+        return self._token
@@ -1,5 +1,10 @@
+from __future__ import annotations
+
 from typing import Optional
-import requests
+
+from alanube.utils import lazy_import
+
+requests = lazy_import("requests")
 
 
 NON_FIELD_ERRORS = "non_field_errors"
@@ -10,6 +15,37 @@ class AlanubeError(Exception):
     pass
 
 
+class SequenceExhausted(AlanubeError):
+    """Raised when the authorized eNCF range of a document type is exhausted."""
+    pass
+
+
+class SequenceNotConfigured(AlanubeError):
+    """Raised when sequences are reserved for a document type with no configured range."""
+    pass
+
+
+class CassetteMiss(AlanubeError):
+    """Raised when a replayed request has no recorded response."""
+    pass
+
+
+class CircuitOpenError(AlanubeError):
+    """
+    Raised instead of sending a request while the circuit breaker of its
+    endpoint family is open.
+
+    Attributes:
+        family:       endpoint family of the circuit
+        retry_after:  seconds until the circuit lets probe calls through
+    """
+
+    def __init__(self, family: str, retry_after: float = 0.0):
+        self.family = family
+        self.retry_after = retry_after
+        super().__init__(f"Circuit '{family}' is open, retry in {retry_after:.1f}s")
+
+
 class APIError(AlanubeError):
     """
     Exception raised for API errors.
@@ -81,6 +117,11 @@ class InvalidFieldTypeError(ValidationError):
     pass
 
 
+class InvalidResponseError(APIError):
+    """Exception raised when a response does not match its expected schema."""
+    pass
+
+
 class UnexpectedResponseCodeError(APIError):
     """
     Exception raised when the response code is unexpected.
@@ -0,0 +1,230 @@
+"""Streaming export of document listings.
+
+Documents are pulled page by page through the list methods, flattened into
+rows and written in chunks, so memory use is bounded by `chunk_size` no matter
+how many documents are exported.
+
+Supported formats:
+
+- `csv` and `jsonl`: always available.
+- `parquet` and `arrow` (Arrow IPC file): require the optional `pyarrow`
+  dependency (`pip install pyarrow`).
+
+Example:
+----------
+```python
+from alanube.do.api import AlanubeAPI
+from alanube.do.export import export_documents
+
+AlanubeAPI.connect("token")
+export_documents(AlanubeAPI.get_fiscal_invoices, "2024.parquet", format="parquet", start=..., end=...)
+```
+"""
+
+from __future__ import annotations
+
+import csv
+import json
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Union, get_type_hints, is_typeddict
+
+from .pagination import paginate
+from .types import DocumentResponse
+
+
+EXPORT_FORMATS = ("csv", "jsonl", "parquet", "arrow")
+
+
+def _columns_from_typeddict(typeddict, prefix: str = "") -> Dict[str, Any]:
+    columns: Dict[str, Any] = {}
+    for name, hint in get_type_hints(typeddict).items():
+        if is_typeddict(hint):
+            columns.update(_columns_from_typeddict(hint, f"{prefix}{name}."))
+        else:
+            columns[f"{prefix}{name}"] = hint
+    return columns
+
+
+def columns_for(typeddict) -> Dict[str, Any]:
+    """
+    Return the flattened columns of a response TypedDict and their types.
+
+    Nested TypedDicts (e.g. `governmentResponse`) become dotted columns such
+    as `governmentResponse.code`.
+    """
+    return _columns_from_typeddict(typeddict)
+
+
+DOCUMENT_COLUMNS = columns_for(DocumentResponse)
+
+
+def flatten_document(document: Dict[str, Any], prefix: str = "") -> Dict[str, Any]:
+    """
+    Flatten a document into a single level dict.
+
+    Nested dicts are expanded into dotted keys and lists are encoded as JSON
+    strings so every value fits in a single cell.
+    """
+    row: Dict[str, Any] = {}
+    for key, value in document.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            row.update(flatten_document(value, f"{name}."))
+        elif isinstance(value, (list, tuple)):
+            row[name] = json.dumps(value, ensure_ascii=False)
+        else:
+            row[name] = value
+    return row
+
+
+def _chunks(iterable: Iterable, size: int) -> Iterator[List]:
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class CSVExportWriter:
+    def __init__(self, path: str, columns: List[str], types: Optional[Dict[str, Any]] = None):
+        self.file = open(path, "w", newline="", encoding="utf-8")
+        self.writer = csv.DictWriter(self.file, fieldnames=columns, extrasaction="ignore")
+        self.writer.writeheader()
+
+    def write_rows(self, rows: List[Dict[str, Any]]):
+        self.writer.writerows(rows)
+
+    def close(self):
+        self.file.close()
+
+
+class JSONLExportWriter:
+    def __init__(self, path: str, columns: List[str], types: Optional[Dict[str, Any]] = None):
+        self.file = open(path, "w", encoding="utf-8")
+        self.columns = columns
+
+    def write_rows(self, rows: List[Dict[str, Any]]):
+        self.file.writelines(
+            json.dumps({c: row.get(c) for c in self.columns}, ensure_ascii=False) + "\n"
+            for row in rows
+        )
+
+    def close(self):
+        self.file.close()
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+    except ImportError as e:
+        raise ImportError("Exporting to Parquet/Arrow requires pyarrow. Install it with `pip install pyarrow`.") from e
+    return pyarrow
+
+
+class ArrowExportWriter:
+    """Writes Arrow IPC files (or Parquet files with `parquet=True`)."""
+
+    def __init__(self, path: str, columns: List[str], types: Optional[Dict[str, Any]] = None, parquet: bool = False):
+        pa = self.pa = _import_pyarrow()
+        arrow_types = {str: pa.string(), int: pa.int64(), bool: pa.bool_(), float: pa.float64()}
+        types = types or {}
+        # Unknown or complex types (lists, literals) are exported as strings.
+        self.schema = pa.schema([(c, arrow_types.get(types.get(c), pa.string())) for c in columns])
+        self._stringify = [c for c in columns if self.schema.field(c).type == pa.string()]
+        if parquet:
+            import pyarrow.parquet as pq
+            self.writer = pq.ParquetWriter(path, self.schema)
+        else:
+            import pyarrow.ipc
+            self.writer = pyarrow.ipc.new_file(path, self.schema)
+
+    def write_rows(self, rows: List[Dict[str, Any]]):
+        for row in rows:
+            for c in self._stringify:
+                value = row.get(c)
+                if value is not None and not isinstance(value, str):
+                    row[c] = str(value)
+        self.writer.write_table(self.pa.Table.from_pylist(rows, schema=self.schema))
+
+    def close(self):
+        self.writer.close()
+
+
+def _get_writer(format: str, path: str, columns: List[str], types: Optional[Dict[str, Any]]):
+    if format == "csv":
+        return CSVExportWriter(path, columns, types)
+    if format == "jsonl":
+        return JSONLExportWriter(path, columns, types)
+    if format == "parquet":
+        return ArrowExportWriter(path, columns, types, parquet=True)
+    if format == "arrow":
+        return ArrowExportWriter(path, columns, types)
+    raise ValueError(f"Unsupported export format: {format!r}. Allowed: {EXPORT_FORMATS}")
+
+
+def write_documents(
+    documents: Iterable[Dict[str, Any]],
+    path: str,
+    format: str = "csv",
+    columns: Optional[Iterable[str]] = None,
+    types: Optional[Dict[str, Any]] = None,
+    chunk_size: int = 1000,
+) -> int:
+    """
+    Flatten and write documents to `path`, `chunk_size` rows at a time.
+
+    When `columns` is not given the columns of `DocumentResponse` are used.
+    Keys not listed in `columns` are dropped. If `columns` is a mapping such
+    as the one returned by `columns_for`, its values are used as `types`.
+
+    Returns the number of written rows.
+    """
+    if chunk_size <= 0:
+        raise ValueError("chunk_size must be greater than zero.")
+    if columns is None:
+        columns = DOCUMENT_COLUMNS
+    if types is None and isinstance(columns, dict):
+        types = columns
+    writer = _get_writer(format, path, list(columns), types)
+    count = 0
+    try:
+        for chunk in _chunks(documents, chunk_size):
+            writer.write_rows([flatten_document(document) for document in chunk])
+            count += len(chunk)
+    finally:
+        writer.close()
+    return count
+
+
+def export_documents(
+    func: Callable[..., Dict[str, Any]],
+    path: str,
+    format: str = "csv",
+    columns: Optional[Iterable[str]] = None,
+    types: Optional[Dict[str, Any]] = None,
+    chunk_size: int = 1000,
+    limit: Union[int, str] = 25,
+    **params,
+) -> int:
+    """
+    Export every document returned by a list method to a file.
+
+    Args:
+    ----------
+    - `func`: A list method, e.g. `AlanubeAPI.get_fiscal_invoices`.
+    - `path` (str): Output file.
+    - `format` (str): One of `csv`, `jsonl`, `parquet` or `arrow`.
+    - `columns`: Flattened columns to export. Defaults to `DocumentResponse`
+      columns; use `columns_for(ReceivedDocumentsResponse)` for received
+      documents.
+    - `types`: Column types, used for the Arrow schema.
+    - `chunk_size` (int): Number of rows buffered before each write.
+    - `limit` (int): Page size used for the list requests, or `"auto"`
+      (see `alanube.do.pagination`).
+    - `params`: Filters forwarded to `func` (`company_id`, `start`, ...).
+
+    Returns the number of exported documents.
+    """
+    documents = paginate(func, limit=limit, **params)
+    return write_documents(documents, path, format=format, columns=columns, types=types, chunk_size=chunk_size)
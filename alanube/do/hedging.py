@@ -0,0 +1,232 @@
+"""Hedged GET requests and adaptive timeouts.
+
+Status reads (`get_invoice`, `get_fiscal_invoice`, ...) usually answer in
+a few hundred milliseconds, but a small fraction takes seconds. Waiting for
+those dominates the tail latency. With a `HedgingPolicy` configured,
+`AlanubeAPI.get`:
+
+- tracks the latency of every GET per endpoint in a rolling window;
+- sends a duplicate (hedge) of a GET that has not answered once its
+  endpoint's observed p95 has passed, and uses whichever response arrives
+  first;
+- sets the timeout of each GET from the endpoint's p99 (times
+  `timeout_multiplier`, clamped to `[min_timeout, max_timeout]`).
+
+Hedges are limited to `budget` of the requests (10% by default) so a slow
+API does not get twice the load. Until an endpoint has `min_samples`
+measurements, its GETs are neither hedged nor given an adaptive timeout.
+GETs that cannot be hedged (endpoint not warmed up, budget spent) are sent
+on the caller's thread; only the others go through the policy's threads,
+so that the caller can return the hedge while the first request is stuck.
+
+A GET that times out is recorded with its timeout as latency (a censored
+sample: it took at least that long), so the window keeps seeing the slow
+tail instead of only the requests that beat the current timeout.
+
+Endpoints are identified by their path with ids replaced by `{id}`, e.g.
+`/dom/v1/invoices/{id}`.
+
+Example:
+----------
+```python
+from alanube.do.hedging import HedgingPolicy
+
+Alanube.connect("token", developer_mode=False, hedging=HedgingPolicy())
+```
+"""
+
+from __future__ import annotations
+
+import re
+import threading
+import time
+from bisect import insort
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Deque, Dict, List, Optional
+from urllib.parse import urlsplit
+
+from .metrics import Metrics
+
+
+_VERSION = re.compile(r"^v\d+$")
+
+
+def _is_id(segment: str) -> bool:
+    return any(c.isdigit() for c in segment) and not _VERSION.match(segment)
+
+
+def is_timeout(error: BaseException) -> bool:
+    """Whether `error` is a timeout of any transport (`requests`, `httpx`, sockets)."""
+    return isinstance(error, TimeoutError) or any("Timeout" in cls.__name__ for cls in type(error).__mro__)
+
+
+def endpoint_key(url: str) -> str:
+    """Return the path of `url` with id segments replaced by `{id}`."""
+    return "/".join("{id}" if _is_id(segment) else segment for segment in urlsplit(url).path.split("/"))
+
+
+class LatencyWindow:
+    """The last `size` latencies of an endpoint, kept sorted for percentiles."""
+
+    def __init__(self, size: int):
+        self._values: Deque[float] = deque(maxlen=size)
+        self._sorted: List[float] = []
+
+    def __len__(self):
+        return len(self._values)
+
+    def add(self, value: float):
+        if len(self._values) == self._values.maxlen:
+            self._sorted.remove(self._values[0])
+        self._values.append(value)
+        insort(self._sorted, value)
+
+    def percentile(self, q: float) -> float:
+        return self._sorted[min(len(self._sorted) - 1, int(q * len(self._sorted)))]
+
+
+class HedgingPolicy:
+    """
+    Hedging and adaptive timeouts for idempotent GETs.
+
+    Args:
+    ----------
+    - `hedge_quantile` (float): Latency quantile after which a hedge is sent.
+    - `timeout_quantile` (float): Latency quantile the timeout is based on.
+    - `timeout_multiplier` (float): Factor applied to that quantile.
+    - `min_timeout`, `max_timeout` (float): Bounds of the timeout, in seconds.
+    - `default_timeout` (float): Optional, timeout of endpoints without
+      enough samples.
+    - `min_samples` (int): Samples needed before hedging an endpoint.
+    - `window` (int): Number of latencies kept per endpoint.
+    - `budget` (float): Maximum fraction of the requests that are hedged.
+    - `max_workers` (int): Threads running the requests that may be hedged.
+    - `metrics` (Metrics): Optional, records hedges, wins and timeouts.
+    """
+
+    def __init__(
+        self,
+        hedge_quantile: float = 0.95,
+        timeout_quantile: float = 0.99,
+        timeout_multiplier: float = 3.0,
+        min_timeout: float = 1.0,
+        max_timeout: float = 30.0,
+        default_timeout: Optional[float] = None,
+        min_samples: int = 20,
+        window: int = 500,
+        budget: float = 0.1,
+        max_workers: int = 32,
+        metrics: Optional[Metrics] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.hedge_quantile = hedge_quantile
+        self.timeout_quantile = timeout_quantile
+        self.timeout_multiplier = timeout_multiplier
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.default_timeout = default_timeout
+        self.min_samples = min_samples
+        self.window = window
+        self.budget = budget
+        self.metrics = metrics
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._windows: Dict[str, LatencyWindow] = {}
+        self._requests = 0
+        self._hedges = 0
+        self._closed = False
+        self._executor = ThreadPoolExecutor(max_workers, thread_name_prefix="alanube-hedging")
+
+    def record(self, key: str, seconds: float):
+        with self._lock:
+            window = self._windows.get(key)
+            if window is None:
+                window = self._windows[key] = LatencyWindow(self.window)
+            window.add(seconds)
+
+    def percentile(self, key: str, q: float) -> Optional[float]:
+        """Latency quantile `q` of an endpoint, or None without enough samples."""
+        with self._lock:
+            window = self._windows.get(key)
+            if window is None or len(window) < self.min_samples:
+                return None
+            return window.percentile(q)
+
+    def hedge_delay(self, key: str) -> Optional[float]:
+        return self.percentile(key, self.hedge_quantile)
+
+    def timeout(self, key: str) -> Optional[float]:
+        latency = self.percentile(key, self.timeout_quantile)
+        if latency is None:
+            return self.default_timeout
+        return min(self.max_timeout, max(self.min_timeout, latency * self.timeout_multiplier))
+
+    def _can_hedge(self) -> bool:
+        return self._hedges + 1 <= self.budget * self._requests
+
+    def _take_hedge(self) -> bool:
+        with self._lock:
+            if not self._can_hedge():
+                return False
+            self._hedges += 1
+            return True
+
+    def _attempt(self, key: str, send: Callable[[Optional[float]], Any], timeout: Optional[float]):
+        start = self.clock()
+        try:
+            response = send(timeout)
+        except Exception as e:
+            if is_timeout(e):
+                self.record(key, max(self.clock() - start, timeout or 0))
+                self._incr(f"hedging.{key}.timeouts")
+            raise
+        self.record(key, self.clock() - start)
+        return response
+
+    def _incr(self, name: str):
+        if self.metrics is not None:
+            self.metrics.incr(name)
+
+    def call(self, url: str, send: Callable[[Optional[float]], Any]) -> Any:
+        """
+        Run `send(timeout)`, a GET to `url`, hedging it when it is slower than
+        the endpoint's usual latency. Returns the first response.
+        """
+        if self._closed:
+            raise RuntimeError("HedgingPolicy is closed")
+        key = endpoint_key(url)
+        timeout = self.timeout(key)
+        delay = self.hedge_delay(key)
+        with self._lock:
+            self._requests += 1
+            hedgeable = delay is not None and self._can_hedge()
+        if not hedgeable:
+            return self._attempt(key, send, timeout)
+
+        primary = self._executor.submit(self._attempt, key, send, timeout)
+        done, _ = wait([primary], timeout=delay)
+        if done or not self._take_hedge():
+            return primary.result()
+
+        self._incr(f"hedging.{key}.hedged")
+        hedge = self._executor.submit(self._attempt, key, send, timeout)
+        pending = {primary, hedge}
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is hedge:
+                        self._incr(f"hedging.{key}.hedge_won")
+                    return future.result()
+                error = error or future.exception()
+        raise error
+
+    def close(self):
+        """
+        Stop the policy. Attempts not started yet are cancelled, and the ones
+        running (e.g. the loser of a hedge) are waited for.
+        """
+        self._closed = True
+        self._executor.shutdown(wait=True, cancel_futures=True)
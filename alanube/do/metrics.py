@@ -0,0 +1,78 @@
+"""In-process client metrics.
+
+`Metrics` is a small thread-safe registry of counters, gauges and summaries
+(count/sum/min/max of observed values). `AlanubeAPI.metrics` holds the
+client's metrics; `snapshot()` returns them as a plain dict that can be
+exported to any monitoring system.
+"""
+
+from __future__ import annotations
+
+import threading
+from typing import Any, Dict
+
+
+class Summary:
+    __slots__ = ("count", "total", "min", "max")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = float("inf")
+        self.max = float("-inf")
+
+    def observe(self, value: float):
+        self.count += 1
+        self.total += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def as_dict(self) -> Dict[str, float]:
+        return {
+            "count": self.count,
+            "sum": self.total,
+            "avg": self.total / self.count if self.count else 0.0,
+            "min": self.min if self.count else 0.0,
+            "max": self.max if self.count else 0.0,
+        }
+
+
+class Metrics:
+    """Thread-safe registry of counters, gauges and summaries."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters: Dict[str, float] = {}
+        self.gauges: Dict[str, Any] = {}
+        self.summaries: Dict[str, Summary] = {}
+
+    def incr(self, name: str, value: float = 1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def set_gauge(self, name: str, value: Any):
+        with self._lock:
+            self.gauges[name] = value
+
+    def observe(self, name: str, value: float):
+        with self._lock:
+            summary = self.summaries.get(name)
+            if summary is None:
+                summary = self.summaries[name] = Summary()
+            summary.observe(value)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "counters": dict(self.counters),
+                "gauges": dict(self.gauges),
+                "summaries": {name: summary.as_dict() for name, summary in self.summaries.items()},
+            }
+
+    def reset(self):
+        with self._lock:
+            self.counters.clear()
+            self.gauges.clear()
+            self.summaries.clear()
@@ -0,0 +1,244 @@
+"""Compact document models.
+
+The API methods return plain dicts annotated with the TypedDicts of
+`alanube.do.types`. Dicts carry a per-instance hash table, which adds up when
+hundreds of thousands of documents are kept in memory. The classes here are
+generated from those TypedDicts and store each field in a `__slots__` slot
+instead, which roughly halves the memory held per document.
+
+Parsing is lazy: nested objects (`governmentResponse`) and date fields are
+kept as received and only converted the first time they are accessed. The
+converted value is cached next to the received one, so `to_dict` and `==`
+always see the data as the API sent it.
+Repeated low-cardinality values (statuses, RNCs) are interned so equal
+strings are shared across documents.
+
+Example:
+----------
+```python
+page = AlanubeAPI.get_fiscal_invoices(parse=True)
+document = page["documents"][0]
+document.status               # "FINISHED"
+document.stampDate            # datetime.datetime(...)
+document.governmentResponse.code
+document.to_dict()
+```
+"""
+
+from __future__ import annotations
+
+import re
+import sys
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional, Tuple, get_args, get_origin, get_type_hints, is_typeddict
+
+from .types import DocumentResponse, ReceivedDocumentsResponse
+
+
+DATE_FIELDS = frozenset({
+    "stampDate",
+    "signatureDate",
+    "documentStampDate",
+    "signatureDateTime",
+    "timestamp",
+})
+
+INTERNED_FIELDS = frozenset({
+    "status",
+    "legalStatus",
+    "companyIdentification",
+    "issuerIdentification",
+    "buyerIdentification",
+    "documentType",
+    "commercialResponse",
+})
+
+DATE_FORMATS = ("%d-%m-%Y %H:%M:%S", "%d-%m-%Y")
+
+# Fast path for the `DATE_FORMATS`, `strptime` being slow.
+_DMY_RE = re.compile(r"(\d{2})-(\d{2})-(\d{4})(?: (\d{2}):(\d{2}):(\d{2}))?")
+
+
+def parse_date(value):
+    """
+    Parse the date formats used by the API.
+
+    Returns the value unchanged when it is not a string or cannot be parsed.
+    """
+    if not isinstance(value, str):
+        return value
+    match = _DMY_RE.fullmatch(value)
+    if match is not None:
+        day, month, year, hour, minute, second = match.groups()
+        try:
+            return datetime(int(year), int(month), int(day), int(hour or 0), int(minute or 0), int(second or 0))
+        except ValueError:
+            return value
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        pass
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+    return value
+
+
+class Model:
+    """Base class for the generated models."""
+
+    __slots__ = ("_extra",)
+    _fields: Tuple[str, ...] = ()
+    _slots_map: Dict[str, str] = {}
+
+    def __init__(self, **kwargs):
+        extra = None
+        for key, value in kwargs.items():
+            if key in self._fields:
+                if key in INTERNED_FIELDS and isinstance(value, str):
+                    value = sys.intern(value)
+                object.__setattr__(self, _slot_name(type(self), key), value)
+            else:
+                if extra is None:
+                    extra = {}
+                extra[key] = value
+        for key in self._fields:
+            slot = _slot_name(type(self), key)
+            if not hasattr(self, slot):
+                object.__setattr__(self, slot, None)
+        self._extra = extra
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]):
+        """Build an instance from an API response dict."""
+        return cls(**data)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Return the document as a plain dict, with the values as received.
+
+        Date fields set to a `date`/`datetime` are returned in ISO 8601 format.
+        """
+        data = {}
+        for key in self._fields:
+            value = getattr(self, _slot_name(type(self), key))
+            if isinstance(value, Model):
+                value = value.to_dict()
+            elif isinstance(value, list):
+                value = [v.to_dict() if isinstance(v, Model) else v for v in value]
+            elif isinstance(value, (date, datetime)):
+                value = value.isoformat()
+            data[key] = value
+        if self._extra:
+            data.update(self._extra)
+        return data
+
+    def __getitem__(self, key: str):
+        if key in self._fields:
+            return getattr(self, key)
+        if self._extra and key in self._extra:
+            return self._extra[key]
+        raise KeyError(key)
+
+    def get(self, key: str, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __eq__(self, other):
+        if not isinstance(other, Model):
+            return NotImplemented
+        return type(self) is type(other) and self.to_dict() == other.to_dict()
+
+    def __repr__(self):
+        identifier = getattr(self, "id", None) if "id" in self._fields else None
+        return f"<{type(self).__name__} id={identifier!r}>" if identifier else f"<{type(self).__name__}>"
+
+
+_MODELS: Dict[Any, type] = {}
+
+
+def _slot_name(cls, field: str) -> str:
+    return cls._slots_map.get(field, field)
+
+
+def _lazy_property(field: str, slot: str, cache: str, convert):
+    # `slot` keeps the received value, `cache` the converted one once read.
+    def getter(self):
+        try:
+            return getattr(self, cache)
+        except AttributeError:
+            converted = convert(getattr(self, slot))
+            object.__setattr__(self, cache, converted)
+            return converted
+
+    def setter(self, value):
+        object.__setattr__(self, slot, value)
+        if hasattr(self, cache):
+            object.__delattr__(self, cache)
+
+    return property(getter, setter, doc=f"`{field}`, parsed on first access.")
+
+
+def _nested_converter(model):
+    def convert(value):
+        return model.from_dict(value) if isinstance(value, dict) else value
+    return convert
+
+
+def _nested_list_converter(model):
+    def convert(value):
+        if isinstance(value, list) and any(isinstance(v, dict) for v in value):
+            return [model.from_dict(v) if isinstance(v, dict) else v for v in value]
+        return value
+    return convert
+
+
+def _date_converter(value):
+    return parse_date(value) if isinstance(value, str) else value
+
+
+def make_model(typeddict, name: Optional[str] = None) -> type:
+    """
+    Generate (once) a `__slots__` model class from a response TypedDict.
+
+    Nested TypedDicts and lists of TypedDicts become nested models, date
+    fields are parsed to `datetime`. Both conversions happen lazily.
+    """
+    if typeddict in _MODELS:
+        return _MODELS[typeddict]
+
+    hints = get_type_hints(typeddict)
+    namespace: Dict[str, Any] = {"__doc__": f"Slotted model for `{typeddict.__name__}`."}
+    slots: List[str] = []
+    slots_map: Dict[str, str] = {}
+    for field, hint in hints.items():
+        convert = None
+        if is_typeddict(hint):
+            convert = _nested_converter(make_model(hint))
+        elif get_origin(hint) in (list, List) and get_args(hint) and is_typeddict(get_args(hint)[0]):
+            convert = _nested_list_converter(make_model(get_args(hint)[0]))
+        elif field in DATE_FIELDS:
+            convert = _date_converter
+
+        if convert is None:
+            slots.append(field)
+        else:
+            slot, cache = f"_{field}", f"_{field}_parsed"
+            slots.extend((slot, cache))
+            slots_map[field] = slot
+            namespace[field] = _lazy_property(field, slot, cache, convert)
+
+    namespace["__slots__"] = tuple(slots)
+    namespace["_fields"] = tuple(hints)
+    namespace["_slots_map"] = slots_map
+    model = type(name or typeddict.__name__.replace("Response", ""), (Model,), namespace)
+    _MODELS[typeddict] = model
+    return model
+
+
+Document = make_model(DocumentResponse, "Document")
+ReceivedDocument = make_model(ReceivedDocumentsResponse, "ReceivedDocument")
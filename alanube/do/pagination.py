@@ -0,0 +1,225 @@
+"""Auto-pagination over the Alanube list endpoints.
+
+The list endpoints (`get_fiscal_invoices`, `get_received_documents`,
+`get_cancellations`, ...) return one page at a time. The helpers here walk
+the pages lazily so callers can process arbitrarily long listings while only
+holding one page in memory.
+
+With `limit="auto"` the page size is tuned while paging: the latency of
+every page is measured and the size moves along `PageSizeTuner.sizes`
+towards the one fetching the most documents per second whose pages still
+answer within `max_latency`. The chosen size is remembered per endpoint for
+the next scans, and the decisions are recorded in `AlanubeAPI.metrics`
+(`pagination.<endpoint>.*`).
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, Optional, Sequence, Union
+
+
+logger = logging.getLogger(__package__)
+
+AUTO = "auto"
+
+
+@dataclass
+class PageStats:
+    """Smoothed measurements of the pages fetched with one page size."""
+    latency: float
+    rate: float
+    pages: int = 1
+
+
+@dataclass
+class EndpointState:
+    size: int
+    stats: Dict[int, PageStats]
+
+
+class PageSizeTuner:
+    """
+    Page size tuning for `limit="auto"`, per endpoint.
+
+    Sizes double from one step to the next, so a scan can always switch to a
+    smaller size and switches to a larger one once the documents fetched so
+    far are a multiple of it.
+
+    Args:
+    ----------
+    - `sizes`: Allowed page sizes, each twice the previous one.
+    - `start` (int): Size of the first scan of an endpoint.
+    - `max_latency` (float): Seconds a page may take.
+    - `smoothing` (float): Weight of the last page in the averages.
+    - `metrics`: Optional, defaults to `AlanubeAPI.metrics`.
+    - `clock`: Time source, `time.perf_counter` by default.
+    """
+
+    def __init__(
+        self,
+        sizes: Sequence[int] = (25, 50, 100, 200, 400),
+        start: int = 100,
+        max_latency: float = 2.0,
+        smoothing: float = 0.3,
+        metrics=None,
+        clock: Callable[[], float] = time.perf_counter,
+    ):
+        sizes = tuple(sizes)
+        if any(b != 2 * a for a, b in zip(sizes, sizes[1:])):
+            raise ValueError("Each page size must be twice the previous one")
+        if start not in sizes:
+            raise ValueError(f"start must be one of {sizes}")
+        self.sizes = sizes
+        self.start = start
+        self.max_latency = max_latency
+        self.smoothing = smoothing
+        self.metrics = metrics
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._endpoints: Dict[str, EndpointState] = {}
+
+    def _metrics(self):
+        if self.metrics is None:
+            from .api import AlanubeAPI
+
+            return AlanubeAPI.metrics
+        return self.metrics
+
+    def size(self, endpoint: str) -> int:
+        """Page size to use for `endpoint`."""
+        with self._lock:
+            state = self._endpoints.get(endpoint)
+            return state.size if state else self.start
+
+    def record(self, endpoint: str, size: int, documents: int, seconds: float) -> int:
+        """Record a full page fetched with `size` and return the best size."""
+        rate = documents / seconds if seconds > 0 else float("inf")
+        with self._lock:
+            state = self._endpoints.setdefault(endpoint, EndpointState(size, {}))
+            stats = state.stats.get(size)
+            if stats is None:
+                state.stats[size] = PageStats(seconds, rate)
+            else:
+                alpha = self.smoothing
+                stats.latency += alpha * (seconds - stats.latency)
+                stats.rate += alpha * (rate - stats.rate)
+                stats.pages += 1
+            best = self._choose(state.stats, size)
+            state.size = best
+
+        metrics = self._metrics()
+        prefix = f"pagination.{endpoint}"
+        metrics.observe(f"{prefix}.page_seconds", seconds)
+        metrics.observe(f"{prefix}.documents_per_second", rate)
+        metrics.set_gauge(f"{prefix}.page_size", best)
+        if best != size:
+            metrics.incr(f"{prefix}.resized")
+            logger.debug(f"{endpoint}: page size {size} -> {best} ({rate:.0f} documents/s, {seconds:.3f}s/page)")
+        return best
+
+    def _choose(self, stats: Dict[int, PageStats], size: int) -> int:
+        index = self.sizes.index(size)
+        current = stats[size]
+        if current.latency > self.max_latency:
+            return self.sizes[index - 1] if index else size
+        within = {s: st for s, st in stats.items() if st.latency <= self.max_latency}
+        best = max(within, key=lambda s: within[s].rate)
+        if best == size and index + 1 < len(self.sizes):
+            larger = self.sizes[index + 1]
+            # Try the next size while its pages are expected to answer in time.
+            if larger not in stats and current.latency * 2 <= self.max_latency:
+                return larger
+        return best
+
+    def reset(self, endpoint: Optional[str] = None):
+        with self._lock:
+            if endpoint is None:
+                self._endpoints.clear()
+            else:
+                self._endpoints.pop(endpoint, None)
+
+
+page_size_tuner = PageSizeTuner()
+
+
+def _endpoint_name(func: Callable) -> str:
+    return getattr(func, "__name__", None) or type(func).__name__
+
+
+def _iter_pages_auto(
+    func: Callable[..., Dict[str, Any]],
+    page: int,
+    tuner: PageSizeTuner,
+    params: Dict[str, Any],
+) -> Iterator[Dict[str, Any]]:
+    endpoint = _endpoint_name(func)
+    size = tuner.size(endpoint)
+    # Documents before the current page; `page` counts pages of the first size.
+    offset = (page - 1) * size
+    while True:
+        start = tuner.clock()
+        data = func(limit=size, page=offset // size + 1, **params)
+        elapsed = tuner.clock() - start
+        documents = data.get("documents") or []
+        yield data
+        if len(documents) < size:
+            return
+        offset += size
+        best = tuner.record(endpoint, size, len(documents), elapsed)
+        # A page of the new size must start right after the documents seen.
+        if best < size or offset % best == 0:
+            size = best
+
+
+def iter_pages(
+    func: Callable[..., Dict[str, Any]],
+    limit: Union[int, str] = 25,
+    page: int = 1,
+    tuner: Optional[PageSizeTuner] = None,
+    **params,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Yield the pages returned by a list method, starting at `page`.
+
+    Iteration stops after the first page holding fewer than `limit`
+    documents, which is how the API signals the last page.
+
+    Args:
+    ----------
+    - `func`: A list method, e.g. `AlanubeAPI.get_fiscal_invoices`.
+    - `limit` (int): Number of documents requested per page, or `"auto"` to
+      tune it while paging (see `PageSizeTuner`).
+    - `page` (int): First page to request.
+    - `tuner` (PageSizeTuner): Optional, tuner used with `limit="auto"`,
+      defaults to `page_size_tuner`.
+    - `params`: Additional filters forwarded to `func`.
+    """
+    if limit == AUTO:
+        yield from _iter_pages_auto(func, page, tuner or page_size_tuner, params)
+        return
+    while True:
+        data = func(limit=limit, page=page, **params)
+        documents = data.get("documents") or []
+        yield data
+        if len(documents) < limit:
+            return
+        page += 1
+
+
+def paginate(
+    func: Callable[..., Dict[str, Any]],
+    limit: Union[int, str] = 25,
+    page: int = 1,
+    **params,
+) -> Iterator[Any]:
+    """
+    Yield every document returned by a list method across all its pages.
+
+    See `iter_pages` for the arguments.
+    """
+    for data in iter_pages(func, limit=limit, page=page, **params):
+        yield from data.get("documents") or []
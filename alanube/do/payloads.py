@@ -0,0 +1,352 @@
+"""Pre-flight validation of document payloads.
+
+`validators.py` checks query parameters only. This module checks the bodies
+sent by the `send_*` methods, so payloads that the API would certainly reject
+are caught before a round trip is spent on them.
+
+Each eNCF type has a `PayloadSchema`: a list of rules (required fields,
+patterns, allowed codes and totals arithmetic) compiled once into plain
+closures. Validating a payload is then a single pass over those closures,
+fast enough to check thousands of payloads per second, and `check_payloads`
+can spread a batch over a process pool.
+
+The schemas assume the Alanube JSON layout:
+
+```python
+{
+    "idDoc": {"encf": "E310000000001", ...},
+    "sender": {"rnc": "101010101", ...},
+    "buyer": {"rnc": "131313131", ...},
+    "otherCurrency": {"currencyType": "USD", ...},
+    "informationReference": {"modifiedEncf": "E310000000001", ...},
+    "itemDetails": [
+        {"quantityItem": 2, "unitMeasure": 43, "unitPriceItem": 50,
+         "discountAmount": 0, "surchargeAmount": 0, "itemAmount": 100},
+    ],
+    "totals": {"totalTaxedAmount": 100, "exemptAmount": 0, "itbisTotal": 18, "additionalTaxAmount": 0, "totalAmount": 118},
+}
+```
+
+Schemas can be extended or replaced through `SCHEMAS`.
+"""
+
+from __future__ import annotations
+
+import re
+from concurrent.futures import ProcessPoolExecutor
+from decimal import Decimal, InvalidOperation
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from .config import CURRENCIES, UNIT_MEASURES
+from .exceptions import ValidationError
+from .validators import IDENTIFICATION_PATTERN
+
+
+Errors = Dict[str, List[str]]
+
+ENCF_TYPES = (31, 32, 33, 34, 41, 43, 44, 45, 46, 47)
+
+# Tolerance accepted by the DGII when comparing computed amounts.
+DEFAULT_TOLERANCE = Decimal("1.00")
+
+_MISSING = object()
+
+
+def _getter(path: str) -> Callable[[Any], Any]:
+    parts = tuple(path.split("."))
+
+    def get(data):
+        for part in parts:
+            if not isinstance(data, dict):
+                return _MISSING
+            data = data.get(part, _MISSING)
+            if data is _MISSING:
+                return _MISSING
+        return data
+    return get
+
+
+def _to_decimal(value) -> Optional[Decimal]:
+    if value is None or value is _MISSING or isinstance(value, bool):
+        return None
+    try:
+        return Decimal(str(value))
+    except (InvalidOperation, ValueError):
+        return None
+
+
+class Rule:
+    """
+    A single validation rule over the field at `path`.
+
+    `compile` returns a function `(payload, errors) -> None` that appends
+    messages to `errors` under the rule's path.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def compile(self) -> Callable[[Any, Errors], None]:
+        raise NotImplementedError
+
+
+class Required(Rule):
+    def compile(self):
+        get, path = _getter(self.path), self.path
+
+        def check(payload, errors):
+            value = get(payload)
+            if value is _MISSING or value is None or value == "" or value == []:
+                errors.setdefault(path, []).append("This field is required.")
+        return check
+
+
+class Pattern(Rule):
+    def __init__(self, path: str, pattern, message: Optional[str] = None):
+        super().__init__(path)
+        self.pattern = re.compile(pattern) if isinstance(pattern, str) else pattern
+        self.message = message or f"Does not match {self.pattern.pattern}."
+
+    def compile(self):
+        get, path, match, message = _getter(self.path), self.path, self.pattern.match, self.message
+
+        def check(payload, errors):
+            value = get(payload)
+            if value is _MISSING or value is None:
+                return
+            if not isinstance(value, str) or not match(value):
+                errors.setdefault(path, []).append(message)
+        return check
+
+
+def _int_code(value):
+    """Numeric codes may be sent as strings, e.g. `"43"`."""
+    if isinstance(value, str) and value.strip().isdigit():
+        return int(value)
+    return value
+
+
+class Choice(Rule):
+    """
+    Check that the field at `path` is one of `choices`, after `normalize`
+    when given.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        choices: Iterable,
+        message: Optional[str] = None,
+        normalize: Optional[Callable[[Any], Any]] = None,
+    ):
+        super().__init__(path)
+        self.choices = frozenset(choices)
+        self.message = message or "Invalid choice."
+        self.normalize = normalize
+
+    def compile(self):
+        get, path, choices, message, normalize = _getter(self.path), self.path, self.choices, self.message, self.normalize
+
+        def check(payload, errors):
+            value = get(payload)
+            if value is _MISSING or value is None:
+                return
+            if (normalize(value) if normalize is not None else value) not in choices:
+                errors.setdefault(path, []).append(f"{message} Got {value!r}.")
+        return check
+
+
+class NonNegative(Rule):
+    def compile(self):
+        get, path = _getter(self.path), self.path
+
+        def check(payload, errors):
+            value = get(payload)
+            if value is _MISSING or value is None:
+                return
+            number = _to_decimal(value)
+            if number is None:
+                errors.setdefault(path, []).append("Must be a number.")
+            elif number < 0:
+                errors.setdefault(path, []).append("Must be greater than or equal to zero.")
+        return check
+
+
+class Items(Rule):
+    """Apply `rules` to every element of the list at `path`."""
+
+    def __init__(self, path: str, rules: Sequence[Rule], required: bool = True):
+        super().__init__(path)
+        self.rules = rules
+        self.required = required
+
+    def compile(self):
+        get, path, required = _getter(self.path), self.path, self.required
+        checks = [rule.compile() for rule in self.rules]
+
+        def check(payload, errors):
+            items = get(payload)
+            if items is _MISSING or items is None:
+                if required:
+                    errors.setdefault(path, []).append("This field is required.")
+                return
+            if not isinstance(items, list) or (required and not items):
+                errors.setdefault(path, []).append("Must be a non-empty list.")
+                return
+            for index, item in enumerate(items):
+                item_errors: Errors = {}
+                for item_check in checks:
+                    item_check(item, item_errors)
+                for key, messages in item_errors.items():
+                    errors.setdefault(f"{path}[{index}].{key}", []).extend(messages)
+        return check
+
+
+class Sum(Rule):
+    """
+    Check that the field at `path` equals the sum of `terms`.
+
+    Terms prefixed with `-` are subtracted. A `*` between two paths
+    multiplies them. Missing terms count as zero; the rule is skipped when
+    the field at `path` or all the terms are missing.
+    """
+
+    def __init__(self, path: str, terms: Sequence[str], tolerance: Decimal = DEFAULT_TOLERANCE):
+        super().__init__(path)
+        self.terms = terms
+        self.tolerance = tolerance
+
+    def compile(self):
+        get, path, tolerance = _getter(self.path), self.path, self.tolerance
+        compiled: List[Tuple[int, List[Callable]]] = []
+        for term in self.terms:
+            sign = -1 if term.startswith("-") else 1
+            compiled.append((sign, [_getter(p) for p in term.lstrip("-").split("*")]))
+
+        def check(payload, errors):
+            expected = _to_decimal(get(payload))
+            if expected is None:
+                return
+            total = Decimal(0)
+            found = False
+            for sign, factors in compiled:
+                product = Decimal(1)
+                for factor in factors:
+                    value = _to_decimal(factor(payload))
+                    if value is None:
+                        product = Decimal(0)
+                        break
+                    found = True
+                    product *= value
+                total += sign * product
+            if found and abs(total - expected) > tolerance:
+                errors.setdefault(path, []).append(f"Expected {total}, got {expected}.")
+        return check
+
+
+class PayloadSchema:
+    """Rules for one eNCF type, compiled on first use."""
+
+    def __init__(self, encf_type: int, rules: Sequence[Rule]):
+        self.encf_type = encf_type
+        self.rules = list(rules)
+        self._checks: Optional[List[Callable[[Any, Errors], None]]] = None
+
+    def compile(self):
+        self._checks = [rule.compile() for rule in self.rules]
+        return self._checks
+
+    def check(self, payload: Any) -> Errors:
+        """Return the errors of `payload`, keyed by field path."""
+        checks = self._checks if self._checks is not None else self.compile()
+        errors: Errors = {}
+        if not isinstance(payload, dict):
+            return {"non_field_errors": ["Payload must be a dict."]}
+        for check in checks:
+            check(payload, errors)
+        return errors
+
+
+ITEM_RULES = [
+    Required("itemName"),
+    Required("quantityItem"),
+    NonNegative("quantityItem"),
+    NonNegative("unitPriceItem"),
+    NonNegative("itemAmount"),
+    Choice("unitMeasure", UNIT_MEASURES, "Invalid unit measure code.", normalize=_int_code),
+    Sum("itemAmount", ["quantityItem*unitPriceItem", "-discountAmount", "surchargeAmount"]),
+]
+
+BUYER_REQUIRED_TYPES = frozenset({31, 41, 44, 45})
+
+REFERENCE_REQUIRED_TYPES = frozenset({33, 34})
+
+
+def default_rules(encf_type: int) -> List[Rule]:
+    """Build the default rules for an eNCF type."""
+    identification = IDENTIFICATION_PATTERN.pattern
+    rules: List[Rule] = [
+        Required("idDoc.encf"),
+        Pattern("idDoc.encf", rf"^E{encf_type}\d{{10}}$", f"Must be an eNCF of type {encf_type} (E{encf_type}XXXXXXXXXX)."),
+        Required("sender.rnc"),
+        Pattern("sender.rnc", identification, "Must contain 9 or 11 digits with no separators."),
+        Pattern("buyer.rnc", identification, "Must contain 9 or 11 digits with no separators."),
+        Choice("otherCurrency.currencyType", CURRENCIES, "Invalid currency code."),
+        Items("itemDetails", ITEM_RULES),
+        Required("totals.totalAmount"),
+        NonNegative("totals.totalAmount"),
+        Sum("totals.totalAmount", [
+            "totals.totalTaxedAmount",
+            "totals.exemptAmount",
+            "totals.itbisTotal",
+            "totals.additionalTaxAmount",
+        ]),
+    ]
+    if encf_type in BUYER_REQUIRED_TYPES:
+        rules.append(Required("buyer.rnc"))
+    if encf_type in REFERENCE_REQUIRED_TYPES:
+        rules.append(Required("informationReference.modifiedEncf"))
+        rules.append(Pattern("informationReference.modifiedEncf", r"^E\d{12}$", "Must be a valid eNCF."))
+    return rules
+
+
+SCHEMAS: Dict[int, PayloadSchema] = {encf_type: PayloadSchema(encf_type, default_rules(encf_type)) for encf_type in ENCF_TYPES}
+
+
+def check_payload(encf_type: int, payload: Any) -> Errors:
+    """Return the errors of `payload` for the given eNCF type."""
+    schema = SCHEMAS.get(encf_type)
+    if schema is None:
+        raise NotImplementedError(f"No implementation for eNCF type: {encf_type}")
+    return schema.check(payload)
+
+
+def validate_payload(encf_type: int, payload: Any) -> None:
+    """Raise `ValidationError` if `payload` is not valid for `encf_type`."""
+    errors = check_payload(encf_type, payload)
+    if errors:
+        raise ValidationError(message=f"Invalid payload for eNCF type {encf_type}.", errors=errors)
+
+
+def _check_item(item: Tuple[int, Any]) -> Errors:
+    return check_payload(*item)
+
+
+def check_payloads(
+    items: Iterable[Tuple[int, Any]],
+    processes: Optional[int] = None,
+    chunksize: int = 256,
+) -> Iterator[Errors]:
+    """
+    Validate `(encf_type, payload)` pairs, yielding their errors in order.
+
+    With `processes`, validation is spread over a process pool. Worker
+    processes use the schemas registered in `SCHEMAS` at import time, so
+    custom rules must be registered at module level to apply there.
+    """
+    if not processes:
+        for item in items:
+            yield _check_item(item)
+        return
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        yield from executor.map(_check_item, items, chunksize=chunksize)
@@ -0,0 +1,227 @@
+"""Batch submission pipeline for CPU-heavy payload preparation.
+
+At volume most of the client's CPU time goes into building, validating and
+serializing payloads rather than into HTTP. `PayloadPipeline` splits a batch
+in two stages:
+
+1. prepare → validate → serialize to JSON bytes, in a process pool, so it
+   scales with the number of cores;
+2. submit the encoded bodies from a thread pool (`AlanubeAPI.post_raw`).
+
+Both stages are bounded: at most `max_prepared` payloads are prepared ahead
+of submission and at most `max_in_flight` requests are in flight, so a slow
+API throttles the CPU stage instead of piling up encoded bodies in memory.
+
+`prepare_many` exposes the first stage alone, e.g. to submit the bodies from
+an asyncio loop.
+
+Example:
+----------
+```python
+from alanube.do.pipeline import PayloadPipeline
+
+pipeline = PayloadPipeline(prepare=build_payload, processes=4, io_workers=16)
+for result in pipeline.run((32, row) for row in rows):
+    if result.status != "sent":
+        print(result.index, result.errors or result.error)
+```
+
+`prepare` runs in the worker processes, so it must be picklable (a module
+level function).
+"""
+
+from __future__ import annotations
+
+import logging
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Iterable, Iterator, Optional, Set, Tuple
+
+from .api import AlanubeAPI
+from .payloads import Errors, check_payload
+
+
+logger = logging.getLogger(__package__)
+
+
+# Name of the `APIConfig.endpoints` entry documents of each eNCF type are sent to.
+SEND_ENDPOINTS = {
+    31: "fiscal_invoices",
+    32: "invoices",
+    33: "debit_notes",
+    34: "credit_notes",
+    41: "purchases",
+    43: "minorexpenses",
+    44: "special_regimes",
+    45: "gubernamentals",
+    46: "export_supports",
+    47: "payment_abroad_supports",
+}
+
+SENT = "sent"
+INVALID = "invalid"
+FAILED = "failed"
+
+
+@dataclass
+class PreparedPayload:
+    index: int
+    encf_type: int
+    body: Optional[bytes] = None
+    errors: Errors = field(default_factory=dict)
+    error: Optional[BaseException] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.body is not None
+
+
+@dataclass
+class PipelineResult:
+    index: int
+    encf_type: int
+    status: str
+    response: Any = None
+    errors: Errors = field(default_factory=dict)
+    error: Optional[BaseException] = None
+
+
+def prepare_payload(
+    index: int,
+    encf_type: int,
+    payload: Any,
+    prepare: Optional[Callable[[int, Any], Any]] = None,
+    validate: bool = True,
+) -> PreparedPayload:
+    """
+    Prepare a single payload: build it with `prepare`, validate it and encode
+    it as JSON bytes. Runs in the worker processes.
+    """
+    if prepare is not None:
+        payload = prepare(encf_type, payload)
+    if validate:
+        errors = check_payload(encf_type, payload)
+        if errors:
+            return PreparedPayload(index, encf_type, errors=errors)
+    body = AlanubeAPI.encode(AlanubeAPI.serialize(payload))
+    return PreparedPayload(index, encf_type, body=body)
+
+
+def submit_encoded(encf_type: int, body: bytes):
+    """Send an encoded document of the given eNCF type."""
+    name = SEND_ENDPOINTS.get(encf_type)
+    if name is None:
+        raise NotImplementedError(f"No implementation for eNCF type: {encf_type}")
+    url = AlanubeAPI.config.endpoints[name]
+    return AlanubeAPI.post_raw(url, body, expected_response_code=201).json()
+
+
+class PayloadPipeline:
+    """
+    Prepare payloads in a process pool and submit them from a thread pool.
+
+    Args:
+    ----------
+    - `prepare`: Optional, `(encf_type, item) -> payload`, run in the worker
+      processes before validation.
+    - `validate` (bool): Validate payloads with `alanube.do.payloads`;
+      invalid payloads are reported and never sent.
+    - `processes` (int): Number of worker processes (default: CPU count).
+    - `io_workers` (int): Number of threads submitting requests.
+    - `max_prepared` (int): Payloads prepared ahead of submission.
+    - `max_in_flight` (int): Requests in flight (default: `io_workers`).
+    - `submit`: `(encf_type, body) -> response`, defaults to `submit_encoded`.
+    - `executor`: Optional executor used instead of a new process pool.
+    """
+
+    def __init__(
+        self,
+        prepare: Optional[Callable[[int, Any], Any]] = None,
+        validate: bool = True,
+        processes: Optional[int] = None,
+        io_workers: int = 8,
+        max_prepared: int = 256,
+        max_in_flight: Optional[int] = None,
+        submit: Callable[[int, bytes], Any] = submit_encoded,
+        executor: Optional[Executor] = None,
+    ):
+        if max_prepared < 1:
+            raise ValueError("max_prepared must be positive")
+        self.prepare = prepare
+        self.validate = validate
+        self.processes = processes
+        self.io_workers = io_workers
+        self.max_prepared = max_prepared
+        self.max_in_flight = max_in_flight or io_workers
+        self.submit = submit
+        self.executor = executor
+
+    def prepare_many(self, items: Iterable[Tuple[int, Any]]) -> Iterator[PreparedPayload]:
+        """
+        Prepare `(encf_type, item)` pairs in the process pool, yielding them in
+        input order. At most `max_prepared` items are queued ahead of the
+        consumer.
+        """
+        executor = self.executor or ProcessPoolExecutor(max_workers=self.processes)
+        pending: Deque[Tuple[int, int, Future]] = deque()
+        try:
+            for index, (encf_type, item) in enumerate(items):
+                if len(pending) >= self.max_prepared:
+                    yield self._collect(*pending.popleft())
+                future = executor.submit(prepare_payload, index, encf_type, item, self.prepare, self.validate)
+                pending.append((index, encf_type, future))
+            while pending:
+                yield self._collect(*pending.popleft())
+        finally:
+            for _, _, future in pending:
+                future.cancel()
+            if self.executor is None:
+                executor.shutdown(wait=True)
+
+    @staticmethod
+    def _collect(index: int, encf_type: int, future: Future) -> PreparedPayload:
+        try:
+            return future.result()
+        except Exception as e:
+            logger.warning(f"Could not prepare payload {index}: {e!r}")
+            return PreparedPayload(index, encf_type, error=e)
+
+    def _send(self, prepared: PreparedPayload) -> PipelineResult:
+        try:
+            response = self.submit(prepared.encf_type, prepared.body)
+        except Exception as e:
+            return PipelineResult(prepared.index, prepared.encf_type, FAILED, error=e)
+        return PipelineResult(prepared.index, prepared.encf_type, SENT, response=response)
+
+    def run(self, items: Iterable[Tuple[int, Any]]) -> Iterator[PipelineResult]:
+        """
+        Prepare and submit `(encf_type, item)` pairs, yielding a
+        `PipelineResult` per item as it completes (use `index` to match them
+        with the input).
+        """
+        in_flight: Set[Future] = set()
+        metrics = AlanubeAPI.metrics
+        with ThreadPoolExecutor(max_workers=self.io_workers) as pool:
+            for prepared in self.prepare_many(items):
+                if not prepared.ok:
+                    metrics.incr("pipeline.invalid" if prepared.errors else "pipeline.failed")
+                    status = INVALID if prepared.errors else FAILED
+                    yield PipelineResult(
+                        prepared.index, prepared.encf_type, status, errors=prepared.errors, error=prepared.error,
+                    )
+                    continue
+                while len(in_flight) >= self.max_in_flight:
+                    done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    yield from self._finished(done)
+                in_flight.add(pool.submit(self._send, prepared))
+            while in_flight:
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                yield from self._finished(done)
+
+    @staticmethod
+    def _finished(done: Iterable[Future]) -> Iterator[PipelineResult]:
+        for future in done:
+            result = future.result()
+            AlanubeAPI.metrics.incr(f"pipeline.{result.status}")
+            yield result
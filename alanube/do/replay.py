@@ -0,0 +1,249 @@
+"""Record and replay of API traffic.
+
+`RecordingTransport` wraps another transport and captures every
+request/response pair going through `AlanubeAPI.request` into a cassette: a
+gzip-compressed JSON Lines file. Credentials (the `Authorization` header and
+other sensitive headers) are redacted before anything is written.
+
+`ReplayTransport` serves a cassette back without any network access,
+optionally reproducing the recorded latencies (scaled by
+`latency_scale`), so pooling, retries or pagination can be benchmarked
+against production-shaped traffic.
+
+Example:
+----------
+```python
+from alanube.do.api import AlanubeAPI
+from alanube.do.replay import RecordingTransport, ReplayTransport
+
+# Record
+AlanubeAPI.transport = RecordingTransport(AlanubeAPI.transport, "traffic.jsonl.gz")
+run_workload()
+AlanubeAPI.transport.close()
+
+# Replay at twice the recorded speed
+AlanubeAPI.connect("token", transport=ReplayTransport("traffic.jsonl.gz", latency_scale=0.5))
+run_workload()
+```
+"""
+
+from __future__ import annotations
+
+import base64
+import gzip
+import hashlib
+import json
+import threading
+import time
+from collections import deque
+from datetime import timedelta
+from typing import Any, Deque, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlencode
+
+from alanube.utils import lazy_import
+from .exceptions import CassetteMiss
+from .transports import Transport
+
+
+requests = lazy_import("requests")
+
+REDACTED = "<redacted>"
+
+SENSITIVE_HEADERS = frozenset({"authorization", "cookie", "set-cookie", "proxy-authorization"})
+
+# Headers describing the encoding on the wire; the recorded content is
+# already decoded.
+_WIRE_HEADERS = frozenset({"content-encoding", "content-length", "transfer-encoding"})
+
+
+def _redact_headers(headers, sensitive=SENSITIVE_HEADERS) -> Dict[str, str]:
+    return {k: (REDACTED if k.lower() in sensitive else v) for k, v in (headers or {}).items()}
+
+
+def _encode_bytes(content: Optional[bytes]) -> Dict[str, Any]:
+    if content is None:
+        return {}
+    try:
+        return {"text": content.decode("utf-8")}
+    except UnicodeDecodeError:
+        return {"base64": base64.b64encode(content).decode("ascii")}
+
+
+def _decode_bytes(entry: Dict[str, Any]) -> bytes:
+    if "text" in entry:
+        return entry["text"].encode("utf-8")
+    if "base64" in entry:
+        return base64.b64decode(entry["base64"])
+    return b""
+
+
+def _full_url(url: str, params: Optional[Dict[str, Any]]) -> str:
+    if not params:
+        return url
+    query = urlencode(sorted((k, v) for k, v in params.items() if v is not None), doseq=True)
+    return f"{url}{'&' if '?' in url else '?'}{query}" if query else url
+
+
+def _body_digest(json_body: Any = None, data: Optional[bytes] = None) -> Optional[str]:
+    if json_body is not None:
+        data = json.dumps(json_body, sort_keys=True, separators=(",", ":")).encode("utf-8")
+    if data is None:
+        return None
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    return hashlib.sha256(data).hexdigest()
+
+
+def _dumps(entry: Dict[str, Any]) -> str:
+    return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class RecordingTransport:
+    """
+    Transport recording the traffic of another transport into a cassette.
+
+    Args:
+    ----------
+    - `transport`: The transport performing the requests.
+    - `path` (str): Cassette file, gzip-compressed JSON Lines. Appended to
+      if it exists.
+    - `sensitive_headers`: Header names (lowercase) whose values are redacted.
+    - `record_bodies` (bool): Store request bodies, not only their digest.
+    """
+
+    def __init__(
+        self,
+        transport: Transport,
+        path: str,
+        sensitive_headers: Iterable[str] = SENSITIVE_HEADERS,
+        record_bodies: bool = False,
+    ):
+        self.transport = transport
+        self.path = path
+        self.sensitive_headers = frozenset(h.lower() for h in sensitive_headers)
+        self.record_bodies = record_bodies
+        self._file = gzip.open(path, "at", encoding="utf-8")
+        self._lock = threading.Lock()
+        self._started = time.monotonic()
+        self.recorded = 0
+
+    def request(self, method, url, headers, params=None, json=None, data=None, **kwargs):
+        started = time.monotonic()
+        response = self.transport.request(method, url, headers=headers, params=params, json=json, data=data, **kwargs)
+        elapsed = time.monotonic() - started
+
+        entry = {
+            "offset": round(started - self._started, 6),
+            "elapsed": round(elapsed, 6),
+            "request": {
+                "method": method,
+                "url": _full_url(url, params),
+                "headers": _redact_headers(headers, self.sensitive_headers),
+                "body_sha256": _body_digest(json, data),
+            },
+            "response": {
+                "status_code": response.status_code,
+                "reason": getattr(response, "reason", None),
+                "url": getattr(response, "url", None) or url,
+                "headers": {
+                    k: v for k, v in _redact_headers(response.headers, self.sensitive_headers).items()
+                    if k.lower() not in _WIRE_HEADERS
+                },
+                **_encode_bytes(response.content),
+            },
+        }
+        if self.record_bodies:
+            if json is not None:
+                entry["request"]["json"] = json
+            elif data is not None:
+                entry["request"].update(_encode_bytes(data))
+
+        line = _dumps(entry)
+        with self._lock:
+            self._file.write(line + "\n")
+            self.recorded += 1
+        return response
+
+    def close(self):
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+        self.transport.close()
+
+
+def load_cassette(path: str) -> List[Dict[str, Any]]:
+    """Read the entries of a cassette."""
+    with gzip.open(path, "rt", encoding="utf-8") as file:
+        return [json.loads(line) for line in file if line.strip()]
+
+
+class ReplayTransport:
+    """
+    Transport serving the responses of a cassette.
+
+    Requests are matched on method, URL (with its query string) and, when
+    `match_body` is set, on the digest of the body. Identical requests get
+    the recorded responses in order; once they are used up, the last one is
+    served again.
+
+    Args:
+    ----------
+    - `path` (str): Cassette file.
+    - `latency_scale` (float): Factor applied to the recorded latencies
+      (`0` answers immediately, `0.5` twice as fast).
+    - `match_body` (bool): Take the request body into account.
+    """
+
+    def __init__(self, path: str, latency_scale: float = 1.0, match_body: bool = True):
+        self.path = path
+        self.latency_scale = latency_scale
+        self.match_body = match_body
+        self._lock = threading.Lock()
+        self._entries: Dict[Tuple, Deque[Dict[str, Any]]] = {}
+        self._last: Dict[Tuple, Dict[str, Any]] = {}
+        for entry in load_cassette(path):
+            request = entry["request"]
+            key = self._key(request["method"], request["url"], request.get("body_sha256"))
+            self._entries.setdefault(key, deque()).append(entry)
+        self.replayed = 0
+
+    def _key(self, method: str, url: str, digest: Optional[str]) -> Tuple:
+        return (method.upper(), url, digest if self.match_body else None)
+
+    def _next_entry(self, key) -> Dict[str, Any]:
+        with self._lock:
+            queue = self._entries.get(key)
+            if queue:
+                entry = queue.popleft()
+                self._last[key] = entry
+            else:
+                entry = self._last.get(key)
+            if entry is None:
+                raise CassetteMiss(f"No recorded response for {key[0]} {key[1]}")
+            self.replayed += 1
+        return entry
+
+    def request(self, method, url, headers, params=None, json=None, data=None, **kwargs):
+        key = self._key(method, _full_url(url, params), _body_digest(json, data))
+        entry = self._next_entry(key)
+        if self.latency_scale:
+            time.sleep(entry["elapsed"] * self.latency_scale)
+        return self._build_response(entry)
+
+    @staticmethod
+    def _build_response(entry: Dict[str, Any]):
+        from requests.structures import CaseInsensitiveDict
+
+        recorded = entry["response"]
+        response = requests.Response()
+        response.status_code = recorded["status_code"]
+        response.reason = recorded.get("reason")
+        response.url = recorded.get("url")
+        response.headers = CaseInsensitiveDict(recorded.get("headers") or {})
+        response._content = _decode_bytes(recorded)
+        response.encoding = "utf-8"
+        response.elapsed = timedelta(seconds=entry["elapsed"])
+        return response
+
+    def close(self):
+        pass
@@ -0,0 +1,259 @@
+"""Validation and coercion of API responses.
+
+The TypedDicts of `alanube.do.types` describe the responses but are not
+enforced. `validate_response` checks a response against them and coerces
+date fields to `datetime` and amounts to `Decimal`
+(`ReceivedDocumentsResponse.totalAmount` is sent as a string).
+
+A validator is generated once per TypedDict: its source, with one unrolled
+check per field, is compiled on first use. Fields with a plain type are
+checked with a single `isinstance` and literals with a set lookup, while
+nested TypedDicts, lists, dates and amounts call their own validator.
+
+`None` is accepted for every field and unknown fields are kept as is.
+Missing fields are only reported in strict mode, since the API omits empty
+fields in some responses.
+
+The validation is enabled on the client with:
+
+```python
+Alanube.connect("token", developer_mode=False, validate_responses=True)
+```
+
+Invalid responses raise `InvalidResponseError`, whose `errors` map each
+invalid field path (e.g. `documents[3].status`) to its messages.
+"""
+
+from __future__ import annotations
+
+import functools
+from decimal import Decimal, InvalidOperation
+from typing import Any, Callable, Dict, List, Literal, Tuple, get_args, get_origin, get_type_hints, is_typeddict
+
+from .exceptions import InvalidResponseError
+from .models import DATE_FIELDS, parse_date
+
+
+AMOUNT_FIELDS = frozenset({
+    "totalAmount",
+})
+
+# value, path, errors -> coerced value. Paths are nested `(parent, key)`
+# tuples, only formatted when an error is reported.
+Validator = Callable[[Any, str, Dict[str, List[str]]], Any]
+
+_VALIDATORS: Dict[Tuple[Any, bool], Validator] = {}
+
+
+def _format_path(path) -> str:
+    """Format a path built as nested `(parent, key)` tuples."""
+    parts = []
+    while path:
+        path, key = path
+        parts.append(f"[{key}]" if isinstance(key, int) else f".{key}")
+    return "".join(reversed(parts)).lstrip(".")
+
+
+def _error(errors: Dict[str, List[str]], path, message: str):
+    errors.setdefault(_format_path(path), []).append(message)
+
+
+def _type_name(value) -> str:
+    return type(value).__name__
+
+
+@functools.lru_cache(maxsize=4096)
+def _parse_date(value: str):
+    # Documents of a page share few distinct dates; datetimes are immutable.
+    return parse_date(value)
+
+
+def _date(value, path, errors):
+    parsed = _parse_date(value) if isinstance(value, str) else value
+    if isinstance(parsed, str):
+        _error(errors, path, f"Invalid date: {value!r}.")
+    return parsed
+
+
+def _amount(value, path, errors):
+    if isinstance(value, Decimal):
+        return value
+    if isinstance(value, (str, int, float)) and not isinstance(value, bool):
+        try:
+            return Decimal(value) if isinstance(value, str) else Decimal(str(value))
+        except InvalidOperation:
+            pass
+    _error(errors, path, f"Invalid amount: {value!r}.")
+    return value
+
+
+def _any(value, path, errors):
+    return value
+
+
+def _instance_of(expected: tuple) -> Validator:
+    name = " or ".join(t.__name__ for t in expected)
+
+    def validate(value, path, errors):
+        if not isinstance(value, expected):
+            _error(errors, path, f"Expected {name}, got {_type_name(value)}.")
+        return value
+    return validate
+
+
+def _literal(choices: tuple) -> Validator:
+    allowed = frozenset(choices)
+
+    def validate(value, path, errors):
+        if value not in allowed:
+            _error(errors, path, f"Unexpected value: {value!r}.")
+        return value
+    return validate
+
+
+def _list_of(item: Validator) -> Validator:
+    def validate(value, path, errors):
+        if not isinstance(value, list):
+            _error(errors, path, f"Expected list, got {_type_name(value)}.")
+            return value
+        return [item(v, (path, i), errors) if v is not None else v for i, v in enumerate(value)]
+    return validate
+
+
+def _dict_of(item: Validator) -> Validator:
+    def validate(value, path, errors):
+        if not isinstance(value, dict):
+            _error(errors, path, f"Expected dict, got {_type_name(value)}.")
+            return value
+        return {k: item(v, (path, k), errors) if v is not None else v for k, v in value.items()}
+    return validate
+
+
+def _simple_type(tp):
+    """Types checked with a plain `isinstance`, or None."""
+    if tp is str:
+        return (str,)
+    if tp is int:
+        return (int,)
+    if tp is bool:
+        return (bool,)
+    if tp is float:
+        return (int, float)
+    return None
+
+
+def _typeddict(tp, strict: bool) -> Validator:
+    """
+    Generate the source of a validator for a TypedDict, with one unrolled
+    check per field, and compile it.
+    """
+    namespace: Dict[str, Any] = {
+        "_error": _error,
+        "_type_name": _type_name,
+        "dict": dict,
+        "isinstance": isinstance,
+    }
+    checks: List[str] = []
+    coercions: List[str] = []
+    keys = []
+    for i, (field, hint) in enumerate(get_type_hints(tp).items()):
+        # Keys clashing with Python keywords are declared with a trailing
+        # underscore (`from_`).
+        key = field[:-1] if field.endswith("_") else field
+        keys.append(key)
+        expected = _simple_type(hint)
+        if field in DATE_FIELDS or field in AMOUNT_FIELDS or (expected is None and get_origin(hint) is not Literal):
+            if field in DATE_FIELDS:
+                namespace[f"f{i}"] = _date
+            elif field in AMOUNT_FIELDS:
+                namespace[f"f{i}"] = _amount
+            else:
+                namespace[f"f{i}"] = compile_validator(hint, strict)
+            coercions.append(
+                f"    v = get({key!r})\n"
+                f"    if v is not None:\n"
+                f"        result[{key!r}] = f{i}(v, (path, {key!r}), errors)\n"
+            )
+        elif expected is not None:
+            namespace[f"t{i}"] = expected
+            name = " or ".join(t.__name__ for t in expected)
+            checks.append(
+                f"    v = get({key!r})\n"
+                f"    if v is not None and not isinstance(v, t{i}):\n"
+                f"        _error(errors, (path, {key!r}), 'Expected {name}, got ' + _type_name(v) + '.')\n"
+            )
+        else:
+            namespace[f"c{i}"] = frozenset(get_args(hint))
+            checks.append(
+                f"    v = get({key!r})\n"
+                f"    if v is not None and v not in c{i}:\n"
+                f"        _error(errors, (path, {key!r}), 'Unexpected value: ' + repr(v) + '.')\n"
+            )
+    namespace["keys"] = frozenset(keys)
+    source = (
+        "def validate(value, path, errors):\n"
+        "    if not isinstance(value, dict):\n"
+        "        _error(errors, path, 'Expected dict, got ' + _type_name(value) + '.')\n"
+        "        return value\n"
+        "    get = value.get\n"
+        + "".join(checks)
+        + ("    result = dict(value)\n" + "".join(coercions) if coercions else "    result = value\n")
+        + (
+            "    for key in keys - value.keys():\n"
+            "        _error(errors, (path, key), 'This field is required.')\n"
+            if strict else ""
+        )
+        + "    return result\n"
+    )
+    exec(compile(source, f"<validator {tp.__name__}>", "exec"), namespace)
+    return namespace["validate"]
+
+
+def compile_validator(tp, strict: bool = False) -> Validator:
+    """Return the validator of a type, generating it on first use."""
+    cache_key = (tp, strict)
+    validator = _VALIDATORS.get(cache_key)
+    if validator is not None:
+        return validator
+
+    origin = get_origin(tp)
+    args = get_args(tp)
+    if is_typeddict(tp):
+        validator = _typeddict(tp, strict)
+    elif origin is list:
+        validator = _list_of(compile_validator(args[0], strict) if args else _any)
+    elif origin is dict:
+        validator = _dict_of(compile_validator(args[1], strict) if args else _any)
+    elif origin is Literal:
+        validator = _literal(args)
+    elif _simple_type(tp) is not None:
+        validator = _instance_of(_simple_type(tp))
+    else:
+        validator = _any
+    _VALIDATORS[cache_key] = validator
+    return validator
+
+
+def check_response(data: Any, response_type, strict: bool = False) -> Tuple[Any, Dict[str, List[str]]]:
+    """
+    Validate `data` against `response_type`, returning the coerced data and
+    the errors found. `data` is not modified.
+    """
+    errors: Dict[str, List[str]] = {}
+    result = compile_validator(response_type, strict)(data, (), errors)
+    return result, errors
+
+
+def validate_response(data: Any, response_type, strict: bool = False, response=None) -> Any:
+    """
+    Validate and coerce `data`, raising `InvalidResponseError` if it does not
+    match `response_type`.
+    """
+    result, errors = check_response(data, response_type, strict=strict)
+    if errors:
+        raise InvalidResponseError(
+            message=f"Invalid {getattr(response_type, '__name__', 'response')}: {len(errors)} invalid field(s).",
+            errors=errors,
+            response=response,
+        )
+    return result
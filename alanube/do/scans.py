@@ -0,0 +1,200 @@
+"""Parallel scans of a date range split into windows.
+
+Paging sequentially through a year of documents takes one round trip per
+page, one after the other. `DateRangeScan` splits the range into windows
+(days, weeks or any `timedelta`), pages through the windows concurrently
+using the `start`/`end` filters of the list methods, and yields the
+documents as they arrive:
+
+- documents returned by two windows (at their edges) are yielded once, by
+  `id`. Ids are only remembered while a pending window still reaches back
+  to the window that returned them, so memory does not grow with the range;
+- a window whose first page is full is dense: it is split in two halves,
+  down to `min_window`, so dense periods get more parallelism. The
+  documents of that first page are kept, the halves fetch them again and
+  they are dropped as duplicates.
+
+Bounds are sent as `YYYY-MM-DD` dates (inclusive, e.g.
+`get_received_documents`) or Unix timestamps in seconds (the document list
+methods), chosen from the `start` annotation of the list method.
+
+Documents are yielded in no particular order.
+
+Example:
+----------
+```python
+from datetime import date
+from alanube.do.api import AlanubeAPI
+from alanube.do.scans import DateRangeScan
+
+scan = DateRangeScan(AlanubeAPI.get_received_documents, date(2024, 1, 1), date(2024, 12, 31), window="week")
+for document in scan:
+    store(document)
+print(scan.pages, scan.splits, scan.duplicates)
+```
+"""
+
+from __future__ import annotations
+
+import heapq
+import itertools
+import logging
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from datetime import date, datetime, timedelta, timezone
+from typing import (
+    Any, Callable, Deque, Dict, Iterator, List, Optional, Set, Tuple, Union, get_args, get_type_hints,
+)
+
+
+logger = logging.getLogger(__package__)
+
+WINDOWS = {"day": timedelta(days=1), "week": timedelta(weeks=1)}
+
+DATE = "date"
+TIMESTAMP = "timestamp"
+
+Window = Tuple[datetime, datetime]
+
+
+def _to_datetime(value: Union[date, datetime]) -> datetime:
+    if isinstance(value, datetime):
+        return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+    return datetime(value.year, value.month, value.day, tzinfo=timezone.utc)
+
+
+def plan_windows(start: datetime, end: datetime, window: timedelta) -> List[Window]:
+    """Split `[start, end)` into consecutive windows of `window`."""
+    windows = []
+    while start < end:
+        windows.append((start, min(start + window, end)))
+        start += window
+    return windows
+
+
+def bound_format(func: Callable) -> str:
+    """Whether a list method filters by dates (`str`) or timestamps (`int`)."""
+    try:
+        hint = get_type_hints(func).get("start")
+    except Exception:
+        return DATE
+    return TIMESTAMP if int in (get_args(hint) or (hint,)) else DATE
+
+
+class DateRangeScan:
+    """
+    Scan of the documents of a list method between two dates.
+
+    Args:
+    ----------
+    - `func`: A list method, e.g. `AlanubeAPI.get_received_documents`.
+    - `start`: First date (or datetime) of the range.
+    - `end`: Last date of the range, included; a datetime is excluded.
+    - `window`: `"day"`, `"week"` or a `timedelta`, size of the initial windows.
+    - `min_window` (timedelta): Windows are not split below this size.
+      At least one day for date bounds.
+    - `max_workers` (int): Requests in flight.
+    - `limit` (int): Page size.
+    - `format`: `"date"`, `"timestamp"` or a `(datetime, is_end) -> value`
+      function. Defaults to the type of the `start` parameter of `func`.
+    - `params`: Additional filters forwarded to `func` (`company_id`, ...).
+
+    After iteration `pages`, `splits` and `duplicates` count the requests
+    made, the windows split and the documents dropped as duplicates.
+    """
+
+    def __init__(
+        self,
+        func: Callable[..., Dict[str, Any]],
+        start: Union[date, datetime],
+        end: Union[date, datetime],
+        window: Union[str, timedelta] = "week",
+        min_window: timedelta = timedelta(hours=1),
+        max_workers: int = 8,
+        limit: int = 100,
+        format: Union[str, Callable[[datetime, bool], Any], None] = None,
+        **params,
+    ):
+        self.func = func
+        self.start = _to_datetime(start)
+        self.end = _to_datetime(end) if isinstance(end, datetime) else _to_datetime(end) + timedelta(days=1)
+        self.window = WINDOWS[window] if isinstance(window, str) else window
+        self.format = format or bound_format(func)
+        if self.format == DATE:
+            min_window = max(min_window, timedelta(days=1))
+        self.min_window = min_window
+        self.max_workers = max_workers
+        self.limit = limit
+        self.params = params
+        self.pages = 0
+        self.splits = 0
+        self.duplicates = 0
+
+    def _bound(self, value: datetime, is_end: bool) -> Any:
+        if callable(self.format):
+            return self.format(value, is_end)
+        if self.format == TIMESTAMP:
+            return int(value.timestamp())
+        # Dates are inclusive: a window ends the day before its (exclusive) end.
+        return (value - timedelta(days=1) if is_end else value).date().isoformat()
+
+    def _split(self, window: Window) -> Optional[Tuple[Window, Window]]:
+        start, end = window
+        if end - start < 2 * self.min_window:
+            return None
+        middle = start + (end - start) / 2
+        if self.format == DATE:
+            middle = start + timedelta(days=(end - start).days // 2)
+        return (start, middle), (middle, end)
+
+    def _fetch(self, window: Window, page: int) -> List[Dict[str, Any]]:
+        data = self.func(
+            limit=self.limit,
+            page=page,
+            start=self._bound(window[0], False),
+            end=self._bound(window[1], True),
+            **self.params,
+        )
+        return data.get("documents") or []
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        seen: Set[Any] = set()
+        # (end of the window that returned the id, tie breaker, id)
+        expiry: List[Tuple[datetime, int, Any]] = []
+        counter = itertools.count()
+        queue: Deque[Tuple[Window, int]] = deque(
+            (window, 1) for window in plan_windows(self.start, self.end, self.window)
+        )
+        in_flight: Dict[Future, Tuple[Window, int]] = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while queue or in_flight:
+                while queue and len(in_flight) < self.max_workers:
+                    window, page = queue.popleft()
+                    in_flight[executor.submit(self._fetch, window, page)] = (window, page)
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    window, page = in_flight.pop(future)
+                    documents = future.result()
+                    self.pages += 1
+                    if len(documents) >= self.limit:
+                        halves = self._split(window) if page == 1 else None
+                        if halves is not None:
+                            self.splits += 1
+                            logger.debug(f"Splitting dense window {window[0]} - {window[1]}")
+                            queue.extendleft(reversed([(half, 1) for half in halves]))
+                        else:
+                            queue.appendleft((window, page + 1))
+                    for document in documents:
+                        key = document.get("id") if isinstance(document, dict) else None
+                        if key is not None:
+                            if key in seen:
+                                self.duplicates += 1
+                                continue
+                            seen.add(key)
+                            heapq.heappush(expiry, (window[1], next(counter), key))
+                        yield document
+                # Only windows starting at or before the end of a window can
+                # return its documents again (edges, split halves, next pages).
+                horizon = min((w[0] for w, _ in itertools.chain(queue, in_flight.values())), default=None)
+                while expiry and (horizon is None or expiry[0][0] < horizon):
+                    seen.discard(heapq.heappop(expiry)[2])
@@ -0,0 +1,370 @@
+"""Schedulers for sharing the client between workloads.
+
+Interactive submissions (e.g. point-of-sale consumption invoices, type 32)
+and bulk backfills use the same client and the same connections. Without
+coordination a backfill fills every connection and interactive calls wait
+behind it.
+
+`PriorityScheduler` runs calls on a fixed number of workers split in
+priority lanes. Every lane may reserve some workers for itself; the rest
+are shared and go to the highest priority lane with queued calls. Bulk jobs
+use all the capacity that interactive calls leave, but can never take the
+workers reserved for them.
+
+`FairShareScheduler` shares the workers between tenant companies instead:
+queued calls are grouped by company and served in weighted round-robin, with
+a cap on the calls of a single company running at once, so a large tenant's
+batch does not delay the calls of everyone else. Tenants are identified by
+their Alanube company id (`company.id` of a payload, `company_id` of a read),
+so sends and reads of a company share one queue and one cap.
+
+Calls return `concurrent.futures.Future` objects.
+
+Example:
+----------
+```python
+from alanube.do.scheduler import FairShareScheduler, PriorityScheduler
+
+with PriorityScheduler(max_concurrency=16, lanes={"interactive": 4, "bulk": 0}) as scheduler:
+    futures = [scheduler.send_document(41, payload) for payload in backfill]
+    receipt = scheduler.send_document(32, sale).result()  # "interactive" lane
+
+with FairShareScheduler(max_concurrency=16, max_per_tenant=4, weights={"01FV0123456789000000": 2}) as scheduler:
+    futures = [scheduler.send_document(encf_type, payload) for encf_type, payload in batch]
+```
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, Optional
+
+from .client import Alanube
+from .metrics import Metrics
+
+
+# Lane of each eNCF type when none is given; other types go to `default_lane`.
+ENCF_LANES = {32: "interactive"}
+
+DEFAULT_LANES = {"interactive": 2, "bulk": 0}
+
+# Tenant of the calls not made on behalf of a specific company.
+DEFAULT_TENANT = "default"
+
+
+@dataclass
+class Task:
+    """A call waiting for (or running on) a scheduler worker."""
+    key: str
+    func: Callable[..., Any]
+    args: tuple = ()
+    kwargs: Dict[str, Any] = field(default_factory=dict)
+    future: Future = field(default_factory=Future)
+    queued_at: float = field(default_factory=time.monotonic)
+
+
+class Scheduler:
+    """
+    Base class of the schedulers: runs queued tasks on at most
+    `max_concurrency` worker threads, in the order chosen by `_pop`.
+
+    Subclasses keep the queued tasks and implement `_enqueue`, `_pop`,
+    `_started` and `_finished`, all called with the scheduler lock held.
+    """
+
+    def __init__(self, max_concurrency: int = 8, metrics: Optional[Metrics] = None, name: str = "scheduler"):
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        self.max_concurrency = max_concurrency
+        self.metrics = metrics
+        self.name = name
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._executor = ThreadPoolExecutor(max_concurrency, thread_name_prefix=f"alanube-{name}")
+        self._queued = 0
+        self._running = 0
+        self._closed = False
+
+    def _enqueue(self, task: Task):
+        raise NotImplementedError
+
+    def _pop(self) -> Optional[Task]:
+        """Return the next task allowed to start, or None."""
+        raise NotImplementedError
+
+    def _started(self, task: Task):
+        pass
+
+    def _finished(self, task: Task):
+        pass
+
+    def _submit(self, key: str, func: Callable[..., Any], *args, **kwargs) -> Future:
+        task = Task(key, func, args, kwargs)
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Cannot schedule new calls after shutdown")
+            self._enqueue(task)
+            self._queued += 1
+        self._dispatch()
+        return task.future
+
+    def _dispatch(self):
+        tasks = []
+        with self._lock:
+            while self._running < self.max_concurrency:
+                task = self._pop()
+                if task is None:
+                    break
+                self._queued -= 1
+                self._running += 1
+                self._started(task)
+                tasks.append(task)
+        for task in tasks:
+            if self.metrics is not None:
+                self.metrics.observe(f"{self.name}.{task.key}.wait_seconds", time.monotonic() - task.queued_at)
+            self._executor.submit(self._run, task)
+
+    def _run(self, task: Task):
+        try:
+            if task.future.set_running_or_notify_cancel():
+                try:
+                    result = task.func(*task.args, **task.kwargs)
+                except BaseException as e:
+                    task.future.set_exception(e)
+                else:
+                    task.future.set_result(result)
+        finally:
+            with self._lock:
+                self._running -= 1
+                self._finished(task)
+                if not self._running and not self._queued:
+                    self._idle.notify_all()
+            self._dispatch()
+
+    @property
+    def pending(self) -> int:
+        """Number of queued and running calls."""
+        with self._lock:
+            return self._queued + self._running
+
+    def join(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every scheduled call has finished."""
+        with self._lock:
+            return self._idle.wait_for(lambda: not self._running and not self._queued, timeout)
+
+    def shutdown(self):
+        """Stop accepting calls and wait for the scheduled ones."""
+        with self._lock:
+            self._closed = True
+        self.join()
+        self._executor.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
+
+
+class PriorityScheduler(Scheduler):
+    """
+    Scheduler with priority lanes and reserved concurrency per lane.
+
+    Args:
+    ----------
+    - `max_concurrency` (int): Number of calls running at the same time.
+    - `lanes` (dict): Workers reserved by each lane, in priority order
+      (highest first). Workers not reserved are shared by all lanes.
+    - `encf_lanes` (dict): Lane of each eNCF type for `send_document` and
+      `get_document`.
+    - `default_lane` (str): Lane of the eNCF types not in `encf_lanes`.
+    - `metrics` (Metrics): Optional, records the queue wait of each lane.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 8,
+        lanes: Optional[Dict[str, int]] = None,
+        encf_lanes: Optional[Dict[int, str]] = None,
+        default_lane: str = "bulk",
+        metrics: Optional[Metrics] = None,
+    ):
+        lanes = dict(DEFAULT_LANES if lanes is None else lanes)
+        reserved = sum(lanes.values())
+        if reserved > max_concurrency:
+            raise ValueError(f"Lanes reserve {reserved} workers but max_concurrency is {max_concurrency}")
+        if default_lane not in lanes:
+            raise ValueError(f"Unknown default lane: {default_lane}")
+        super().__init__(max_concurrency, metrics=metrics)
+        self.lanes = lanes
+        self.shared = max_concurrency - reserved
+        self.encf_lanes = dict(ENCF_LANES if encf_lanes is None else encf_lanes)
+        self.default_lane = default_lane
+        self._queues: Dict[str, Deque[Task]] = {lane: deque() for lane in lanes}
+        self._lane_running: Dict[str, int] = {lane: 0 for lane in lanes}
+
+    def _shared_in_use(self) -> int:
+        return sum(max(0, self._lane_running[lane] - reserved) for lane, reserved in self.lanes.items())
+
+    def _enqueue(self, task: Task):
+        self._queues[task.key].append(task)
+
+    def _pop(self) -> Optional[Task]:
+        shared_free = self._shared_in_use() < self.shared
+        for lane, queue in self._queues.items():
+            if queue and (self._lane_running[lane] < self.lanes[lane] or shared_free):
+                return queue.popleft()
+        return None
+
+    def _started(self, task: Task):
+        self._lane_running[task.key] += 1
+
+    def _finished(self, task: Task):
+        self._lane_running[task.key] -= 1
+
+    def submit(self, lane: str, func: Callable[..., Any], *args, **kwargs) -> Future:
+        """Schedule `func(*args, **kwargs)` in `lane`."""
+        if lane not in self.lanes:
+            raise ValueError(f"Unknown lane: {lane}")
+        return self._submit(lane, func, *args, **kwargs)
+
+    def lane_for(self, encf_type: int) -> str:
+        return self.encf_lanes.get(encf_type, self.default_lane)
+
+    def send_document(self, encf_type: int, payload: dict, validate: bool = False, lane: Optional[str] = None) -> Future:
+        """Schedule `Alanube.send_document` in the lane of the eNCF type."""
+        return self.submit(lane or self.lane_for(encf_type), Alanube.send_document, encf_type, payload, validate)
+
+    def get_document(
+        self,
+        encf_type: int,
+        document_id: str,
+        company_id: Optional[str] = None,
+        lane: Optional[str] = None,
+    ) -> Future:
+        """Schedule `Alanube.get_document` in the lane of the eNCF type."""
+        return self.submit(lane or self.lane_for(encf_type), Alanube.get_document, encf_type, document_id, company_id)
+
+    def queued(self) -> Dict[str, int]:
+        """Number of queued calls of each lane."""
+        with self._lock:
+            return {lane: len(queue) for lane, queue in self._queues.items()}
+
+
+def payload_tenant(payload: Any) -> Optional[str]:
+    """Return the company id (`company.id`) of a document payload."""
+    company = payload.get("company") if isinstance(payload, dict) else None
+    return company.get("id") if isinstance(company, dict) else None
+
+
+class FairShareScheduler(Scheduler):
+    """
+    Scheduler sharing the workers fairly between tenant companies.
+
+    Tenants with queued calls take turns; in its turn a tenant starts up to
+    its weight in calls. Tenants already running `max_per_tenant` calls are
+    skipped until one of them finishes.
+
+    Args:
+    ----------
+    - `max_concurrency` (int): Number of calls running at the same time.
+    - `max_per_tenant` (int): Optional, calls of a tenant running at the same
+      time. Defaults to `max_concurrency`.
+    - `weights` (dict): Optional, weight of each tenant, by company id.
+    - `default_weight` (int): Weight of the tenants not in `weights`.
+    - `metrics` (Metrics): Optional, records the queue wait of each tenant.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 8,
+        max_per_tenant: Optional[int] = None,
+        weights: Optional[Dict[str, int]] = None,
+        default_weight: int = 1,
+        metrics: Optional[Metrics] = None,
+    ):
+        if default_weight < 1 or any(weight < 1 for weight in (weights or {}).values()):
+            raise ValueError("Weights must be at least 1")
+        super().__init__(max_concurrency, metrics=metrics, name="fair_share")
+        self.max_per_tenant = max_per_tenant or max_concurrency
+        self.weights = dict(weights or {})
+        self.default_weight = default_weight
+        self._queues: Dict[str, Deque[Task]] = {}
+        # Tenants with queued calls, the one whose turn it is first.
+        self._turns: Deque[str] = deque()
+        self._credits: Dict[str, int] = {}
+        self._tenant_running: Dict[str, int] = {}
+
+    def weight(self, tenant: str) -> int:
+        return self.weights.get(tenant, self.default_weight)
+
+    def _enqueue(self, task: Task):
+        queue = self._queues.get(task.key)
+        if queue is None:
+            queue = self._queues[task.key] = deque()
+            self._turns.append(task.key)
+            self._credits[task.key] = self.weight(task.key)
+        queue.append(task)
+
+    def _pop(self) -> Optional[Task]:
+        for _ in range(len(self._turns)):
+            tenant = self._turns[0]
+            if self._tenant_running.get(tenant, 0) >= self.max_per_tenant:
+                self._turns.rotate(-1)
+                continue
+            queue = self._queues[tenant]
+            task = queue.popleft()
+            self._credits[tenant] -= 1
+            if not queue:
+                self._turns.popleft()
+                del self._queues[tenant], self._credits[tenant]
+            elif self._credits[tenant] <= 0:
+                self._credits[tenant] = self.weight(tenant)
+                self._turns.rotate(-1)
+            return task
+        return None
+
+    def _started(self, task: Task):
+        self._tenant_running[task.key] = self._tenant_running.get(task.key, 0) + 1
+
+    def _finished(self, task: Task):
+        running = self._tenant_running[task.key] - 1
+        if running:
+            self._tenant_running[task.key] = running
+        else:
+            del self._tenant_running[task.key]
+
+    def submit(self, tenant: str, func: Callable[..., Any], *args, **kwargs) -> Future:
+        """Schedule `func(*args, **kwargs)` on behalf of `tenant`."""
+        return self._submit(str(tenant), func, *args, **kwargs)
+
+    def send_document(self, encf_type: int, payload: dict, validate: bool = False, tenant: Optional[str] = None) -> Future:
+        """
+        Schedule `Alanube.send_document` on behalf of `tenant`, by default
+        the company id of the payload.
+        """
+        tenant = tenant or payload_tenant(payload) or DEFAULT_TENANT
+        return self.submit(tenant, Alanube.send_document, encf_type, payload, validate)
+
+    def get_document(
+        self,
+        encf_type: int,
+        document_id: str,
+        company_id: Optional[str] = None,
+        tenant: Optional[str] = None,
+    ) -> Future:
+        """
+        Schedule `Alanube.get_document` on behalf of `tenant`, by default
+        `company_id`.
+        """
+        tenant = tenant or company_id or DEFAULT_TENANT
+        return self.submit(tenant, Alanube.get_document, encf_type, document_id, company_id)
+
+    def queued(self) -> Dict[str, int]:
+        """Number of queued calls of each tenant."""
+        with self._lock:
+            return {tenant: len(queue) for tenant, queue in self._queues.items()}
@@ -0,0 +1,428 @@
+"""eNCF sequence allocation with local range reservation.
+
+Workers building documents need the next eNCF number of a document type.
+Instead of coordinating every number through a shared database,
+`SequenceAllocator` reserves blocks of numbers from a local durable store
+and hands them out from memory:
+
+- `SequenceStore` keeps, per company and document type, the next free
+  sequence in a SQLite database. A block is leased atomically
+  (`BEGIN IMMEDIATE`), so several processes can share the database file.
+- `SequenceAllocator` keeps one block per thread, so handing out numbers
+  takes no lock; the store is only touched when a block runs out.
+- Numbers are reconciled with the `DocumentResponse` of their document:
+  consumed numbers are recorded, and numbers of documents that failed or
+  were rejected without consuming their sequence are returned to the store
+  and handed out again. Documents still in process are left alone.
+
+Every lease is recorded with its owner. A number is only returned to the
+store while it is still leased by the allocator returning it, so it cannot
+be freed twice, or freed after another allocator leased it again.
+
+Example:
+----------
+```python
+from alanube.do.sequences import SequenceAllocator, SequenceStore
+
+store = SequenceStore("sequences.db")
+store.configure("101010101", 31, start=1, end=10_000_000)
+allocator = SequenceAllocator(store, "101010101", 31, block_size=500)
+
+payload["idDoc"]["encf"] = allocator.next()
+response = Alanube.send_document(31, payload)
+allocator.reconcile(response)
+```
+"""
+
+from __future__ import annotations
+
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .cancellations import Range, compact_ranges, format_encf, parse_encf
+from .config import FAILED
+from .exceptions import SequenceExhausted, SequenceNotConfigured
+
+
+REJECTED = "REJECTED"
+
+
+def is_released(document: Dict[str, Any]) -> bool:
+    """Whether a document ended without consuming its sequence."""
+    if document.get("sequenceConsumed"):
+        return False
+    return document.get("status") == FAILED or document.get("legalStatus") == REJECTED
+
+
+class SequenceStore:
+    """
+    Durable store of eNCF sequences, backed by SQLite.
+
+    Args:
+    ----------
+    - `path` (str): Path of the SQLite database.
+    - `prefix` (str): Prefix of the tables created in the database.
+    """
+
+    def __init__(self, path: str, prefix: str = "alanube_sequence"):
+        if not prefix.isidentifier():
+            raise ValueError(f"Invalid table prefix: {prefix!r}")
+        self.path = path
+        self.prefix = prefix
+        self._local = threading.local()
+        conn = self._connection()
+        conn.execute("PRAGMA journal_mode=WAL")
+        with conn:
+            conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {prefix}_counters ("
+                "company TEXT NOT NULL, encf_type INTEGER NOT NULL, "
+                "next_sequence INTEGER NOT NULL, last_sequence INTEGER, "
+                "PRIMARY KEY (company, encf_type))"
+            )
+            conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {prefix}_free ("
+                "company TEXT NOT NULL, encf_type INTEGER NOT NULL, "
+                "start INTEGER NOT NULL, end INTEGER NOT NULL, "
+                "PRIMARY KEY (company, encf_type, start))"
+            )
+            conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {prefix}_leases ("
+                "company TEXT NOT NULL, encf_type INTEGER NOT NULL, "
+                "start INTEGER NOT NULL, end INTEGER NOT NULL, "
+                "owner TEXT NOT NULL, leased_at REAL NOT NULL)"
+            )
+            conn.execute(
+                f"CREATE INDEX IF NOT EXISTS {prefix}_leases_range "
+                f"ON {prefix}_leases (company, encf_type, start)"
+            )
+            conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {prefix}_consumed ("
+                "company TEXT NOT NULL, encf_type INTEGER NOT NULL, sequence INTEGER NOT NULL, "
+                "PRIMARY KEY (company, encf_type, sequence))"
+            )
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # Transactions are managed explicitly (BEGIN IMMEDIATE).
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            self._local.conn = conn
+        return conn
+
+    def _transaction(self) -> sqlite3.Connection:
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        return conn
+
+    def configure(self, company: str, encf_type: int, start: int = 1, end: Optional[int] = None):
+        """
+        Set the range authorized for a document type. Sequences already handed
+        out are never handed out again: `start` only applies if it is past
+        them.
+        """
+        conn = self._transaction()
+        try:
+            conn.execute(
+                f"INSERT INTO {self.prefix}_counters (company, encf_type, next_sequence, last_sequence) "
+                "VALUES (?, ?, ?, ?) ON CONFLICT (company, encf_type) DO UPDATE SET "
+                "next_sequence = MAX(next_sequence, excluded.next_sequence), "
+                "last_sequence = excluded.last_sequence",
+                (company, encf_type, start, end),
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def reserve(self, company: str, encf_type: int, size: int, owner: str = "") -> Range:
+        """
+        Atomically lease up to `size` consecutive sequences, preferring
+        released ones. The returned block may be shorter than `size`.
+
+        Raises `SequenceNotConfigured` if `configure` was never called for
+        the document type, and `SequenceExhausted` once its range is used up.
+        """
+        if size < 1:
+            raise ValueError("size must be positive")
+        conn = self._transaction()
+        try:
+            block = self._take_free(conn, company, encf_type, size)
+            if block is None:
+                block = self._take_new(conn, company, encf_type, size)
+            conn.execute(
+                f"INSERT INTO {self.prefix}_leases (company, encf_type, start, end, owner, leased_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (company, encf_type, block[0], block[1], owner, time.time()),
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return block
+
+    def _take_free(self, conn, company, encf_type, size) -> Optional[Range]:
+        row = conn.execute(
+            f"SELECT start, end FROM {self.prefix}_free WHERE company = ? AND encf_type = ? "
+            "ORDER BY start LIMIT 1",
+            (company, encf_type),
+        ).fetchone()
+        if row is None:
+            return None
+        start, end = row
+        block_end = min(end, start + size - 1)
+        conn.execute(
+            f"DELETE FROM {self.prefix}_free WHERE company = ? AND encf_type = ? AND start = ?",
+            (company, encf_type, start),
+        )
+        if block_end < end:
+            conn.execute(
+                f"INSERT INTO {self.prefix}_free (company, encf_type, start, end) VALUES (?, ?, ?, ?)",
+                (company, encf_type, block_end + 1, end),
+            )
+        return start, block_end
+
+    def _take_new(self, conn, company, encf_type, size) -> Range:
+        row = conn.execute(
+            f"SELECT next_sequence, last_sequence FROM {self.prefix}_counters WHERE company = ? AND encf_type = ?",
+            (company, encf_type),
+        ).fetchone()
+        if row is None:
+            raise SequenceNotConfigured(
+                f"No eNCF range configured for type {encf_type} of {company}. Call `configure` first."
+            )
+        start, last = row
+        end = start + size - 1
+        if last is not None:
+            if start > last:
+                raise SequenceExhausted(f"No eNCF sequences left for type {encf_type} of {company}.")
+            end = min(end, last)
+        conn.execute(
+            f"INSERT INTO {self.prefix}_counters (company, encf_type, next_sequence, last_sequence) "
+            "VALUES (?, ?, ?, ?) ON CONFLICT (company, encf_type) DO UPDATE SET next_sequence = excluded.next_sequence",
+            (company, encf_type, end + 1, last),
+        )
+        return start, end
+
+    def release(self, company: str, encf_type: int, sequences: Iterable[int], owner: Optional[str] = None):
+        """
+        Return unused sequences to the store, so they are handed out again.
+
+        Only sequences currently leased (by `owner`, when given) are returned;
+        sequences recorded as consumed, already free or never leased are
+        ignored.
+        """
+        sequences = list(sequences)
+        if not sequences:
+            return
+        conn = self._transaction()
+        try:
+            consumed = {
+                row[0] for row in conn.execute(
+                    f"SELECT sequence FROM {self.prefix}_consumed WHERE company = ? AND encf_type = ? "
+                    "AND sequence BETWEEN ? AND ?",
+                    (company, encf_type, min(sequences), max(sequences)),
+                )
+            }
+            ranges = compact_ranges(s for s in sequences if s not in consumed)
+            self._insert_free(conn, company, encf_type, self._unlease(conn, company, encf_type, ranges, owner))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def release_ranges(self, company: str, encf_type: int, ranges: Iterable[Range], owner: Optional[str] = None):
+        """Return leased blocks, or parts of them, that were never handed out."""
+        conn = self._transaction()
+        try:
+            self._insert_free(conn, company, encf_type, self._unlease(conn, company, encf_type, ranges, owner))
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _unlease(self, conn, company, encf_type, ranges: Iterable[Range], owner: Optional[str]) -> List[Range]:
+        """Remove `ranges` from the leases (of `owner`) and return the parts that were leased."""
+        removed = []
+        for start, end in ranges:
+            query = (
+                f"SELECT rowid, start, end, owner, leased_at FROM {self.prefix}_leases "
+                "WHERE company = ? AND encf_type = ? AND start <= ? AND end >= ?"
+            )
+            args: Tuple[Any, ...] = (company, encf_type, end, start)
+            if owner is not None:
+                query += " AND owner = ?"
+                args += (owner,)
+            for rowid, lease_start, lease_end, lease_owner, leased_at in conn.execute(query, args).fetchall():
+                overlap = (max(start, lease_start), min(end, lease_end))
+                removed.append(overlap)
+                conn.execute(f"DELETE FROM {self.prefix}_leases WHERE rowid = ?", (rowid,))
+                rest = [(lease_start, overlap[0] - 1), (overlap[1] + 1, lease_end)]
+                conn.executemany(
+                    f"INSERT INTO {self.prefix}_leases (company, encf_type, start, end, owner, leased_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    [(company, encf_type, a, b, lease_owner, leased_at) for a, b in rest if a <= b],
+                )
+        return removed
+
+    def _insert_free(self, conn, company, encf_type, ranges: Iterable[Range]):
+        """Add `ranges` to the free ranges, merging overlapping and adjacent ones."""
+        for start, end in ranges:
+            rows = conn.execute(
+                f"SELECT start, end FROM {self.prefix}_free WHERE company = ? AND encf_type = ? "
+                "AND start <= ? AND end >= ?",
+                (company, encf_type, end + 1, start - 1),
+            ).fetchall()
+            for row_start, row_end in rows:
+                start, end = min(start, row_start), max(end, row_end)
+            conn.execute(
+                f"DELETE FROM {self.prefix}_free WHERE company = ? AND encf_type = ? AND start <= ? AND end >= ?",
+                (company, encf_type, end, start),
+            )
+            conn.execute(
+                f"INSERT INTO {self.prefix}_free (company, encf_type, start, end) VALUES (?, ?, ?, ?)",
+                (company, encf_type, start, end),
+            )
+
+    def mark_consumed(self, company: str, encf_type: int, sequences: Iterable[int]):
+        """Record sequences consumed by the tax authority."""
+        sequences = list(sequences)
+        conn = self._transaction()
+        try:
+            conn.executemany(
+                f"INSERT OR IGNORE INTO {self.prefix}_consumed (company, encf_type, sequence) VALUES (?, ?, ?)",
+                [(company, encf_type, sequence) for sequence in sequences],
+            )
+            self._unlease(conn, company, encf_type, compact_ranges(sequences), None)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def free_ranges(self, company: str, encf_type: int) -> List[Range]:
+        return [
+            tuple(row) for row in self._connection().execute(
+                f"SELECT start, end FROM {self.prefix}_free WHERE company = ? AND encf_type = ? ORDER BY start",
+                (company, encf_type),
+            )
+        ]
+
+    def close(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+class SequenceAllocator:
+    """
+    Hand out eNCF numbers of one company and document type.
+
+    Each thread draws from its own leased block, so `next` takes no lock and
+    only reaches the store when the block is used up. Blocks left unused are
+    returned to the store by `close`.
+
+    Args:
+    ----------
+    - `store` (SequenceStore): Store the blocks are leased from.
+    - `company` (str): Identification (RNC) of the issuing company.
+    - `encf_type` (int): Document type of the numbers.
+    - `block_size` (int): Number of sequences leased at a time.
+    - `owner` (str): Optional, name recorded with each lease. Must be unique
+      per allocator; defaults to the host, the process and a random suffix.
+    """
+
+    def __init__(
+        self,
+        store: SequenceStore,
+        company: str,
+        encf_type: int,
+        block_size: int = 100,
+        owner: Optional[str] = None,
+    ):
+        self.store = store
+        self.company = company
+        self.encf_type = encf_type
+        self.block_size = block_size
+        self.owner = owner or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._local = threading.local()
+        # Blocks of every thread, as [next, end] lists, for `close`.
+        self._blocks: List[List[int]] = []
+        self._blocks_lock = threading.Lock()
+
+    def _lease(self) -> List[int]:
+        start, end = self.store.reserve(
+            self.company,
+            self.encf_type,
+            self.block_size,
+            owner=self.owner,
+        )
+        block = [start, end]
+        self._local.block = block
+        with self._blocks_lock:
+            self._blocks.append(block)
+        return block
+
+    def next_sequence(self) -> int:
+        block = getattr(self._local, "block", None)
+        if block is None or block[0] > block[1]:
+            block = self._lease()
+        sequence = block[0]
+        block[0] += 1
+        return sequence
+
+    def next(self) -> str:
+        """Return the next eNCF number, e.g. `E310000000001`."""
+        return format_encf(self.encf_type, self.next_sequence())
+
+    def reconcile(self, response: Dict[str, Any]):
+        """
+        Reconcile the number of a sent document with its `DocumentResponse`:
+        it is recorded as consumed, or returned to the store when the
+        document failed or was rejected without consuming it (see
+        `is_released`). Documents still in process are skipped; reconcile
+        them again once they are final.
+        """
+        self.reconcile_documents([response])
+
+    def reconcile_documents(self, documents: Iterable[Dict[str, Any]]):
+        """`reconcile` several documents, e.g. the pages of a list method."""
+        consumed: Dict[int, List[int]] = {}
+        released: Dict[int, List[int]] = {}
+        for document in documents:
+            number = document.get("documentNumber")
+            if not number:
+                continue
+            encf_type, sequence = parse_encf(number)
+            if document.get("sequenceConsumed"):
+                consumed.setdefault(encf_type, []).append(sequence)
+            elif is_released(document):
+                released.setdefault(encf_type, []).append(sequence)
+        for encf_type, sequences in consumed.items():
+            self.store.mark_consumed(self.company, encf_type, sequences)
+        for encf_type, sequences in released.items():
+            self.store.release(self.company, encf_type, sequences, owner=self.owner)
+
+    def unused(self) -> List[Tuple[int, int]]:
+        with self._blocks_lock:
+            return [(start, end) for start, end in self._blocks if start <= end]
+
+    def close(self):
+        """Return the unused part of every leased block to the store."""
+        with self._blocks_lock:
+            blocks, self._blocks = self._blocks, []
+        ranges = [(start, end) for start, end in blocks if start <= end]
+        for block in blocks:
+            block[0] = block[1] + 1
+        if ranges:
+            self.store.release_ranges(self.company, self.encf_type, ranges, owner=self.owner)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,117 @@
+"""Request coalescing ("single-flight").
+
+When several callers ask for the same resource at the same time, only the
+first one (the leader) performs the call; the others wait for it and receive
+the same result, or the same exception. Once the call completes the key is
+released, so later calls go to the network again: this is not a cache.
+
+With `copy`, every caller of a call that was actually shared receives its
+own `copy(result)`, so callers mutating their result do not affect the
+others. Calls nobody joined return the result as is.
+
+`SingleFlight` is used by `AlanubeAPI.get` for threaded callers.
+`AsyncSingleFlight` offers the same semantics for asyncio code.
+"""
+
+from __future__ import annotations
+
+import threading
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Dict, Hashable, Optional
+
+if TYPE_CHECKING:
+    import asyncio
+
+
+class _Call:
+    __slots__ = ("event", "result", "error", "followers")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.followers = 0
+
+
+class SingleFlight:
+    """Coalesce concurrent calls sharing the same key (thread-safe)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+
+    def do(self, key: Hashable, func: Callable[[], Any], copy: Optional[Callable[[Any], Any]] = None) -> Any:
+        """
+        Call `func`, unless a call with the same `key` is already in flight,
+        in which case wait for it and return its result (or `copy(result)`
+        for each caller, see above).
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.followers += 1
+                leader = False
+            else:
+                call = self._calls[key] = _Call()
+                leader = True
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result if copy is None else copy(call.result)
+
+        try:
+            call.result = func()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+        # No follower can join once the key is released.
+        if copy is not None and call.followers:
+            return copy(call.result)
+        return call.result
+
+    def in_flight(self) -> int:
+        """Number of keys currently being fetched."""
+        return len(self._calls)
+
+
+class AsyncSingleFlight:
+    """Coalesce concurrent coroutine calls sharing the same key."""
+
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Future] = {}
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        # Imported here so that threaded users do not pay for asyncio.
+        import asyncio
+
+        future = self._calls.get(key)
+        if future is not None:
+            # Shield the shared future so that cancelling one waiter does not
+            # cancel the call for everybody else.
+            return await asyncio.shield(future)
+
+        future = asyncio.get_running_loop().create_future()
+        # Avoid "exception was never retrieved" warnings when nobody waited.
+        future.add_done_callback(lambda f: f.cancelled() or f.exception())
+        self._calls[key] = future
+        try:
+            result = await func()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self._calls[key]
+
+    def in_flight(self) -> int:
+        return len(self._calls)
@@ -0,0 +1,221 @@
+"""Streaming decode of list pages.
+
+List responses are JSON objects holding a `documents` array. Decoding the
+whole body with `response.json()` builds every document at once, including
+fields most callers never read (`xml`, `pdf`, `governmentResponse`, ...).
+
+`iter_documents` parses the body incrementally from the response stream and
+yields the documents one at a time, keeping only the keys listed in
+`fields`, so a page never has to be fully decoded in memory. The other
+top-level members (`metadata`) are collected as they are found.
+
+The list methods use it with `stream=True` (returns a `DocumentStream`) or
+with `fields=...`.
+
+Example:
+----------
+```python
+from alanube.do.api import AlanubeAPI
+
+with AlanubeAPI.get_fiscal_invoices(limit=100, stream=True, fields=("id", "status")) as documents:
+    for document in documents:
+        print(document["id"], document["status"])
+```
+"""
+
+from __future__ import annotations
+
+import codecs
+import json
+import re
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional
+
+from .exceptions import APIError
+
+
+CHUNK_SIZE = 64 * 1024
+
+_NON_WHITESPACE = re.compile(r"[^ \t\n\r]")
+
+_scan_once = json.JSONDecoder().scan_once
+
+
+class _Reader:
+    """JSON values read one at a time from a stream of text chunks."""
+
+    def __init__(self, chunks: Iterator[str]):
+        self.chunks = chunks
+        self.buffer = ""
+        self.pos = 0
+        self.exhausted = False
+
+    def _fill(self) -> bool:
+        if self.exhausted:
+            return False
+        for chunk in self.chunks:
+            if chunk:
+                if self.pos > CHUNK_SIZE:
+                    self.buffer = self.buffer[self.pos:]
+                    self.pos = 0
+                self.buffer += chunk
+                return True
+        self.exhausted = True
+        return False
+
+    def peek(self) -> str:
+        """Return the next non-whitespace character, without consuming it."""
+        while True:
+            match = _NON_WHITESPACE.search(self.buffer, self.pos)
+            if match is not None:
+                self.pos = match.start()
+                return match.group()
+            self.pos = len(self.buffer)
+            if not self._fill():
+                raise ValueError("Unexpected end of JSON document")
+
+    def expect(self, char: str):
+        if self.peek() != char:
+            raise ValueError(f"Expected {char!r} at position {self.pos}, found {self.buffer[self.pos]!r}")
+        self.pos += 1
+
+    def value(self) -> Any:
+        """Decode the next JSON value."""
+        self.peek()
+        while True:
+            try:
+                value, end = _scan_once(self.buffer, self.pos)
+            except (StopIteration, json.JSONDecodeError) as e:
+                if self._fill():
+                    continue
+                if isinstance(e, StopIteration):
+                    raise json.JSONDecodeError("Expecting value", self.buffer, e.value) from None
+                raise
+            # A number at the end of the buffer may continue in the next chunk.
+            if end == len(self.buffer) and self._fill():
+                continue
+            self.pos = end
+            return value
+
+
+def project(document: Any, fields: Optional[Iterable[str]]) -> Any:
+    """Keep only the top-level `fields` of a document."""
+    if fields is None or not isinstance(document, dict):
+        return document
+    return {field: document[field] for field in fields if field in document}
+
+
+def iter_documents(
+    chunks: Iterable[str],
+    fields: Optional[Iterable[str]] = None,
+    members: Optional[Dict[str, Any]] = None,
+    key: str = "documents",
+) -> Iterator[Any]:
+    """
+    Yield the items of the `key` array of a JSON object given as text chunks.
+
+    Items are projected on `fields` when given. The other members of the
+    object are stored in `members`.
+    """
+    fields = tuple(fields) if fields is not None else None
+    members = {} if members is None else members
+    reader = _Reader(iter(chunks))
+    reader.expect("{")
+    if reader.peek() == "}":
+        return
+    while True:
+        name = reader.value()
+        reader.expect(":")
+        if name == key and reader.peek() == "[":
+            reader.expect("[")
+            if reader.peek() == "]":
+                reader.pos += 1
+            else:
+                while True:
+                    yield project(reader.value(), fields)
+                    char = reader.peek()
+                    reader.pos += 1
+                    if char == "]":
+                        break
+                    if char != ",":
+                        raise ValueError(f"Expected ',' or ']' at position {reader.pos - 1}, found {char!r}")
+        else:
+            members[name] = reader.value()
+        if reader.peek() == "}":
+            return
+        reader.expect(",")
+
+
+def iter_text(response, chunk_size: int = CHUNK_SIZE) -> Iterator[str]:
+    """Yield the body of a `requests.Response` as decoded text chunks."""
+    encoding = response.encoding or "utf-8"
+    if getattr(response, "_content", None) is not False:
+        # The body is already in memory: decode it in one go.
+        yield (response.content or b"").decode(encoding, errors="replace")
+        return
+    decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+    for chunk in response.iter_content(chunk_size):
+        yield decoder.decode(chunk)
+    yield decoder.decode(b"", final=True)
+
+
+class DocumentStream:
+    """
+    Documents of a list response, decoded while they are read.
+
+    Iterate it once. `metadata` (and the other top-level members in
+    `members`) are available once the documents before them are read. The
+    response is closed when iteration ends or with `close`.
+
+    Args:
+    ----------
+    - `response`: A successful `requests.Response`, ideally requested with
+      `stream=True`.
+    - `fields`: Optional, top-level keys kept in each document.
+    - `transform`: Optional, applied to each (projected) document, e.g. a
+      validator or `Model.from_dict`.
+    """
+
+    def __init__(self, response, fields: Optional[Iterable[str]] = None, transform: Optional[Callable[[Any], Any]] = None):
+        self.response = response
+        self.fields = tuple(fields) if fields is not None else None
+        self.transform = transform
+        self.members: Dict[str, Any] = {}
+        self._iterator: Optional[Iterator[Any]] = None
+
+    @property
+    def metadata(self) -> Optional[Dict[str, Any]]:
+        return self.members.get("metadata")
+
+    def __iter__(self):
+        if self._iterator is None:
+            self._iterator = self._documents()
+        return self._iterator
+
+    def _documents(self) -> Iterator[Any]:
+        try:
+            documents = iter_documents(iter_text(self.response), self.fields, self.members)
+            for document in documents:
+                yield self.transform(document) if self.transform is not None else document
+            # A successful response may still contain data indicating a failure
+            # (see `handle_response_error`).
+            if self.members.get("httpStatusCode") in (400, 404, 500):
+                raise APIError(errors=self.members, response=self.response)
+        finally:
+            self.close()
+
+    def read(self) -> Dict[str, Any]:
+        """Consume the stream into a list response dict."""
+        documents = list(self)
+        return {**self.members, "documents": documents}
+
+    def close(self):
+        # Responses built from a buffered body (other transports, replays)
+        # have no connection to release.
+        if getattr(self.response, "raw", None) is not None:
+            self.response.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,178 @@
+"""HTTP transports used by `AlanubeAPI`.
+
+A transport performs a single HTTP request and returns a
+`requests.Response`, so the rest of the client (error handling, response
+processing) is independent of the HTTP library in use.
+
+- `RequestsTransport`: the default, HTTP/1.1 through `requests`.
+- `HTTP2Transport`: HTTP/2 through `httpx`, multiplexing concurrent requests
+  over a few connections. Requires the optional dependency
+  `httpx[http2]`. Servers that do not negotiate HTTP/2 are spoken to over
+  HTTP/1.1 transparently.
+
+Select the transport on connect:
+
+```python
+Alanube.connect("token", developer_mode=False, http2=True)
+```
+"""
+
+from __future__ import annotations
+
+import logging
+from typing import Any, Dict, Optional, Protocol
+
+from alanube.utils import lazy_import
+
+
+requests = lazy_import("requests")
+
+logger = logging.getLogger(__package__)
+
+
+class Transport(Protocol):
+    """Interface of the transports used by `AlanubeAPI.request`."""
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        headers: Dict[str, str],
+        params: Optional[Dict[str, Any]] = None,
+        json: Any = None,
+        **kwargs,
+    ) -> requests.Response:
+        ...
+
+    def close(self) -> None:
+        ...
+
+
+class RequestsTransport:
+    """HTTP/1.1 transport backed by `requests`."""
+
+    def request(self, method, url, headers, params=None, json=None, **kwargs) -> requests.Response:
+        # Only forward options that were actually set, keeping the call
+        # identical to a plain `requests.request` in the common case.
+        options = {k: v for k, v in kwargs.items() if v is not None}
+        return requests.request(method, url, headers=headers, params=params, json=json, **options)
+
+    def close(self):
+        pass
+
+
+class _HTTPXRaw:
+    """
+    `Response.raw` of a streamed `httpx.Response`: lets `requests` read the
+    body incrementally (`iter_content`) and release the stream (`close`).
+    """
+
+    def __init__(self, response):
+        self.response = response
+
+    def stream(self, chunk_size: Optional[int] = None, decode_content: bool = True):
+        # httpx decodes the content encoding (gzip, ...) itself.
+        return self.response.iter_bytes(chunk_size)
+
+    def read(self, size: Optional[int] = None) -> bytes:
+        return b"".join(self.response.iter_bytes(size))
+
+    def close(self):
+        self.response.close()
+
+
+def httpx_to_requests_response(response, stream: bool = False) -> requests.Response:
+    """
+    Convert an `httpx.Response` into an equivalent `requests.Response`.
+
+    With `stream` the body of the (streamed) response is not read: it is
+    exposed through `raw`, like `requests.request(..., stream=True)` does.
+    """
+    from requests.structures import CaseInsensitiveDict
+
+    result = requests.Response()
+    result.status_code = response.status_code
+    if stream:
+        result._content = False
+        result.raw = _HTTPXRaw(response)
+    else:
+        result._content = response.content
+    result.headers = CaseInsensitiveDict(response.headers)
+    result.url = str(response.url)
+    result.encoding = response.encoding
+    result.reason = response.reason_phrase
+    try:
+        result.elapsed = response.elapsed
+    except RuntimeError:
+        # Only available once the response is closed, which mock
+        # transports do not always do.
+        pass
+    result.http_version = response.http_version  # type: ignore[attr-defined]
+    return result
+
+
+class HTTP2Transport:
+    """
+    HTTP/2 transport backed by an `httpx.Client`.
+
+    The client is thread-safe: concurrent calls from several threads are
+    multiplexed as streams over up to `max_connections` connections.
+
+    Args:
+    ----------
+    - `max_connections` (int): Maximum number of open connections.
+    - `timeout` (float): Default timeout of each request, in seconds.
+    - `client`: Optional preconfigured `httpx.Client`.
+    """
+
+    def __init__(self, max_connections: int = 10, timeout: Optional[float] = 30, client=None):
+        if client is None:
+            import httpx
+
+            client = httpx.Client(
+                http2=True,
+                limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+                timeout=timeout,
+            )
+        self.client = client
+
+    def request(
+        self, method, url, headers, params=None, json=None, data=None, timeout=None, stream=None, **kwargs,
+    ) -> requests.Response:
+        options: Dict[str, Any] = {}
+        if timeout is not None:
+            options["timeout"] = timeout
+        if stream:
+            request = self.client.build_request(
+                method, url, headers=headers, params=params, json=json, content=data, **options,
+            )
+            return httpx_to_requests_response(self.client.send(request, stream=True), stream=True)
+        response = self.client.request(method, url, headers=headers, params=params, json=json, content=data, **options)
+        return httpx_to_requests_response(response)
+
+    def close(self):
+        self.client.close()
+
+
+def http2_available() -> bool:
+    """Whether the optional HTTP/2 dependencies (`httpx`, `h2`) are installed."""
+    try:
+        import h2  # noqa: F401
+        import httpx  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def make_transport(http2: bool = False, **options):
+    """
+    Return the transport for the requested protocol.
+
+    When HTTP/2 is requested but `httpx[http2]` is not installed, a warning is
+    logged and the HTTP/1.1 transport is returned instead.
+    """
+    if http2:
+        if http2_available():
+            return HTTP2Transport(**options)
+        logger.warning("HTTP/2 requested but httpx[http2] is not installed; falling back to HTTP/1.1.")
+    return RequestsTransport()
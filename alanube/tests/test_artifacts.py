@@ -0,0 +1,68 @@
+import hashlib
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+
+from alanube.do.artifacts import DOWNLOADED, FAILED, RESUMED, SKIPPED, ArtifactFetcher
+
+
+CONTENT = b"<xml>" + b"a" * 1000 + b"</xml>"
+
+
+def fake_response(status_code, body):
+    response = MagicMock()
+    response.status_code = status_code
+    response.iter_content.side_effect = lambda chunk_size: (body[i:i + chunk_size] for i in range(0, len(body), chunk_size))
+    response.__enter__.return_value = response
+    if status_code >= 400:
+        import requests
+        response.raise_for_status.side_effect = requests.HTTPError(str(status_code))
+    return response
+
+
+class TestArtifactFetcher(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.session = MagicMock()
+        self.fetcher = ArtifactFetcher(self.tmp.name, max_workers=2, chunk_size=64, session=self.session)
+        self.document = {"id": "1", "companyIdentification": "132109122", "documentNumber": "E310000000001",
+                         "xml": "https://files/1.xml", "pdf": None}
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_download_then_skip(self):
+        self.session.get.return_value = fake_response(200, CONTENT)
+        [result] = self.fetcher.fetch_document(self.document)
+        self.assertEqual(result.status, DOWNLOADED)
+        self.assertEqual(result.path, os.path.join(self.tmp.name, "132109122", "E310000000001.xml"))
+        self.assertEqual(result.sha256, hashlib.sha256(CONTENT).hexdigest())
+        with open(result.path, "rb") as f:
+            self.assertEqual(f.read(), CONTENT)
+
+        [result] = self.fetcher.fetch_document(self.document)
+        self.assertEqual(result.status, SKIPPED)
+        self.session.get.assert_called_once()
+
+    def test_resume_partial_download(self):
+        path = self.fetcher.path_for(self.document, "xml")
+        os.makedirs(os.path.dirname(path))
+        with open(path + ".part", "wb") as f:
+            f.write(CONTENT[:100])
+        self.session.get.return_value = fake_response(206, CONTENT[100:])
+
+        result = self.fetcher.fetch("https://files/1.xml", path)
+        self.assertEqual(result.status, RESUMED)
+        self.assertEqual(self.session.get.call_args.kwargs["headers"], {"Range": "bytes=100-"})
+        self.assertEqual(result.sha256, hashlib.sha256(CONTENT).hexdigest())
+        self.assertFalse(os.path.exists(path + ".part"))
+
+    def test_fetch_many_reports_failures(self):
+        self.session.get.side_effect = lambda url, **kwargs: fake_response(500 if "bad" in url else 200, CONTENT)
+        documents = [dict(self.document, id=str(i), documentNumber=f"E3100000000{i:02d}",
+                          xml=f"https://files/{'bad' if i == 3 else i}.xml") for i in range(10)]
+        results = list(self.fetcher.fetch_many(documents))
+        self.assertEqual(len(results), 10)
+        self.assertEqual([r.document_id for r in results if r.status == FAILED], ["3"])
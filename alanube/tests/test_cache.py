@@ -0,0 +1,144 @@
+import os
+import tempfile
+import unittest
+from datetime import date
+from unittest.mock import MagicMock, patch
+
+from alanube.do.api import AlanubeAPI
+from alanube.do.cache import (
+    CompanyCache,
+    DirectoryCacheBackend,
+    MemoryCacheBackend,
+    ReportCache,
+    SQLiteCacheBackend,
+)
+
+
+class TestCacheBackends(unittest.TestCase):
+
+    def check_backend(self, backend):
+        self.assertIsNone(backend.get("a"))
+        value = {"x": 1}
+        backend.set("a", value)
+        value["x"] = 2
+        backend.get("a")["x"] = 3
+        # Stored and returned values are copies.
+        self.assertEqual(backend.get("a"), {"x": 1})
+        backend.set("b", [1, 2], ttl=-1)
+        self.assertIsNone(backend.get("b"))
+        backend.delete("a")
+        self.assertIsNone(backend.get("a"))
+        backend.set("c", 3)
+        backend.clear()
+        self.assertIsNone(backend.get("c"))
+
+    def test_memory_backend(self):
+        self.check_backend(MemoryCacheBackend())
+
+    def test_memory_backend_lru_eviction(self):
+        backend = MemoryCacheBackend(maxsize=2)
+        backend.set("a", 1)
+        backend.set("b", 2)
+        backend.get("a")
+        backend.set("c", 3)
+        self.assertEqual(backend.get("a"), 1)
+        self.assertIsNone(backend.get("b"))
+
+    def test_sqlite_backend(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            self.check_backend(SQLiteCacheBackend(os.path.join(tmp, "cache.db")))
+
+    def test_directory_backend(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            self.check_backend(DirectoryCacheBackend(tmp))
+
+
+class TestReportCache(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = ReportCache(current_ttl=30, closed_ttl=None, today=lambda: date(2024, 5, 15))
+
+    def test_ttl_for_closed_and_current_periods(self):
+        self.assertIsNone(self.cache.ttl_for("2024-04-30"))
+        self.assertEqual(self.cache.ttl_for("2024-05-15"), 30)
+        self.assertEqual(self.cache.ttl_for(None), 30)
+
+    def test_rolling_key_changes_with_month(self):
+        key = self.cache.make_key("monthly", "c1")
+        self.cache.today = lambda: date(2024, 6, 1)
+        self.assertNotEqual(key, self.cache.make_key("monthly", "c1"))
+
+    def test_get_or_fetch(self):
+        fetch = MagicMock(return_value={"data": 1})
+        self.assertEqual(self.cache.get_or_fetch(fetch, "total", "c1", "2024-01-01", "2024-01-31"), {"data": 1})
+        self.assertEqual(self.cache.get_or_fetch(fetch, "total", "c1", "2024-01-01", "2024-01-31"), {"data": 1})
+        fetch.assert_called_once()
+        self.assertEqual(self.cache.stats.hits, 1)
+        self.assertEqual(self.cache.stats.misses, 1)
+
+
+class TestAlanubeAPIReportCache(unittest.TestCase):
+
+    def setUp(self):
+        AlanubeAPI.connect("test_token", True, report_cache=ReportCache())
+
+    def tearDown(self):
+        AlanubeAPI.connect("test_token", True)
+
+    @patch('alanube.do.api.requests.request')
+    def test_report_is_requested_once(self, mock_request):
+        mock_response = MagicMock()
+        mock_response.json.return_value = {"totalEmittedDocuments": []}
+        mock_response.status_code = 200
+        mock_request.return_value = mock_response
+
+        for _ in range(3):
+            data = AlanubeAPI.get_report_company_emitted_documents_monthly("123")
+        self.assertEqual(data, {"totalEmittedDocuments": []})
+        mock_request.assert_called_once()
+        AlanubeAPI.get_report_company_accepted_documents_monthly("123")
+        self.assertEqual(mock_request.call_count, 2)
+
+
+class TestAlanubeAPICompanyCache(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = CompanyCache(ttl=60)
+        AlanubeAPI.connect("test_token", True, company_cache=self.cache)
+
+    def tearDown(self):
+        AlanubeAPI.connect("test_token", True)
+
+    def make_response(self, status_code, data=None, headers=None):
+        response = MagicMock()
+        response.status_code = status_code
+        response.json.return_value = data
+        response.headers = headers or {}
+        return response
+
+    @patch('alanube.do.api.requests.request')
+    def test_get_company_is_cached_and_invalidated_on_update(self, mock_request):
+        mock_request.return_value = self.make_response(200, {"id": "123", "name": "A"})
+        self.assertEqual(AlanubeAPI.get_company("123"), {"id": "123", "name": "A"})
+        self.assertEqual(AlanubeAPI.get_company("123"), {"id": "123", "name": "A"})
+        self.assertEqual(mock_request.call_count, 1)
+
+        mock_request.return_value = self.make_response(200, {"id": "123", "name": "B"})
+        AlanubeAPI.update_company({"name": "B"}, "123")
+        self.assertEqual(AlanubeAPI.get_company("123")["name"], "B")
+        self.assertEqual(mock_request.call_count, 3)
+        self.assertEqual(self.cache.stats.hits, 1)
+        self.assertEqual(self.cache.stats.invalidations, 1)
+
+    @patch('alanube.do.api.requests.request')
+    def test_stale_entry_is_revalidated(self, mock_request):
+        self.cache.ttl = -1
+        mock_request.return_value = self.make_response(200, {"id": "123"}, {"ETag": '"v1"'})
+        AlanubeAPI.get_company("123")
+
+        mock_request.return_value = self.make_response(304)
+        self.assertEqual(AlanubeAPI.get_company("123"), {"id": "123"})
+        headers = mock_request.call_args.kwargs["headers"]
+        self.assertEqual(headers["If-None-Match"], '"v1"')
+        self.assertEqual(headers["Authorization"], "Bearer test_token")
+        self.assertEqual(self.cache.stats.revalidations, 1)
@@ -0,0 +1,75 @@
+import unittest
+from unittest.mock import patch
+
+from alanube.do.api import AlanubeAPI
+from alanube.do.cancellations import (
+    FAILED,
+    SENT,
+    build_cancellation_payload,
+    cancel_encfs,
+    compact_encf_ranges,
+    compact_ranges,
+    send_cancellations,
+    track_cancellations,
+)
+from alanube.do.exceptions import ValidationError
+
+
+class TestCancellations(unittest.TestCase):
+
+    def setUp(self):
+        AlanubeAPI.connect("test_token", True)
+
+    def test_compact_ranges(self):
+        self.assertEqual(compact_ranges([5, 1, 2, 3, 3, 9, 10, 7]), [(1, 3), (5, 5), (7, 7), (9, 10)])
+        self.assertEqual(compact_ranges([]), [])
+
+    def test_compact_encf_ranges(self):
+        encfs = ["E320000000010", "e310000000002", "E310000000001", "E310000000004", "E320000000011"]
+        self.assertEqual(compact_encf_ranges(encfs), {31: [(1, 2), (4, 4)], 32: [(10, 11)]})
+        with self.assertRaises(ValueError):
+            compact_encf_ranges(["B0100000001"])
+
+    def test_build_payload(self):
+        payload = build_cancellation_payload(31, [(1, 2), (4, 4)], sender={"rnc": "101010101"})
+        self.assertEqual(payload["sender"], {"rnc": "101010101"})
+        self.assertEqual(payload["cancelledEncfQuantity"], 3)
+        self.assertEqual(
+            payload["cancellationDetail"][0]["cancelledSequenceRanges"],
+            [
+                {"encfFrom": "E310000000001", "encfTo": "E310000000002"},
+                {"encfFrom": "E310000000004", "encfTo": "E310000000004"},
+            ],
+        )
+
+    @patch.object(AlanubeAPI, 'get_cancellations')
+    @patch.object(AlanubeAPI, 'send_cancellation')
+    def test_send_and_track(self, mock_send, mock_list):
+        def send(payload):
+            encf_type = payload["cancellationDetail"][0]["encfType"]
+            if encf_type == 33:
+                raise ValidationError(message="Invalid range")
+            return {"id": f"c{encf_type}"}
+
+        mock_send.side_effect = send
+        mock_list.side_effect = [
+            {"documents": [{"id": "other"}, {"id": "c31", "status": "REGISTERED"}]},
+            {"documents": [{"id": "c32", "status": "FINISHED"}]},
+        ]
+
+        encfs = ["E310000000001", "E310000000002", "E320000000005", "E330000000001"]
+        batch = track_cancellations(send_cancellations(encfs), limit=2)
+
+        self.assertEqual(mock_send.call_count, 3)
+        self.assertEqual([r.status for r in batch.results], [SENT, SENT, FAILED])
+        self.assertEqual(batch.results[0].record["status"], "REGISTERED")
+        self.assertEqual(batch.results[1].record["status"], "FINISHED")
+        self.assertEqual(batch.pending, [])
+        self.assertEqual(len(batch.failed), 1)
+        self.assertEqual(mock_list.call_count, 2)
+
+    @patch.object(AlanubeAPI, 'send_cancellation', return_value={"id": "c"})
+    def test_max_ranges_splits_requests(self, mock_send):
+        encfs = [f"E31{n:010d}" for n in (1, 3, 5, 7, 9)]
+        batch = cancel_encfs(encfs, max_ranges=2, track=False)
+        self.assertEqual([r.ranges for r in batch.results], [[(1, 1), (3, 3)], [(5, 5), (7, 7)], [(9, 9)]])
@@ -0,0 +1,127 @@
+import unittest
+from unittest.mock import MagicMock, patch
+
+import requests
+
+from alanube.do.api import AlanubeAPI
+from alanube.do.circuit import CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitBreakers, endpoint_family
+from alanube.do.exceptions import APIError, CircuitOpenError, NotFound
+from alanube.do.metrics import Metrics
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def response(status_code, data=None):
+    return MagicMock(status_code=status_code, json=MagicMock(return_value=data or {}))
+
+
+class TestCircuitBreaker(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.breaker = CircuitBreaker(
+            "send", window_size=4, minimum_calls=4, failure_rate=0.5, open_timeout=10, half_open_calls=2,
+            slow_call_duration=5, clock=self.clock,
+        )
+
+    def fail(self):
+        with self.assertRaises(APIError):
+            self.breaker.call(MagicMock(side_effect=APIError(response=MagicMock(status_code=503))))
+
+    def test_opens_on_failure_rate_and_recovers(self):
+        self.breaker.call(lambda: 1)
+        self.breaker.call(lambda: 1)
+        self.fail()
+        self.assertEqual(self.breaker.state, CLOSED)
+        self.fail()
+        self.assertEqual(self.breaker.state, OPEN)
+
+        func = MagicMock()
+        with self.assertRaises(CircuitOpenError) as cm:
+            self.breaker.call(func)
+        func.assert_not_called()
+        self.assertEqual(cm.exception.family, "send")
+        self.assertEqual(cm.exception.retry_after, 10)
+
+        self.clock.now = 10
+        self.assertEqual(self.breaker.state, HALF_OPEN)
+        self.breaker.call(lambda: 1)
+        self.assertEqual(self.breaker.state, HALF_OPEN)
+        self.breaker.call(lambda: 1)
+        self.assertEqual(self.breaker.state, CLOSED)
+
+    def test_failed_probe_reopens(self):
+        for _ in range(4):
+            self.fail()
+        self.clock.now = 10
+        self.fail()
+        self.assertEqual(self.breaker.state, OPEN)
+        self.assertEqual(self.breaker.retry_after(), 10)
+
+    def test_client_errors_are_not_failures(self):
+        for _ in range(4):
+            with self.assertRaises(NotFound):
+                self.breaker.call(MagicMock(side_effect=NotFound(response=MagicMock(status_code=404))))
+        self.assertEqual(self.breaker.state, CLOSED)
+        for _ in range(2):
+            with self.assertRaises(requests.ConnectionError):
+                self.breaker.call(MagicMock(side_effect=requests.ConnectionError()))
+        self.assertEqual(self.breaker.state, OPEN)
+
+    def test_opens_on_slow_calls(self):
+        def slow():
+            self.clock.now += 6
+
+        for _ in range(4):
+            self.breaker.call(slow)
+        self.assertEqual(self.breaker.state, OPEN)
+
+
+class TestCircuitBreakers(unittest.TestCase):
+
+    def setUp(self):
+        self.metrics = Metrics()
+        self.breakers = CircuitBreakers(metrics=self.metrics, window_size=2, minimum_calls=2, open_timeout=30)
+        AlanubeAPI.connect("test_token", True, circuit_breakers=self.breakers)
+
+    def tearDown(self):
+        AlanubeAPI.connect("test_token", True)
+
+    def test_endpoint_family(self):
+        api_url = AlanubeAPI.config.api_url
+        self.assertEqual(endpoint_family("POST", f"{api_url}/invoices"), "send")
+        self.assertEqual(endpoint_family("GET", f"{api_url}/invoices/1"), "query")
+        self.assertEqual(endpoint_family("GET", f"{api_url}/cancellations"), "query")
+        self.assertEqual(endpoint_family("GET", f"{api_url}/received-documents"), "received")
+        self.assertEqual(endpoint_family("GET", f"{api_url}/check-directory"), "directory")
+        self.assertEqual(endpoint_family("GET", f"{api_url}/companies/1/emitted-documents"), "reports")
+        self.assertEqual(endpoint_family("GET", f"{api_url}/reports/users/documents/total"), "reports")
+        self.assertEqual(endpoint_family("GET", f"{api_url}/company"), "company")
+
+    @patch('alanube.do.api.requests.request')
+    def test_open_circuit_fails_fast_per_family(self, mock_request):
+        mock_request.return_value = response(500, {"message": "down"})
+        for _ in range(2):
+            with self.assertRaises(APIError):
+                AlanubeAPI.send_invoice({})
+        self.assertEqual(mock_request.call_count, 2)
+
+        with self.assertRaises(CircuitOpenError):
+            AlanubeAPI.send_invoice({})
+        self.assertEqual(mock_request.call_count, 2)
+
+        # Other families are unaffected.
+        mock_request.return_value = response(200, {"id": "1"})
+        self.assertEqual(AlanubeAPI.get_invoice("1"), {"id": "1"})
+        self.assertEqual(self.breakers.states(), {"send": OPEN, "query": CLOSED})
+
+        snapshot = self.metrics.snapshot()
+        self.assertEqual(snapshot["gauges"]["circuit.send.state"], OPEN)
+        self.assertEqual(snapshot["counters"]["circuit.send.rejected"], 1)
@@ -0,0 +1,162 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+from typing import Optional
+from unittest.mock import patch
+
+from alanube.do.cli import Checkpoint, RateLimiter, main, read_records, run_records, send_record
+from alanube.do.exceptions import APIError
+
+
+def write_jsonl(path, records):
+    with open(path, "w", encoding="utf-8") as file:
+        for record in records:
+            file.write((record if isinstance(record, str) else json.dumps(record)) + "\n")
+
+
+def read_jsonl(path):
+    with open(path, encoding="utf-8") as file:
+        return [json.loads(line) for line in file]
+
+
+class TestCLI(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.input = os.path.join(self.tmp.name, "documents.jsonl")
+        self.output = os.path.join(self.tmp.name, "sent.jsonl")
+        self.checkpoint = os.path.join(self.tmp.name, "sent.ckpt")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_read_records_from_offset(self):
+        write_jsonl(self.input, [{"a": 1}, "", "not json", [1], {"a": 2}])
+        records = list(read_records(self.input))
+        self.assertEqual([line for line, _, _ in records], [1, 3, 4, 5])
+        self.assertIn("_error", records[1][2])
+        self.assertIn("_error", records[2][2])
+        line, offset, _ = records[2]
+        self.assertEqual(list(read_records(self.input, offset, line)), records[3:])
+
+    def test_send_writes_results_and_errors(self):
+        write_jsonl(self.input, [
+            {"encf_type": 32, "payload": {"n": 1}},
+            {"encf_type": 32, "payload": {"n": 2, "fail": True}},
+            {"encf_type": 99, "payload": {}},
+        ])
+        errors = os.path.join(self.tmp.name, "errors.jsonl")
+
+        def send(payload):
+            if payload.get("fail"):
+                raise APIError(message="down")
+            return {"id": f"doc-{payload['n']}"}
+
+        with patch("alanube.do.client.Alanube.send_document_func_map", {32: send}):
+            code = main(["--token", "t", "--sandbox", "send", self.input, "-o", self.output, "--errors", errors])
+        self.assertEqual(code, 1)
+        results = sorted(read_jsonl(self.output), key=lambda r: r["line"])
+        self.assertEqual([r["status"] for r in results], ["sent", "failed", "failed"])
+        self.assertEqual(results[0]["response"], {"id": "doc-1"})
+        self.assertEqual(sorted(r["line"] for r in read_jsonl(errors)), [2, 3])
+
+    def test_resume_from_checkpoint(self):
+        write_jsonl(self.input, [{"encf_type": 32, "payload": {"n": n}} for n in range(1, 6)])
+        checkpoint = Checkpoint(self.checkpoint, self.input)
+        # Lines 1, 2 and 4 were done before the interruption.
+        for line, offset, _ in read_records(self.input):
+            checkpoint.dispatched(line, offset)
+        for line in (1, 2, 4):
+            checkpoint.complete(line)
+        self.assertEqual((checkpoint.line, checkpoint.done), (2, {4}))
+
+        sent = []
+        with patch("alanube.do.client.Alanube.send_document_func_map", {32: lambda p: sent.append(p["n"]) or {}}):
+            code = main(["--token", "t", "send", self.input, "-o", self.output, "--checkpoint", self.checkpoint])
+        self.assertEqual(code, 0)
+        self.assertEqual(sorted(sent), [3, 5])
+        with open(self.checkpoint, encoding="utf-8") as file:
+            state = json.load(file)
+        self.assertEqual((state["line"], state["done"]), (5, []))
+
+        # Nothing is left to do.
+        with patch("alanube.do.client.Alanube.send_document_func_map", {32: lambda p: sent.append(p["n"]) or {}}):
+            main(["--token", "t", "send", self.input, "-o", self.output, "--checkpoint", self.checkpoint])
+        self.assertEqual(sorted(sent), [3, 5])
+
+    def test_checkpoint_saved_before_output(self):
+        class CrashingOutput(io.StringIO):
+            def write(self, text):
+                raise OSError("disk full")
+
+        checkpoint = Checkpoint(self.checkpoint, self.input)
+        with self.assertRaises(OSError):
+            run_records(iter([(1, 10, {})]), lambda record: {"status": "sent"}, CrashingOutput(), checkpoint=checkpoint)
+        # The record is not sent again on restart.
+        self.assertEqual(Checkpoint(self.checkpoint, self.input).line, 1)
+
+    def test_poll_reads_send_output(self):
+        write_jsonl(self.input, [{"line": 1, "encf_type": 31, "status": "sent", "response": {"id": "doc-1"}}])
+        with patch("alanube.do.client.Alanube.get_document_func_map", {31: lambda id_, company_id: {"id": id_}}):
+            main(["--token", "t", "poll", self.input, "-o", self.output])
+        self.assertEqual(read_jsonl(self.output), [
+            {"line": 1, "status": "ok", "encf_type": 31, "id": "doc-1", "response": {"id": "doc-1"}},
+        ])
+
+    def test_export(self):
+        path = os.path.join(self.tmp.name, "invoices.jsonl")
+        pages = [{"documents": [{"id": "1"}, {"id": "2"}]}, {"documents": [{"id": "3"}]}]
+
+        calls = []
+
+        def get_documents(page: int = 1, start: Optional[int] = None, **params):
+            calls.append(dict(params, page=page, start=start))
+            return pages[page - 1]
+
+        with patch("alanube.do.client.Alanube.get_documents_func_map", {31: get_documents}):
+            main([
+                "--token", "t", "export", "31", path, "--limit", "2", "--start", "2024-01-01", "--end", "2024-01-31",
+            ])
+        self.assertEqual([r["id"] for r in read_jsonl(path)], ["1", "2", "3"])
+        # Document lists filter by timestamps, the end date is included.
+        self.assertEqual(calls[0]["start"], 1704067200)
+        self.assertEqual(calls[0]["end"], 1706745599)
+
+    def test_export_bounds(self):
+        path = os.path.join(self.tmp.name, "received.jsonl")
+        with patch("alanube.do.api.AlanubeAPI.get_received_documents", return_value={"documents": []}) as func:
+            main(["--token", "t", "export", "received", path, "--start", "1704067200", "--end", "2024-01-31"])
+        self.assertEqual(func.call_args.kwargs["start"], "2024-01-01")
+        self.assertEqual(func.call_args.kwargs["end"], "2024-01-31")
+        with self.assertRaises(SystemExit), patch("sys.stderr"):
+            main(["--token", "t", "export", "31", path, "--start", "yesterday"])
+
+    def test_concurrency_and_rate(self):
+        clock = [0.0]
+        sleeps = []
+
+        def sleep(seconds):
+            sleeps.append(seconds)
+            clock[0] += seconds
+
+        limiter = RateLimiter(2, burst=2, clock=lambda: clock[0], sleep=sleep)
+        for _ in range(4):
+            limiter.acquire()
+        self.assertEqual(sleeps, [0.5, 0.5])
+
+        records = ((n, 0, {"n": n}) for n in range(1, 21))
+        output = io.StringIO()
+        counts = run_records(records, lambda record: {"status": "ok"}, output, concurrency=3)
+        self.assertEqual(counts, {"ok": 20})
+        self.assertEqual(len(output.getvalue().splitlines()), 20)
+
+    def test_requires_token(self):
+        with patch.dict(os.environ, {}, clear=True):
+            with self.assertRaises(SystemExit):
+                main(["send", self.input])
+
+    def test_send_record_validates(self):
+        with self.assertRaises(ValueError):
+            send_record({"_error": "Invalid JSON"})
@@ -0,0 +1,99 @@
+import os
+import tempfile
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+
+from alanube.do.api import AlanubeAPI
+from alanube.do.client import Alanube
+from alanube.do.credentials import CredentialProvider, EnvTokenWatcher, FileTokenWatcher
+
+
+class TestCredentials(unittest.TestCase):
+
+    def tearDown(self):
+        AlanubeAPI.connect("test_token", True)
+
+    def test_headers_are_a_new_dict(self):
+        AlanubeAPI.connect("token-1", True)
+        headers = AlanubeAPI.get_headers()
+        self.assertEqual(headers["Authorization"], "Bearer token-1")
+        headers["X-Trace"] = "1"
+        self.assertNotIn("X-Trace", AlanubeAPI.get_headers())
+
+    @patch('alanube.do.api.requests.request')
+    def test_rotation_keeps_transport(self, mock_request):
+        mock_request.return_value = MagicMock(status_code=200, json=MagicMock(return_value={}))
+        provider = CredentialProvider("token-1")
+        Alanube.connect(None, True, credentials=provider)
+        self.assertEqual(AlanubeAPI.config.token, "token-1")
+        transport = AlanubeAPI.transport
+
+        credential = Alanube.rotate_token("token-2")
+        self.assertEqual(credential.version, 2)
+        self.assertEqual(AlanubeAPI.config.token, "token-2")
+        self.assertIs(Alanube.rotate_token("token-2"), credential)
+        self.assertIs(AlanubeAPI.transport, transport)
+
+        AlanubeAPI.get_invoice("1")
+        self.assertEqual(mock_request.call_args.kwargs["headers"]["Authorization"], "Bearer token-2")
+
+        # Rotations of the provider itself (e.g. by a watcher) update the config too.
+        provider.rotate("token-3")
+        self.assertEqual(AlanubeAPI.config.token, "token-3")
+        AlanubeAPI.connect("token-4", True)
+        provider.rotate("token-5")
+        self.assertEqual(AlanubeAPI.config.token, "token-4")
+
+    def test_requires_token(self):
+        with self.assertRaises(ValueError):
+            CredentialProvider("")
+        with self.assertRaises(ValueError):
+            CredentialProvider("token").rotate(None)
+
+    def test_env_watcher(self):
+        provider = CredentialProvider("token-1")
+        watcher = EnvTokenWatcher(provider, name="ALANUBE_TEST_TOKEN")
+        with patch.dict(os.environ, {"ALANUBE_TEST_TOKEN": "token-1"}):
+            self.assertFalse(watcher.check())
+        with patch.dict(os.environ, {"ALANUBE_TEST_TOKEN": "token-2"}):
+            self.assertTrue(watcher.check())
+        self.assertEqual(provider.token, "token-2")
+        # A missing variable keeps the current token.
+        self.assertFalse(watcher.check())
+
+    def test_file_watcher(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "token")
+            with open(path, "w") as file:
+                file.write("token-1\n")
+            provider = CredentialProvider("token-1")
+            watcher = FileTokenWatcher(provider, path, interval=0.01)
+            self.assertFalse(watcher.check())
+
+            with open(path, "w") as file:
+                file.write("token-22\n")
+            self.assertTrue(watcher.check())
+            self.assertEqual(provider.current.headers["Authorization"], "Bearer token-22")
+
+            os.remove(path)
+            self.assertFalse(watcher.check())
+
+            with open(path, "w") as file:
+                file.write("token-333\n")
+            with watcher:
+                for _ in range(500):
+                    if provider.token == "token-333":
+                        break
+                    watcher._stop.wait(0.01)
+            self.assertEqual(provider.token, "token-333")
+
+            # A stopped watcher can be started again.
+            with open(path, "w") as file:
+                file.write("token-4444\n")
+            with watcher:
+                for _ in range(500):
+                    if provider.token == "token-4444":
+                        break
+                    time.sleep(0.01)
+            self.assertEqual(provider.token, "token-4444")
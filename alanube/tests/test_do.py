@@ -1,9 +1,14 @@
+import subprocess
+import sys
+import textwrap
 import unittest
+import warnings
 from unittest.mock import MagicMock, patch
 
 from alanube.do import Alanube
 from alanube.do.api import APIConfig, AlanubeAPI
 from alanube.do.exceptions import ValidationError
+from alanube.utils import build_url
 
 
 class TestAlanube(unittest.TestCase):
@@ -45,6 +50,78 @@ class TestAlanube(unittest.TestCase):
             self.assertIsInstance(key, int)
 
 
+class TestUtils(unittest.TestCase):
+
+    def test_build_url(self):
+        url = build_url("https://x/docs", "c1", "d1", legal_status="ACCEPTED,REJECTED", page=2, status=None)
+        self.assertEqual(url, "https://x/docs/d1/idCompany/c1?legalStatus=ACCEPTED,REJECTED&page=2")
+
+    def test_build_url_encodes_values(self):
+        url = build_url("https://x/docs", id_="a/b", document_number="E31 0&1")
+        self.assertEqual(url, "https://x/docs/a%2Fb?documentNumber=E31%200%261")
+
+    def test_config_endpoints_are_computed_once(self):
+        config = APIConfig("token", True)
+        self.assertIs(config.endpoint_fiscal_invoices, config.endpoint_fiscal_invoices)
+        self.assertEqual(config.endpoints["fiscal_invoices"], "https://sandbox.alanube.co/dom/v1/fiscal-invoices")
+
+
+class TestLazyLoading(unittest.TestCase):
+
+    def run_python(self, code):
+        return subprocess.run([sys.executable, "-c", code], check=True, capture_output=True, text=True).stdout.split()
+
+    def test_import_is_lazy(self):
+        output = self.run_python(
+            "import sys, alanube.do; print('alanube.do.api' in sys.modules, 'urllib3' in sys.modules);"
+            "from alanube.do import Alanube; print('alanube.do.api' in sys.modules, 'urllib3' in sys.modules)"
+        )
+        self.assertEqual(output, ["False", "False", "True", "False"])
+        output = self.run_python("import sys, alanube.do.artifacts; print('urllib3' in sys.modules)")
+        self.assertEqual(output, ["False"])
+
+    def test_lazy_import_is_thread_safe(self):
+        output = self.run_python(textwrap.dedent("""
+            import threading
+            from alanube.utils import lazy_import
+
+            requests = lazy_import("requests")
+            barrier = threading.Barrier(16)
+            errors = []
+
+            def work():
+                barrier.wait()
+                try:
+                    requests.request
+                except Exception as e:
+                    errors.append(e)
+
+            threads = [threading.Thread(target=work) for _ in range(16)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            print(len(errors))
+        """))
+        self.assertEqual(output, ["0"])
+
+    def test_deprecated_functions(self):
+        from alanube.do import utils
+
+        def get_company(company_id):
+            return {"id": company_id}
+
+        with warnings.catch_warnings(record=True) as caught, patch.object(AlanubeAPI, "get_company", get_company):
+            warnings.simplefilter("always")
+            # Built on first access, so it wraps the patched method.
+            vars(utils).pop("get_company", None)
+            self.assertEqual(utils.get_company("1"), {"id": "1"})
+        vars(utils).pop("get_company", None)
+        self.assertIs(caught[0].category, DeprecationWarning)
+        with self.assertRaises(AttributeError):
+            utils.missing
+
+
 class TestAlanubeAPI(unittest.TestCase):
 
     @classmethod
@@ -0,0 +1,131 @@
+import csv
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import MagicMock
+
+from alanube.do.export import DOCUMENT_COLUMNS, columns_for, export_documents, flatten_document
+from alanube.do.metrics import Metrics
+from alanube.do.pagination import PageSizeTuner, paginate
+from alanube.do.types import ReceivedDocumentsResponse
+
+
+def make_list_func(total, limit_key="limit"):
+    documents = [
+        {
+            "id": str(i),
+            "status": "FINISHED",
+            "sequenceConsumed": True,
+            "governmentResponse": {"code": 1, "value": [{"valor": "ok", "codigo": 0}]},
+        }
+        for i in range(total)
+    ]
+
+    def func(limit=25, page=1, **params):
+        start = (page - 1) * limit
+        return {"metadata": {"current_page": page, "limit": limit}, "documents": documents[start:start + limit]}
+
+    return MagicMock(side_effect=func)
+
+
+class TestPagination(unittest.TestCase):
+
+    def test_paginate_walks_all_pages(self):
+        func = make_list_func(53)
+        ids = [d["id"] for d in paginate(func, limit=25, company_id="c1")]
+        self.assertEqual(ids, [str(i) for i in range(53)])
+        self.assertEqual(func.call_count, 3)
+        func.assert_called_with(limit=25, page=3, company_id="c1")
+
+    def test_paginate_exact_multiple_requests_empty_page(self):
+        func = make_list_func(50)
+        self.assertEqual(len(list(paginate(func, limit=25))), 50)
+        self.assertEqual(func.call_count, 3)
+
+
+class TestPageSizeTuning(unittest.TestCase):
+
+    def make_timed_func(self, total, clock, overhead=0.05, per_document=0.004):
+        """List method whose pages take `overhead + per_document * limit` seconds."""
+        func = make_list_func(total)
+        calls = []
+
+        def timed(limit=25, page=1, **params):
+            calls.append((limit, page))
+            clock[0] += overhead + per_document * limit
+            return func(limit=limit, page=page, **params)
+
+        timed.__name__ = "get_fiscal_invoices"
+        return timed, calls
+
+    def test_converges_within_latency_bound(self):
+        clock = [0.0]
+        metrics = Metrics()
+        tuner = PageSizeTuner(start=25, max_latency=1.0, metrics=metrics, clock=lambda: clock[0])
+        func, calls = self.make_timed_func(3000, clock)
+
+        ids = [d["id"] for d in paginate(func, limit="auto", tuner=tuner)]
+        self.assertEqual(ids, [str(i) for i in range(3000)])
+        # 400-document pages would take 1.65s.
+        self.assertEqual(tuner.size("get_fiscal_invoices"), 200)
+        self.assertNotIn(400, [limit for limit, _ in calls])
+        # Pages never overlap nor leave gaps when the size changes.
+        self.assertEqual(calls[:4], [(25, 1), (25, 2), (50, 2), (100, 2)])
+
+        gauges = metrics.snapshot()["gauges"]
+        self.assertEqual(gauges["pagination.get_fiscal_invoices.page_size"], 200)
+        self.assertGreater(metrics.snapshot()["counters"]["pagination.get_fiscal_invoices.resized"], 0)
+
+        # The size is remembered for the next scan.
+        calls.clear()
+        list(paginate(func, limit="auto", tuner=tuner))
+        self.assertEqual(calls[0], (200, 1))
+
+    def test_shrinks_slow_pages(self):
+        clock = [0.0]
+        tuner = PageSizeTuner(start=100, max_latency=0.5, metrics=Metrics(), clock=lambda: clock[0])
+        func, calls = self.make_timed_func(500, clock, overhead=0.1, per_document=0.01)
+        self.assertEqual(len(list(paginate(func, limit="auto", tuner=tuner))), 500)
+        self.assertEqual(tuner.size("get_fiscal_invoices"), 25)
+        self.assertEqual(calls[:3], [(100, 1), (50, 3), (25, 7)])
+
+    def test_invalid_sizes(self):
+        with self.assertRaises(ValueError):
+            PageSizeTuner(sizes=(25, 60))
+        with self.assertRaises(ValueError):
+            PageSizeTuner(start=30)
+
+
+class TestExport(unittest.TestCase):
+
+    def test_flatten_document(self):
+        row = flatten_document({"id": "1", "governmentResponse": {"code": 1, "value": [{"valor": "a"}]}})
+        self.assertEqual(row, {"id": "1", "governmentResponse.code": 1, "governmentResponse.value": '[{"valor": "a"}]'})
+
+    def test_document_columns(self):
+        self.assertIn("governmentResponse.code", DOCUMENT_COLUMNS)
+        self.assertNotIn("governmentResponse", DOCUMENT_COLUMNS)
+        self.assertIn("totalAmount", columns_for(ReceivedDocumentsResponse))
+
+    def test_export_csv(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "out.csv")
+            count = export_documents(make_list_func(60), path, chunk_size=7)
+            with open(path, newline="") as f:
+                rows = list(csv.DictReader(f))
+        self.assertEqual(count, 60)
+        self.assertEqual(len(rows), 60)
+        self.assertEqual(rows[0]["governmentResponse.code"], "1")
+
+    def test_export_jsonl(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "out.jsonl")
+            export_documents(make_list_func(3), path, format="jsonl", columns=["id", "status"])
+            with open(path) as f:
+                rows = [json.loads(line) for line in f]
+        self.assertEqual(rows[2], {"id": "2", "status": "FINISHED"})
+
+    def test_export_invalid_format(self):
+        with self.assertRaises(ValueError):
+            export_documents(make_list_func(1), "out.xls", format="xls")
@@ -0,0 +1,175 @@
+import threading
+import unittest
+from unittest.mock import MagicMock, patch
+
+import requests
+
+from alanube.do.api import AlanubeAPI
+from alanube.do.hedging import HedgingPolicy, LatencyWindow, endpoint_key
+from alanube.do.metrics import Metrics
+
+
+KEY = "/dom/v1/invoices/{id}"
+URL = "https://sandbox.alanube.co/dom/v1/invoices/abc123"
+
+
+class TestHedgingPolicy(unittest.TestCase):
+
+    def setUp(self):
+        self.metrics = Metrics()
+        self.policy = HedgingPolicy(min_samples=10, budget=1.0, metrics=self.metrics)
+
+    def tearDown(self):
+        self.policy.close()
+
+    def warm_up(self, seconds=0.01, count=10):
+        for _ in range(count):
+            self.policy.record(KEY, seconds)
+
+    def test_endpoint_key(self):
+        self.assertEqual(endpoint_key(URL + "?companyId=1"), KEY)
+        self.assertEqual(endpoint_key("https://api.alanube.co/dom/v1/fiscal-invoices"), "/dom/v1/fiscal-invoices")
+
+    def test_latency_window(self):
+        window = LatencyWindow(3)
+        for value in (5, 1, 3, 2):
+            window.add(value)
+        self.assertEqual(len(window), 3)
+        self.assertEqual(window.percentile(0), 1)
+        self.assertEqual(window.percentile(0.99), 3)
+
+    def test_timeout(self):
+        self.assertIsNone(self.policy.timeout(KEY))
+        self.assertIsNone(self.policy.hedge_delay(KEY))
+        self.warm_up(0.01)
+        self.assertEqual(self.policy.timeout(KEY), 1.0)
+        self.warm_up(100, count=500)
+        self.assertEqual(self.policy.timeout(KEY), 30.0)
+        self.policy.record(KEY, 2)
+        self.assertEqual(self.policy.hedge_delay(KEY), 100)
+
+    def test_hedge_wins_over_slow_primary(self):
+        self.warm_up()
+        release = threading.Event()
+        calls = []
+
+        def send(timeout):
+            calls.append(timeout)
+            if len(calls) == 1:
+                release.wait(5)
+                return "slow"
+            return "fast"
+
+        try:
+            self.assertEqual(self.policy.call(URL, send), "fast")
+        finally:
+            release.set()
+        self.assertEqual(calls, [1.0, 1.0])
+        counters = self.metrics.snapshot()["counters"]
+        self.assertEqual(counters[f"hedging.{KEY}.hedged"], 1)
+        self.assertEqual(counters[f"hedging.{KEY}.hedge_won"], 1)
+
+    def test_failed_hedge_waits_for_primary(self):
+        self.warm_up()
+        release = threading.Event()
+        calls = []
+
+        def send(timeout):
+            calls.append(timeout)
+            if len(calls) == 1:
+                release.wait(5)
+                return "slow"
+            release.set()
+            raise ConnectionError()
+
+        self.assertEqual(self.policy.call(URL, send), "slow")
+        self.assertNotIn(f"hedging.{KEY}.hedge_won", self.metrics.snapshot()["counters"])
+
+    def test_timeouts_are_recorded_as_censored_samples(self):
+        self.warm_up(0.01)
+        send = MagicMock(side_effect=requests.ReadTimeout())
+        with self.assertRaises(requests.ReadTimeout):
+            self.policy.call(URL, send)
+        send.assert_called_once_with(1.0)
+        # The timed out request took at least its timeout, which raises the next one.
+        self.assertEqual(self.policy.percentile(KEY, 0.99), 1.0)
+        self.assertEqual(self.policy.timeout(KEY), 3.0)
+        self.assertEqual(self.metrics.snapshot()["counters"][f"hedging.{KEY}.timeouts"], 1)
+
+        # Other failures are not latency samples.
+        send.side_effect = ConnectionError()
+        with self.assertRaises(ConnectionError):
+            self.policy.call(URL, send)
+        self.assertEqual(len(self.policy._windows[KEY]), 11)
+
+    def test_unhedged_requests_run_on_the_caller_thread(self):
+        threads = []
+
+        def send(timeout):
+            threads.append(threading.current_thread())
+            return "response"
+
+        # Not warmed up.
+        self.assertEqual(self.policy.call(URL, send), "response")
+        # Budget spent.
+        policy = HedgingPolicy(min_samples=10, budget=0)
+        self.addCleanup(policy.close)
+        for _ in range(10):
+            policy.record(KEY, 0.01)
+        self.assertEqual(policy.call(URL, send), "response")
+        self.assertEqual(threads, [threading.current_thread()] * 2)
+
+    def test_close_waits_for_running_hedges(self):
+        self.warm_up()
+        release = threading.Event()
+        calls = []
+
+        def send(timeout):
+            calls.append(timeout)
+            if len(calls) == 1:
+                release.wait(5)
+                calls.append("primary done")
+                return "slow"
+            return "fast"
+
+        self.assertEqual(self.policy.call(URL, send), "fast")
+        threading.Timer(0.05, release.set).start()
+        self.policy.close()
+        self.assertEqual(calls[-1], "primary done")
+        with self.assertRaises(RuntimeError):
+            self.policy.call(URL, send)
+
+    def test_budget(self):
+        policy = HedgingPolicy(min_samples=10, budget=0.1)
+        self.addCleanup(policy.close)
+        for _ in range(10):
+            policy.record(KEY, 0.001)
+        send = MagicMock(side_effect=lambda timeout: threading.Event().wait(0.02) or "response")
+        self.assertEqual(policy.call(URL, send), "response")
+        self.assertEqual(send.call_count, 1)
+
+
+class TestHedgedGet(unittest.TestCase):
+
+    def tearDown(self):
+        AlanubeAPI.connect("test_token", True)
+
+    @patch('alanube.do.api.requests.request')
+    def test_get_uses_adaptive_timeout(self, mock_request):
+        mock_request.return_value = MagicMock(status_code=200, json=MagicMock(return_value={"id": "abc123"}))
+        AlanubeAPI.connect("test_token", True, hedging=HedgingPolicy(default_timeout=5))
+
+        self.assertEqual(AlanubeAPI.get_invoice("abc123"), {"id": "abc123"})
+        self.assertEqual(mock_request.call_args.kwargs["timeout"], 5)
+        self.assertEqual(len(AlanubeAPI.hedging._windows[KEY]), 1)
+
+    def test_reconnect_closes_previous_policy(self):
+        policy = HedgingPolicy()
+        AlanubeAPI.connect("test_token", True, hedging=policy)
+        AlanubeAPI.connect("test_token", True, hedging=HedgingPolicy())
+        with self.assertRaises(RuntimeError):
+            policy.call(URL, lambda timeout: None)
+
+
+if __name__ == '__main__':
+    unittest.main()
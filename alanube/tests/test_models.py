@@ -0,0 +1,72 @@
+import unittest
+from datetime import datetime
+from unittest.mock import MagicMock, patch
+
+from alanube.do.api import AlanubeAPI
+from alanube.do.models import Document, ReceivedDocument, make_model
+from alanube.do.types import DocumentResponse
+
+
+DOCUMENT = {
+    "id": "123",
+    "stampDate": "2024-05-01",
+    "status": "FINISHED",
+    "legalStatus": "ACCEPTED",
+    "signatureDate": "01-05-2024 10:30:00",
+    "sequenceConsumed": True,
+    "governmentResponse": {"code": 1, "value": [{"valor": "Aceptado", "codigo": 0}]},
+}
+
+
+class TestModels(unittest.TestCase):
+
+    def test_model_is_generated_once_with_slots(self):
+        self.assertIs(make_model(DocumentResponse), Document)
+        document = Document.from_dict(DOCUMENT)
+        self.assertFalse(hasattr(document, "__dict__"))
+
+    def test_lazy_fields(self):
+        document = Document.from_dict(DOCUMENT)
+        self.assertIsInstance(document._governmentResponse, dict)
+        self.assertEqual(document.governmentResponse.value[0].valor, "Aceptado")
+        self.assertEqual(document.signatureDate, datetime(2024, 5, 1, 10, 30))
+        self.assertEqual(document.stampDate, datetime(2024, 5, 1))
+
+    def test_missing_and_extra_fields(self):
+        document = ReceivedDocument.from_dict({"id": "1", "newField": "x"})
+        self.assertIsNone(document.totalAmount)
+        self.assertEqual(document["newField"], "x")
+        self.assertEqual(document.to_dict()["newField"], "x")
+        with self.assertRaises(KeyError):
+            document["unknown"]
+
+    def test_to_dict(self):
+        data = Document.from_dict(DOCUMENT).to_dict()
+        self.assertEqual(data["governmentResponse"], DOCUMENT["governmentResponse"])
+        self.assertEqual(data["signatureDate"], DOCUMENT["signatureDate"])
+
+    def test_reading_fields_keeps_received_values(self):
+        document, other = Document.from_dict(DOCUMENT), Document.from_dict(DOCUMENT)
+        self.assertEqual(document.signatureDate, datetime(2024, 5, 1, 10, 30))
+        self.assertEqual(document.governmentResponse.code, 1)
+        data = document.to_dict()
+        self.assertEqual(data["signatureDate"], "01-05-2024 10:30:00")
+        self.assertEqual(data["governmentResponse"], DOCUMENT["governmentResponse"])
+        self.assertEqual(document, other)
+
+        document.signatureDate = datetime(2024, 6, 1)
+        self.assertEqual(document.signatureDate, datetime(2024, 6, 1))
+        self.assertEqual(document.to_dict()["signatureDate"], "2024-06-01T00:00:00")
+        self.assertNotEqual(document, other)
+
+    @patch('alanube.do.api.requests.request')
+    def test_list_parse(self, mock_request):
+        AlanubeAPI.connect("test_token", True)
+        mock_response = MagicMock()
+        mock_response.json.return_value = {"metadata": {}, "documents": [dict(DOCUMENT)]}
+        mock_response.status_code = 200
+        mock_request.return_value = mock_response
+
+        data = AlanubeAPI.get_fiscal_invoices(parse=True)
+        self.assertIsInstance(data["documents"][0], Document)
+        self.assertEqual(data["documents"][0].status, "FINISHED")
@@ -0,0 +1,89 @@
+import copy
+import unittest
+from unittest.mock import patch
+
+from alanube.do import Alanube
+from alanube.do.exceptions import ValidationError
+from alanube.do.payloads import check_payload, check_payloads, validate_payload
+
+
+PAYLOAD = {
+    "idDoc": {"encf": "E310000000001"},
+    "sender": {"rnc": "101010101"},
+    "buyer": {"rnc": "131313131"},
+    "otherCurrency": {"currencyType": "USD"},
+    "itemDetails": [
+        {"itemName": "A", "quantityItem": 2, "unitMeasure": 43, "unitPriceItem": "50.00", "itemAmount": 100},
+        {"itemName": "B", "quantityItem": 1, "unitMeasure": 6, "unitPriceItem": 20,
+         "discountAmount": 5, "itemAmount": 15},
+    ],
+    "totals": {"totalTaxedAmount": 115, "exemptAmount": 0, "itbisTotal": 20.7, "totalAmount": 135.7},
+}
+
+
+class TestPayloadValidation(unittest.TestCase):
+
+    def test_valid_payload(self):
+        self.assertEqual(check_payload(31, PAYLOAD), {})
+
+    def test_additional_tax_amount(self):
+        payload = copy.deepcopy(PAYLOAD)
+        # The non-billable amount is not part of the total.
+        payload["totals"].update(additionalTaxAmount=10, nonBillableAmount=50, totalAmount=145.7)
+        self.assertEqual(check_payload(31, payload), {})
+        payload["totals"]["totalAmount"] = 135.7
+        self.assertIn("totals.totalAmount", check_payload(31, payload))
+
+    def test_unit_measure_as_string(self):
+        payload = copy.deepcopy(PAYLOAD)
+        payload["itemDetails"][0]["unitMeasure"] = "43"
+        self.assertEqual(check_payload(31, payload), {})
+        payload["itemDetails"][0]["unitMeasure"] = "999"
+        self.assertIn("itemDetails[0].unitMeasure", check_payload(31, payload))
+
+    def test_invalid_payload(self):
+        payload = copy.deepcopy(PAYLOAD)
+        payload["idDoc"]["encf"] = "E320000000001"
+        payload["sender"]["rnc"] = "101-01010-1"
+        payload["otherCurrency"]["currencyType"] = "XXX"
+        payload["itemDetails"][0]["unitMeasure"] = 999
+        payload["itemDetails"][1]["itemAmount"] = 20
+        payload["totals"]["totalAmount"] = 200
+        errors = check_payload(31, payload)
+        self.assertEqual(
+            sorted(errors),
+            [
+                "idDoc.encf",
+                "itemDetails[0].unitMeasure",
+                "itemDetails[1].itemAmount",
+                "otherCurrency.currencyType",
+                "sender.rnc",
+                "totals.totalAmount",
+            ],
+        )
+
+    def test_type_specific_required_fields(self):
+        payload = copy.deepcopy(PAYLOAD)
+        del payload["buyer"]
+        payload["idDoc"]["encf"] = "E340000000001"
+        self.assertIn("buyer.rnc", check_payload(31, payload))
+        self.assertEqual(list(check_payload(34, payload)), ["informationReference.modifiedEncf"])
+
+    def test_validate_payload_raises(self):
+        with self.assertRaises(ValidationError) as cm:
+            validate_payload(32, {})
+        self.assertIn("This field is required.", cm.exception.messages)
+
+    def test_check_payloads_batch(self):
+        results = list(check_payloads([(31, PAYLOAD), (31, {}), (31, PAYLOAD)]))
+        self.assertEqual([bool(r) for r in results], [False, True, False])
+
+    def test_check_payloads_process_pool(self):
+        results = list(check_payloads([(31, PAYLOAD), (31, {})], processes=2, chunksize=1))
+        self.assertEqual([bool(r) for r in results], [False, True])
+
+    def test_send_document_validate(self):
+        with patch("alanube.do.api.requests.request") as mock_request:
+            with self.assertRaises(ValidationError):
+                Alanube.send_document(31, {}, validate=True)
+            mock_request.assert_not_called()
@@ -0,0 +1,97 @@
+import json
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+from unittest.mock import MagicMock, patch
+
+from alanube.do.api import AlanubeAPI
+from alanube.do.pipeline import FAILED, INVALID, SENT, PayloadPipeline, prepare_payload
+
+
+def build_payload(encf_type, number):
+    amount = Decimal("100.00")
+    return {
+        "idDoc": {"encf": f"E{encf_type}{number:010d}"},
+        "sender": {"rnc": "101010101"},
+        "buyer": {"rnc": "131313131"},
+        "itemDetails": [
+            {"itemName": "A", "quantityItem": 1, "unitMeasure": 43, "unitPriceItem": amount, "itemAmount": amount},
+        ],
+        "totals": {"totalTaxedAmount": amount, "itbisTotal": Decimal("18.00"), "totalAmount": Decimal("118.00")},
+    }
+
+
+class TestPayloadPipeline(unittest.TestCase):
+
+    def setUp(self):
+        AlanubeAPI.connect("test_token", True)
+
+    def test_prepare_payload_encodes_json(self):
+        prepared = prepare_payload(0, 31, 7, prepare=build_payload)
+        self.assertTrue(prepared.ok)
+        self.assertEqual(json.loads(prepared.body)["totals"]["totalAmount"], 118.0)
+
+        prepared = prepare_payload(1, 31, {"idDoc": {}})
+        self.assertFalse(prepared.ok)
+        self.assertIn("idDoc.encf", prepared.errors)
+
+    def test_run_reports_every_item(self):
+        lock = threading.Lock()
+        active = []
+        peak = []
+
+        def submit(encf_type, body):
+            with lock:
+                active.append(1)
+                peak.append(len(active))
+            with lock:
+                active.pop()
+            return {"encf": json.loads(body)["idDoc"]["encf"]}
+
+        def items():
+            for number in range(1, 41):
+                yield 31, number
+            yield 31, "bad"
+
+        pipeline = PayloadPipeline(
+            prepare=prepare_or_fail,
+            io_workers=4,
+            max_prepared=8,
+            submit=submit,
+            executor=ThreadPoolExecutor(max_workers=2),
+        )
+        results = sorted(pipeline.run(items()), key=lambda r: r.index)
+
+        self.assertEqual(len(results), 41)
+        self.assertEqual({r.status for r in results[:40]}, {SENT})
+        self.assertEqual(results[0].response, {"encf": "E310000000001"})
+        self.assertEqual(results[40].status, FAILED)
+        self.assertLessEqual(max(peak), 4)
+
+    @patch('alanube.do.api.requests.request')
+    def test_run_posts_encoded_bodies(self, mock_request):
+        mock_request.return_value = MagicMock(status_code=201, json=MagicMock(return_value={"id": "1"}))
+        invalid = build_payload(31, 2)
+        del invalid["sender"]
+
+        pipeline = PayloadPipeline(executor=ThreadPoolExecutor(max_workers=1))
+        results = sorted(pipeline.run([(31, build_payload(31, 1)), (31, invalid)]), key=lambda r: r.index)
+
+        self.assertEqual([r.status for r in results], [SENT, INVALID])
+        self.assertIn("sender.rnc", results[1].errors)
+        mock_request.assert_called_once()
+        args, kwargs = mock_request.call_args
+        self.assertEqual(args, ("POST", AlanubeAPI.config.endpoint_fiscal_invoices))
+        self.assertEqual(json.loads(kwargs["data"])["idDoc"]["encf"], "E310000000001")
+
+    def test_process_pool(self):
+        pipeline = PayloadPipeline(prepare=build_payload, processes=2, submit=lambda encf_type, body: len(body))
+        results = list(pipeline.run((32, number) for number in range(1, 6)))
+        self.assertEqual({r.status for r in results}, {SENT})
+
+
+def prepare_or_fail(encf_type, number):
+    if not isinstance(number, int):
+        raise ValueError(number)
+    return build_payload(encf_type, number)
@@ -0,0 +1,91 @@
+import gzip
+import os
+import tempfile
+import time
+import unittest
+
+import requests
+
+from alanube.do.api import AlanubeAPI
+from alanube.do.exceptions import CassetteMiss
+from alanube.do.pagination import paginate
+from alanube.do.replay import RecordingTransport, ReplayTransport, load_cassette
+from alanube.do.transports import RequestsTransport
+
+
+class FakeTransport:
+    """Serve pages of 2 documents, 5 documents in total."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def request(self, method, url, headers, params=None, json=None, data=None, **kwargs):
+        self.calls += 1
+        time.sleep(0.01)
+        response = requests.Response()
+        response.status_code = 201 if method == "POST" else 200
+        response.headers["Content-Type"] = "application/json"
+        response.headers["Set-Cookie"] = "session=secret"
+        if method == "POST":
+            response._content = b'{"id": "new"}'
+        else:
+            page = int(url.split("page=")[1].split("&")[0])
+            count = max(0, min(2, 5 - (page - 1) * 2))
+            documents = ", ".join(f'{{"id": "{page}-{i}"}}' for i in range(count))
+            response._content = f'{{"documents": [{documents}]}}'.encode()
+        return response
+
+    def close(self):
+        pass
+
+
+class TestReplay(unittest.TestCase):
+
+    def setUp(self):
+        AlanubeAPI.connect("secret_token", True)
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "traffic.jsonl.gz")
+
+    def tearDown(self):
+        AlanubeAPI.connect("test_token", True, transport=RequestsTransport())
+        self.directory.cleanup()
+
+    def record(self):
+        fake = FakeTransport()
+        AlanubeAPI.connect("secret_token", True, transport=RecordingTransport(fake, self.path))
+        documents = list(paginate(AlanubeAPI.get_fiscal_invoices, limit=2))
+        created = AlanubeAPI.send_invoice({"idDoc": {"encf": "E320000000001"}})
+        AlanubeAPI.transport.close()
+        return fake, documents, created
+
+    def test_record_redacts_credentials(self):
+        fake, documents, _ = self.record()
+        self.assertEqual(fake.calls, 4)
+        with gzip.open(self.path, "rt") as file:
+            content = file.read()
+        self.assertNotIn("secret_token", content)
+        self.assertNotIn("session=secret", content)
+        entries = load_cassette(self.path)
+        self.assertEqual(len(entries), 4)
+        self.assertEqual(entries[0]["request"]["headers"]["Authorization"], "<redacted>")
+        self.assertGreaterEqual(entries[0]["elapsed"], 0.01)
+
+    def test_replay(self):
+        _, documents, created = self.record()
+
+        AlanubeAPI.connect("secret_token", True, transport=ReplayTransport(self.path, latency_scale=0))
+        start = time.monotonic()
+        self.assertEqual(list(paginate(AlanubeAPI.get_fiscal_invoices, limit=2)), documents)
+        self.assertEqual(AlanubeAPI.send_invoice({"idDoc": {"encf": "E320000000001"}}), created)
+        self.assertLess(time.monotonic() - start, 0.04)
+        self.assertEqual(AlanubeAPI.transport.replayed, 4)
+
+        with self.assertRaises(CassetteMiss):
+            AlanubeAPI.send_invoice({"idDoc": {"encf": "E320000000002"}})
+
+    def test_replay_latency(self):
+        self.record()
+        AlanubeAPI.connect("secret_token", True, transport=ReplayTransport(self.path, latency_scale=2))
+        start = time.monotonic()
+        AlanubeAPI.get_fiscal_invoices(limit=2)
+        self.assertGreaterEqual(time.monotonic() - start, 0.02)
@@ -0,0 +1,91 @@
+import unittest
+from datetime import datetime
+from decimal import Decimal
+from unittest.mock import MagicMock, patch
+
+from alanube.do.api import AlanubeAPI
+from alanube.do.exceptions import InvalidResponseError
+from alanube.do.responses import check_response, compile_validator, validate_response
+from alanube.do.types import ListDocumentResponse, ListReceivedDocumentsResponse
+
+
+DOCUMENT = {
+    "id": "doc-1",
+    "stampDate": "15-01-2024",
+    "status": "FINISHED",
+    "legalStatus": "ACCEPTED",
+    "companyIdentification": "101010101",
+    "documentNumber": "E310000000001",
+    "sequenceConsumed": True,
+    "signatureDate": "15-01-2024 10:30:00",
+    "governmentResponse": {"value": [{"valor": "ok", "codigo": 1}], "code": 1},
+}
+
+RECEIVED = {
+    "id": "rec-1",
+    "issuerIdentification": "101010101",
+    "documentStampDate": "2024-01-15",
+    "totalAmount": "1180.50",
+    "errorMsg": None,
+}
+
+
+class TestResponseValidation(unittest.TestCase):
+
+    def setUp(self):
+        AlanubeAPI.connect("test_token", True)
+
+    def tearDown(self):
+        AlanubeAPI.connect("test_token", True)
+
+    def test_coerces_dates_and_amounts(self):
+        data = {"metadata": {"current_page": 1, "from": 1}, "documents": [RECEIVED]}
+        result = validate_response(data, ListReceivedDocumentsResponse)
+        document = result["documents"][0]
+        self.assertEqual(document["totalAmount"], Decimal("1180.50"))
+        self.assertEqual(document["documentStampDate"], datetime(2024, 1, 15))
+        # The response data is left untouched.
+        self.assertEqual(RECEIVED["totalAmount"], "1180.50")
+
+        result = validate_response({"documents": [DOCUMENT]}, ListDocumentResponse)
+        self.assertEqual(result["documents"][0]["signatureDate"], datetime(2024, 1, 15, 10, 30))
+
+    def test_reports_invalid_fields(self):
+        document = {**DOCUMENT, "status": "UNKNOWN", "sequenceConsumed": "yes", "stampDate": "yesterday"}
+        document["governmentResponse"] = {"value": [{"valor": "ok", "codigo": "1"}], "code": 1}
+        _, errors = check_response({"documents": [DOCUMENT, document], "metadata": []}, ListDocumentResponse)
+        self.assertEqual(
+            sorted(errors),
+            [
+                "documents[1].governmentResponse.value[0].codigo",
+                "documents[1].sequenceConsumed",
+                "documents[1].stampDate",
+                "documents[1].status",
+                "metadata",
+            ],
+        )
+
+    def test_strict_mode_reports_missing_fields(self):
+        _, errors = check_response({"documents": [{"id": "1"}]}, ListDocumentResponse, strict=True)
+        self.assertIn("metadata", errors)
+        self.assertIn("documents[0].status", errors)
+        _, errors = check_response({"documents": [{"id": "1"}]}, ListDocumentResponse)
+        self.assertEqual(errors, {})
+
+    def test_validators_are_compiled_once(self):
+        self.assertIs(compile_validator(ListDocumentResponse), compile_validator(ListDocumentResponse))
+
+    @patch('alanube.do.api.requests.request')
+    def test_api_validation_mode(self, mock_request):
+        page = {"documents": [RECEIVED]}
+        mock_request.return_value = MagicMock(status_code=200, json=MagicMock(return_value=page))
+
+        self.assertEqual(AlanubeAPI.get_received_documents()["documents"][0]["totalAmount"], "1180.50")
+
+        AlanubeAPI.connect("test_token", True, validate_responses=True)
+        self.assertEqual(AlanubeAPI.get_received_documents()["documents"][0]["totalAmount"], Decimal("1180.50"))
+
+        page["documents"] = [{**RECEIVED, "totalAmount": "n/a"}]
+        with self.assertRaises(InvalidResponseError) as cm:
+            AlanubeAPI.get_received_documents()
+        self.assertEqual(list(cm.exception.errors), ["documents[0].totalAmount"])
@@ -0,0 +1,124 @@
+import threading
+import unittest
+from datetime import date, datetime, timedelta, timezone
+from typing import Optional
+
+from alanube.do.scans import DATE, TIMESTAMP, DateRangeScan, bound_format, plan_windows
+
+
+def make_documents(days, per_day, dense_day=None, dense_count=0):
+    """One document per `per_day` slot of each day, plus `dense_count` on `dense_day`."""
+    documents = []
+    for day in range(days):
+        count = dense_count if day == dense_day else per_day
+        for i in range(count):
+            moment = datetime(2024, 1, 1, tzinfo=timezone.utc) + timedelta(days=day, seconds=i * 86400 // max(count, 1))
+            documents.append({"id": f"{day}-{i}", "moment": moment})
+    return documents
+
+
+class FakeList:
+    """List method filtering `documents` by dates or timestamps."""
+
+    def __init__(self, documents):
+        self.documents = documents
+        self.lock = threading.Lock()
+        self.calls = []
+
+    def matches(self, document, start, end):
+        raise NotImplementedError
+
+    def __call__(self, limit=25, page=1, start=None, end=None, **params):
+        with self.lock:
+            self.calls.append((start, end, page))
+        selected = [d for d in self.documents if self.matches(d, start, end)]
+        return {"documents": selected[(page - 1) * limit:page * limit]}
+
+
+class DateList(FakeList):
+
+    def matches(self, document, start, end):
+        return start <= document["moment"].date().isoformat() <= end
+
+
+class TimestampList(FakeList):
+
+    def matches(self, document, start, end):
+        return start <= document["moment"].timestamp() <= end
+
+
+def received_documents(limit: int = 25, page: int = 1, start: Optional[str] = None, end: Optional[str] = None):
+    pass
+
+
+def fiscal_invoices(limit: int = 25, page: int = 1, start: Optional[int] = None, end: Optional[int] = None):
+    pass
+
+
+class Printable(str):
+    pass
+
+
+def printable_documents(limit: int = 25, page: int = 1, start: Optional[Printable] = None):
+    pass
+
+
+class TestDateRangeScan(unittest.TestCase):
+
+    def test_plan_windows(self):
+        start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        windows = plan_windows(start, start + timedelta(days=10), timedelta(weeks=1))
+        self.assertEqual(windows, [(start, start + timedelta(days=7)), (start + timedelta(days=7), start + timedelta(days=10))])
+
+    def test_bound_format(self):
+        self.assertEqual(bound_format(received_documents), DATE)
+        self.assertEqual(bound_format(fiscal_invoices), TIMESTAMP)
+        self.assertEqual(bound_format(printable_documents), DATE)
+
+    def test_date_scan_splits_dense_windows(self):
+        documents = make_documents(28, per_day=2, dense_day=9, dense_count=30)
+        func = DateList(documents)
+        scan = DateRangeScan(func, date(2024, 1, 1), date(2024, 1, 28), window="week", limit=10, format=DATE, max_workers=4)
+        ids = sorted(d["id"] for d in scan)
+        self.assertEqual(ids, sorted(d["id"] for d in documents))
+        self.assertGreater(scan.splits, 0)
+        self.assertIn(("2024-01-01", "2024-01-07", 1), func.calls)
+        # The dense day ends up in its own window, paged through.
+        self.assertIn(("2024-01-10", "2024-01-10", 3), func.calls)
+        self.assertEqual(scan.pages, len(func.calls))
+
+    def test_timestamp_scan_deduplicates_edges(self):
+        documents = make_documents(4, per_day=3)
+        for max_workers in (8, 1):
+            func = TimestampList(documents)
+            scan = DateRangeScan(
+                func, date(2024, 1, 1), date(2024, 1, 4), window="day", limit=10, format=TIMESTAMP,
+                max_workers=max_workers,
+            )
+            self.assertEqual(sorted(d["id"] for d in scan), sorted(d["id"] for d in documents))
+            # Documents at midnight are in two windows.
+            self.assertEqual(scan.duplicates, 3)
+            self.assertEqual(sorted(func.calls)[0][:2], (1704067200, 1704153600))
+
+    def test_seen_ids_are_forgotten_behind_pending_windows(self):
+        documents = make_documents(60, per_day=5)
+        scan = DateRangeScan(
+            TimestampList(documents), date(2024, 1, 1), date(2024, 2, 29), window="day", limit=10,
+            format=TIMESTAMP, max_workers=1,
+        )
+        iterator = iter(scan)
+        ids = [next(iterator)["id"] for _ in range(len(documents) - 10)]
+        # Only the ids of the previous (adjacent) and current windows are remembered.
+        self.assertLessEqual(len(iterator.gi_frame.f_locals["seen"]), 10)
+        ids.extend(d["id"] for d in iterator)
+        self.assertEqual(sorted(ids), sorted(d["id"] for d in documents))
+
+    def test_timestamp_windows_split_down_to_min_window(self):
+        documents = make_documents(1, per_day=0, dense_day=0, dense_count=40)
+        func = TimestampList(documents)
+        scan = DateRangeScan(
+            func, date(2024, 1, 1), date(2024, 1, 1), window="day", limit=10, min_window=timedelta(hours=6),
+            format=TIMESTAMP,
+        )
+        self.assertEqual(len(list(scan)), 40)
+        self.assertEqual(scan.splits, 3)
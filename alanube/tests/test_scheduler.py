@@ -0,0 +1,121 @@
+import threading
+import unittest
+from unittest.mock import patch
+
+from alanube.do.metrics import Metrics
+from alanube.do.scheduler import FairShareScheduler, PriorityScheduler, payload_tenant
+
+
+class Gate:
+    """Callable blocking until released, tracking the calls running at once."""
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.lock = threading.Lock()
+        self.running = 0
+        self.max_running = 0
+        self.started = threading.Semaphore(0)
+
+    def __call__(self, value=None):
+        with self.lock:
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+        self.started.release()
+        self.release.wait(5)
+        with self.lock:
+            self.running -= 1
+        return value
+
+
+class TestPriorityScheduler(unittest.TestCase):
+
+    def test_reserved_workers_are_kept_for_their_lane(self):
+        bulk = Gate()
+        metrics = Metrics()
+        with PriorityScheduler(max_concurrency=3, lanes={"interactive": 1, "bulk": 0}, metrics=metrics) as scheduler:
+            futures = [scheduler.submit("bulk", bulk, i) for i in range(6)]
+            for _ in range(2):
+                self.assertTrue(bulk.started.acquire(timeout=5))
+            self.assertEqual(scheduler.queued(), {"interactive": 0, "bulk": 4})
+
+            # The interactive lane runs right away despite the bulk backlog.
+            self.assertEqual(scheduler.submit("interactive", lambda: "sale").result(timeout=5), "sale")
+
+            bulk.release.set()
+            self.assertEqual([f.result(timeout=5) for f in futures], list(range(6)))
+        self.assertEqual(bulk.max_running, 2)
+        self.assertEqual(metrics.snapshot()["summaries"]["scheduler.interactive.wait_seconds"]["count"], 1)
+
+    def test_higher_priority_lanes_take_shared_workers_first(self):
+        gate = Gate()
+        order = []
+        scheduler = PriorityScheduler(max_concurrency=1, lanes={"interactive": 0, "bulk": 0})
+        scheduler.submit("bulk", gate)
+        self.assertTrue(gate.started.acquire(timeout=5))
+        scheduler.submit("bulk", order.append, "bulk")
+        scheduler.submit("interactive", order.append, "interactive")
+        gate.release.set()
+        scheduler.shutdown()
+        self.assertEqual(order, ["interactive", "bulk"])
+
+    @patch("alanube.do.client.Alanube.send_document_func_map", {32: lambda p: ("sent", p)})
+    def test_document_lanes(self):
+        with PriorityScheduler() as scheduler:
+            self.assertEqual(scheduler.lane_for(32), "interactive")
+            self.assertEqual(scheduler.lane_for(41), "bulk")
+            self.assertEqual(scheduler.send_document(32, {"a": 1}).result(timeout=5), ("sent", {"a": 1}))
+            with self.assertRaises(NotImplementedError):
+                scheduler.send_document(99, {}).result(timeout=5)
+
+    def test_invalid_lanes(self):
+        with self.assertRaises(ValueError):
+            PriorityScheduler(max_concurrency=2, lanes={"interactive": 2, "bulk": 1})
+        with PriorityScheduler() as scheduler:
+            with self.assertRaises(ValueError):
+                scheduler.submit("unknown", print)
+        with self.assertRaises(RuntimeError):
+            scheduler.submit("bulk", print)
+
+
+class TestFairShareScheduler(unittest.TestCase):
+
+    def test_weighted_round_robin(self):
+        gate = Gate()
+        order = []
+        scheduler = FairShareScheduler(max_concurrency=1, weights={"big": 2})
+        scheduler.submit("warmup", gate)
+        self.assertTrue(gate.started.acquire(timeout=5))
+        for i in range(6):
+            scheduler.submit("big", order.append, f"big{i}")
+        for i in range(2):
+            scheduler.submit("small", order.append, f"small{i}")
+        self.assertEqual(scheduler.queued(), {"big": 6, "small": 2})
+        gate.release.set()
+        scheduler.shutdown()
+        self.assertEqual(order, ["big0", "big1", "small0", "big2", "big3", "small1", "big4", "big5"])
+
+    def test_per_tenant_cap(self):
+        big = Gate()
+        with FairShareScheduler(max_concurrency=4, max_per_tenant=2) as scheduler:
+            futures = [scheduler.submit("big", big, i) for i in range(5)]
+            for _ in range(2):
+                self.assertTrue(big.started.acquire(timeout=5))
+            # Free workers go to other tenants even with the big backlog.
+            self.assertEqual(scheduler.submit("small", lambda: "ok").result(timeout=5), "ok")
+            self.assertEqual(scheduler.queued(), {"big": 3})
+            big.release.set()
+            self.assertEqual([f.result(timeout=5) for f in futures], list(range(5)))
+        self.assertEqual(big.max_running, 2)
+
+    @patch("alanube.do.client.Alanube.send_document_func_map", {31: lambda p: p["company"]["id"]})
+    @patch("alanube.do.client.Alanube.get_document_func_map", {31: lambda document_id, company_id: document_id})
+    def test_tenant_from_payload(self):
+        payload = {"company": {"id": "company-1"}, "sender": {"rnc": "101010101"}}
+        self.assertEqual(payload_tenant(payload), "company-1")
+        self.assertIsNone(payload_tenant({}))
+        metrics = Metrics()
+        with FairShareScheduler(metrics=metrics) as scheduler:
+            self.assertEqual(scheduler.send_document(31, payload).result(timeout=5), "company-1")
+            self.assertEqual(scheduler.get_document(31, "document-1", company_id="company-1").result(timeout=5), "document-1")
+        # Sends and reads of a company share its queue.
+        self.assertEqual(metrics.snapshot()["summaries"]["fair_share.company-1.wait_seconds"]["count"], 2)
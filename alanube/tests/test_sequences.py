@@ -0,0 +1,101 @@
+import os
+import tempfile
+import threading
+import unittest
+
+from alanube.do.exceptions import SequenceExhausted, SequenceNotConfigured
+from alanube.do.sequences import SequenceAllocator, SequenceStore
+
+
+class TestSequences(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "sequences.db")
+        self.store = SequenceStore(self.path)
+        self.store.configure("101", 31)
+
+    def tearDown(self):
+        self.store.close()
+        self.directory.cleanup()
+
+    def test_reserve_blocks(self):
+        self.store.configure("101", 31, start=10, end=24)
+        self.assertEqual(self.store.reserve("101", 31, 10), (10, 19))
+        self.assertEqual(SequenceStore(self.path).reserve("101", 31, 10), (20, 24))
+        with self.assertRaises(SequenceExhausted):
+            self.store.reserve("101", 31, 10)
+        self.store.configure("101", 32)
+        self.assertEqual(self.store.reserve("101", 32, 5), (1, 5))
+
+    def test_reserve_requires_configured_range(self):
+        with self.assertRaises(SequenceNotConfigured):
+            self.store.reserve("101", 33, 5)
+        with self.assertRaises(SequenceNotConfigured):
+            SequenceAllocator(self.store, "102", 31).next()
+        self.assertEqual(self.store.free_ranges("101", 33), [])
+
+    def test_allocator_hands_out_unique_numbers(self):
+        allocator = SequenceAllocator(self.store, "101", 31, block_size=7)
+        numbers = []
+        lock = threading.Lock()
+
+        def work():
+            local = [allocator.next() for _ in range(50)]
+            with lock:
+                numbers.extend(local)
+
+        threads = [threading.Thread(target=work) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(set(numbers)), 200)
+        self.assertTrue(all(len(number) == 13 and number.startswith("E31") for number in numbers))
+
+    def test_close_returns_unused_numbers(self):
+        with SequenceAllocator(self.store, "101", 31, block_size=10) as allocator:
+            self.assertEqual(allocator.next(), "E310000000001")
+        self.assertEqual(self.store.free_ranges("101", 31), [(2, 10)])
+        allocator = SequenceAllocator(self.store, "101", 31, block_size=4)
+        self.assertEqual([allocator.next() for _ in range(5)][-2:], ["E310000000005", "E310000000006"])
+
+    def test_reconcile(self):
+        allocator = SequenceAllocator(self.store, "101", 31, block_size=10)
+        first, second, third = allocator.next(), allocator.next(), allocator.next()
+        allocator.reconcile({"documentNumber": first, "sequenceConsumed": True})
+        allocator.reconcile({"documentNumber": second, "sequenceConsumed": False, "status": "FAILED"})
+        # Documents still in process keep their number.
+        allocator.reconcile({"documentNumber": third, "sequenceConsumed": False, "status": "TO_SEND"})
+        # Consumed numbers are never released again.
+        self.store.release("101", 31, [1])
+        self.assertEqual(self.store.free_ranges("101", 31), [(2, 2)])
+
+    def test_released_number_is_not_freed_again_once_leased(self):
+        first = SequenceAllocator(self.store, "101", 31, block_size=2)
+        number = first.next()
+        rejected = {"documentNumber": number, "sequenceConsumed": False, "legalStatus": "REJECTED"}
+        first.reconcile(rejected)
+        second = SequenceAllocator(self.store, "101", 31, block_size=1)
+        self.assertEqual(second.next(), number)
+        first.reconcile(rejected)
+        first.reconcile(rejected)
+        self.assertEqual(self.store.free_ranges("101", 31), [])
+        third = SequenceAllocator(self.store, "101", 31, block_size=1)
+        self.assertNotEqual(third.next(), number)
+
+    def test_free_ranges_are_merged(self):
+        allocator = SequenceAllocator(self.store, "101", 31, block_size=10)
+        for _ in range(6):
+            allocator.next()
+        failed = [{"documentNumber": f"E3100000000{n:02d}", "status": "FAILED"} for n in (2, 3, 5)]
+        allocator.reconcile_documents(failed)
+        allocator.reconcile_documents(failed)
+        allocator.reconcile({"documentNumber": "E310000000004", "status": "FAILED"})
+        allocator.close()
+        self.assertEqual(self.store.free_ranges("101", 31), [(2, 5), (7, 10)])
+        self.store.release_ranges("101", 31, [(6, 6)], owner="other")
+        self.assertEqual(self.store.free_ranges("101", 31), [(2, 5), (7, 10)])
+        self.store.release_ranges("101", 31, [(6, 6)])
+        self.assertEqual(self.store.free_ranges("101", 31), [(2, 10)])
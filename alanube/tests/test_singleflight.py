@@ -0,0 +1,107 @@
+import asyncio
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import MagicMock, patch
+
+from alanube.do.api import AlanubeAPI
+from alanube.do.singleflight import AsyncSingleFlight, SingleFlight
+
+
+class TestSingleFlight(unittest.TestCase):
+
+    def test_concurrent_calls_are_coalesced(self):
+        flight = SingleFlight()
+        release = threading.Event()
+        calls = []
+
+        def func():
+            calls.append(1)
+            release.wait(5)
+            return {"id": "1"}
+
+        with ThreadPoolExecutor(max_workers=5) as executor:
+            futures = [executor.submit(flight.do, "key", func) for _ in range(5)]
+            time.sleep(0.05)
+            release.set()
+            results = [f.result() for f in futures]
+        self.assertEqual(len(calls), 1)
+        self.assertTrue(all(r is results[0] for r in results))
+        self.assertEqual(flight.in_flight(), 0)
+
+    def test_shared_results_are_copied(self):
+        flight = SingleFlight()
+        release = threading.Event()
+
+        def func():
+            release.wait(5)
+            return {"id": "1"}
+
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            futures = [executor.submit(flight.do, "key", func, dict) for _ in range(3)]
+            time.sleep(0.05)
+            release.set()
+            results = [f.result() for f in futures]
+        self.assertEqual(results, [{"id": "1"}] * 3)
+        self.assertEqual(len({id(r) for r in results}), 3)
+        # A call nobody joined is returned as is.
+        result = {"id": "2"}
+        self.assertIs(flight.do("key", lambda: result, dict), result)
+
+    def test_errors_are_shared_and_key_released(self):
+        flight = SingleFlight()
+        with self.assertRaises(ValueError):
+            flight.do("key", MagicMock(side_effect=ValueError))
+        self.assertEqual(flight.do("key", lambda: 1), 1)
+
+    def test_async_single_flight(self):
+        flight = AsyncSingleFlight()
+        calls = []
+
+        async def func():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return "result"
+
+        async def main():
+            return await asyncio.gather(*[flight.do("key", func) for _ in range(5)])
+
+        self.assertEqual(asyncio.run(main()), ["result"] * 5)
+        self.assertEqual(len(calls), 1)
+
+
+class TestAlanubeAPICoalescing(unittest.TestCase):
+
+    @patch('alanube.do.api.requests.request')
+    def test_identical_gets_share_one_request(self, mock_request):
+        AlanubeAPI.connect("test_token", True)
+        release = threading.Event()
+        mock_response = MagicMock()
+        mock_json = mock_response.json
+        mock_json.return_value = {"id": "123"}
+        mock_response.status_code = 200
+
+        def request(*args, **kwargs):
+            release.wait(5)
+            return mock_response
+
+        mock_request.side_effect = request
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            futures = [executor.submit(AlanubeAPI.get_fiscal_invoice, "123") for _ in range(4)]
+            time.sleep(0.05)
+            release.set()
+            results = [f.result() for f in futures]
+        self.assertEqual(results, [{"id": "123"}] * 4)
+        mock_request.assert_called_once()
+        mock_json.assert_called_once_with()
+        # Each caller owns its data.
+        results[0]["id"] = "changed"
+        self.assertEqual(results[1:], [{"id": "123"}] * 3)
+
+    def test_get_requires_connect(self):
+        credentials = AlanubeAPI.credentials
+        self.addCleanup(setattr, AlanubeAPI, "credentials", credentials)
+        AlanubeAPI.credentials = None
+        with self.assertRaisesRegex(RuntimeError, "API not connected"):
+            AlanubeAPI.get("https://x/documents")
@@ -0,0 +1,114 @@
+import io
+import json
+import unittest
+from decimal import Decimal
+from unittest.mock import patch
+
+import requests
+
+from alanube.do.api import AlanubeAPI
+from alanube.do.client import Alanube
+from alanube.do.exceptions import APIError, NotFound
+from alanube.do.models import Document
+from alanube.do.streaming import DocumentStream, iter_documents
+
+
+PAGE = {
+    "metadata": {"current_page": 1, "limit": 3},
+    "documents": [
+        {"id": f"doc-{i}", "status": "FINISHED", "xml": "x" * 100, "amount": 10 ** i, "nested": {"a": [1, {"b": None}]}}
+        for i in range(3)
+    ],
+    "total": 12345,
+}
+
+
+def chunked(text, size):
+    return (text[i:i + size] for i in range(0, len(text), size))
+
+
+def make_response(data, status_code=200):
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = json.dumps(data).encode()
+    response.encoding = "utf-8"
+    return response
+
+
+class TestIterDocuments(unittest.TestCase):
+
+    def test_decodes_across_chunk_boundaries(self):
+        text = json.dumps(PAGE, indent=1)
+        for size in (1, 7, 64, len(text)):
+            members = {}
+            documents = list(iter_documents(chunked(text, size), members=members))
+            self.assertEqual(documents, PAGE["documents"])
+            self.assertEqual(members, {"metadata": PAGE["metadata"], "total": 12345})
+
+    def test_projection(self):
+        documents = iter_documents(chunked(json.dumps(PAGE), 16), fields=("id", "amount", "missing"))
+        self.assertEqual(list(documents), [{"id": f"doc-{i}", "amount": 10 ** i} for i in range(3)])
+
+    def test_empty_and_invalid(self):
+        self.assertEqual(list(iter_documents(["{}"])), [])
+        self.assertEqual(list(iter_documents(['{"documents": []}'])), [])
+        with self.assertRaises(ValueError):
+            list(iter_documents(['{"documents": [{"id": 1}']))
+        with self.assertRaises(ValueError):
+            list(iter_documents(["[]"]))
+
+    def test_streamed_response(self):
+        response = requests.Response()
+        response.status_code = 200
+        response.raw = io.BytesIO(json.dumps(PAGE).encode())
+        documents = DocumentStream(response, fields=("id",))
+        self.assertEqual(len(list(documents)), 3)
+        self.assertEqual(documents.members["total"], 12345)
+        self.assertTrue(response.raw.closed)
+
+
+class TestStreamingAPI(unittest.TestCase):
+
+    def setUp(self):
+        AlanubeAPI.connect("test_token", True)
+
+    def tearDown(self):
+        AlanubeAPI.connect("test_token", True)
+
+    @patch('alanube.do.api.requests.request')
+    def test_stream_list(self, mock_request):
+        mock_request.return_value = make_response(PAGE)
+        with AlanubeAPI.get_fiscal_invoices(limit=3, stream=True, fields=("id",)) as documents:
+            self.assertIsInstance(documents, DocumentStream)
+            self.assertEqual([d["id"] for d in documents], ["doc-0", "doc-1", "doc-2"])
+            self.assertEqual(documents.metadata, PAGE["metadata"])
+        self.assertTrue(mock_request.call_args.kwargs["stream"])
+
+    @patch('alanube.do.api.requests.request')
+    def test_fields_projection_returns_page(self, mock_request):
+        mock_request.return_value = make_response(PAGE)
+        data = Alanube.get_documents(31, fields=("id", "status"))
+        self.assertEqual(data["metadata"], PAGE["metadata"])
+        self.assertEqual(data["documents"][0], {"id": "doc-0", "status": "FINISHED"})
+
+        mock_request.return_value = make_response(PAGE)
+        data = AlanubeAPI.get_invoices(fields=("id", "status"), parse=True)
+        self.assertIsInstance(data["documents"][0], Document)
+
+    @patch('alanube.do.api.requests.request')
+    def test_validation(self, mock_request):
+        AlanubeAPI.connect("test_token", True, validate_responses=True)
+        page = {"documents": [{"id": "rec-1", "totalAmount": "10.50", "issuerIdentification": "1"}]}
+        mock_request.return_value = make_response(page)
+        data = AlanubeAPI.get_received_documents(fields=("id", "totalAmount"))
+        self.assertEqual(data["documents"], [{"id": "rec-1", "totalAmount": Decimal("10.50")}])
+
+    @patch('alanube.do.api.requests.request')
+    def test_errors(self, mock_request):
+        mock_request.return_value = make_response({"message": "Not found"}, status_code=404)
+        with self.assertRaises(NotFound):
+            AlanubeAPI.get_fiscal_invoices(stream=True)
+
+        mock_request.return_value = make_response({"httpStatusCode": 500, "message": "Error"})
+        with self.assertRaises(APIError):
+            AlanubeAPI.get_fiscal_invoices(fields=("id",))
@@ -0,0 +1,117 @@
+import unittest
+from unittest.mock import MagicMock, patch
+
+from alanube.do.api import AlanubeAPI
+from alanube.do.exceptions import NotFound
+from alanube.do.transports import HTTP2Transport, RequestsTransport, http2_available, make_transport
+
+
+class TestTransports(unittest.TestCase):
+
+    def tearDown(self):
+        AlanubeAPI.connect("test_token", True, transport=RequestsTransport())
+
+    @patch('alanube.do.transports.http2_available', return_value=False)
+    def test_http2_falls_back_to_http1(self, _):
+        with self.assertLogs("alanube.do", level="WARNING"):
+            transport = make_transport(http2=True)
+        self.assertIsInstance(transport, RequestsTransport)
+
+    def test_connect_keeps_installed_transport(self):
+        transport = MagicMock()
+        AlanubeAPI.connect("test_token", True, transport=transport)
+        AlanubeAPI.connect("other_token", True)
+        self.assertIs(AlanubeAPI.transport, transport)
+        transport.close.assert_not_called()
+
+        AlanubeAPI.connect("test_token", True, http2=True)
+        transport.close.assert_called_once_with()
+        self.assertIsNot(AlanubeAPI.transport, transport)
+
+    @patch('alanube.do.api.requests.request')
+    def test_requests_transport_forwards_only_set_options(self, mock_request):
+        RequestsTransport().request("GET", "https://x", headers={}, timeout=None)
+        mock_request.assert_called_once_with("GET", "https://x", headers={}, params=None, json=None)
+
+
+@unittest.skipUnless(http2_available(), "httpx[http2] is not installed")
+class TestHTTP2Transport(unittest.TestCase):
+
+    def setUp(self):
+        import httpx
+
+        self.requests = []
+
+        def handler(request):
+            self.requests.append(request)
+            if request.url.path.endswith("/missing"):
+                return httpx.Response(404, json={"message": "Not found"})
+            if request.url.path.endswith("/fiscal-invoices"):
+                body = b'{"metadata": {"total": 2}, "documents": [{"id": "1", "xml": "..."}, {"id": "2"}]}'
+                # Sent in small pieces, like a body read from the network.
+                return httpx.Response(200, stream=httpx.ByteStream(body), headers={"Content-Type": "application/json"})
+            return httpx.Response(200, json={"id": "123"}, headers={"ETag": '"v1"'})
+
+        client = httpx.Client(transport=httpx.MockTransport(handler))
+        AlanubeAPI.connect("test_token", True, transport=HTTP2Transport(client=client))
+
+    def tearDown(self):
+        AlanubeAPI.connect("test_token", True, transport=RequestsTransport())
+
+    def test_request_through_http2_transport(self):
+        self.assertEqual(AlanubeAPI.get_fiscal_invoice("123"), {"id": "123"})
+        self.assertEqual(self.requests[0].headers["Authorization"], "Bearer test_token")
+        self.assertEqual(str(self.requests[0].url), "https://sandbox.alanube.co/dom/v1/fiscal-invoices/123")
+
+    def test_errors_are_mapped(self):
+        with self.assertRaises(NotFound):
+            AlanubeAPI.get_fiscal_invoice("missing")
+
+    def test_streamed_list(self):
+        with AlanubeAPI.get_fiscal_invoices(stream=True, fields=("id",)) as documents:
+            self.assertFalse(documents.response._content)
+            self.assertEqual(list(documents), [{"id": "1"}, {"id": "2"}])
+            self.assertEqual(documents.metadata, {"total": 2})
+
+    def test_connect_selects_http2(self):
+        AlanubeAPI.connect("test_token", True, http2=True)
+        self.assertIsInstance(AlanubeAPI.transport, HTTP2Transport)
+
+
+class TestRequestCompression(unittest.TestCase):
+
+    def setUp(self):
+        AlanubeAPI.connect("test_token", True, compress_requests=True)
+        AlanubeAPI.metrics.reset()
+
+    def tearDown(self):
+        AlanubeAPI.connect("test_token", True, transport=RequestsTransport())
+
+    @patch('alanube.do.api.requests.request')
+    def test_large_body_is_gzipped(self, mock_request):
+        import gzip
+        import json
+
+        mock_request.return_value = MagicMock(status_code=200)
+        payload = {"items": [{"description": "Item %d" % i, "amount": i} for i in range(2000)]}
+
+        AlanubeAPI.post("https://x/documents", data=payload, expected_response_code=200)
+
+        kwargs = mock_request.call_args.kwargs
+        self.assertIsNone(kwargs["json"])
+        self.assertEqual(kwargs["headers"]["Content-Encoding"], "gzip")
+        self.assertEqual(json.loads(gzip.decompress(kwargs["data"])), payload)
+        snapshot = AlanubeAPI.metrics.snapshot()
+        self.assertEqual(snapshot["counters"]["request.compression.count"], 1)
+        self.assertLess(snapshot["summaries"]["request.compression.ratio"]["avg"], 1)
+
+    @patch('alanube.do.api.requests.request')
+    def test_small_body_is_sent_as_json(self, mock_request):
+        mock_request.return_value = MagicMock(status_code=200)
+
+        AlanubeAPI.post("https://x/documents", data={"id": "1"}, expected_response_code=200)
+
+        mock_request.assert_called_once_with(
+            "POST", "https://x/documents", headers=AlanubeAPI.get_headers(), params=None, json={"id": "1"}
+        )
+        self.assertNotIn("request.compression.count", AlanubeAPI.metrics.snapshot()["counters"])
@@ -1,10 +1,71 @@
 
 
 import functools
-from typing import Optional
+import importlib.util
+import re
+import sys
+import threading
+from types import ModuleType
+from typing import Dict, Optional
+from urllib.parse import quote
 import warnings
 
 
+# Characters left unescaped in query values: commas separate the values of
+# multi-valued filters (e.g. `legalStatus=ACCEPTED,REJECTED`).
+QUERY_SAFE_CHARS = ",:"
+
+_is_safe_query_value = re.compile(r"[A-Za-z0-9_.~,:-]*").fullmatch
+
+
+class _LazyModule(ModuleType):
+    """Stand-in for a module that imports it on first attribute access."""
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.__dict__["_lazy_lock"] = threading.Lock()
+        self.__dict__["_lazy_module"] = None
+
+    def _load(self) -> ModuleType:
+        module = self.__dict__["_lazy_module"]
+        if module is None:
+            with self.__dict__["_lazy_lock"]:
+                module = self.__dict__["_lazy_module"]
+                if module is None:
+                    module = importlib.import_module(self.__name__)
+                    self.__dict__["_lazy_module"] = module
+        return module
+
+    def __getattr__(self, attr: str):
+        return getattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+
+_lazy_modules: Dict[str, ModuleType] = {}
+_lazy_modules_lock = threading.Lock()
+
+
+def lazy_import(name: str) -> ModuleType:
+    """
+    Return module `name`, deferring its import until one of its attributes
+    is first accessed.
+
+    Used for heavy dependencies (e.g. `requests`) that are not needed until
+    the first request, to keep import time low. The returned stand-in is
+    shared by every caller and safe to use from several threads; attributes
+    are always read from the real module, so patching either one works.
+    """
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    if importlib.util.find_spec(name) is None:
+        raise ModuleNotFoundError(f"No module named {name!r}", name=name)
+    with _lazy_modules_lock:
+        return _lazy_modules.setdefault(name, _LazyModule(name))
+
+
 def build_url(
     url: str,
     company_id: Optional[str] = None,
@@ -14,29 +75,61 @@ def build_url(
     """
     Build a URL from the given parameters.
     """
+    parts = [url]
     if id_:
-        url += f'/{id_}'
+        parts.append(f'/{encode_path_segment(id_)}')
 
     if company_id:
-        url += f'/idCompany/{company_id}'
+        parts.append(f'/idCompany/{encode_path_segment(company_id)}')
 
-    query_params = build_query_params(**params)
-    if query_params:
-        url += f"?{query_params}"
+    if params:
+        query_params = build_query_params(**params)
+        if query_params:
+            parts.append(f"?{query_params}")
 
-    return url
+    return "".join(parts)
 
 
 def build_query_params(**params) -> str:
     """
     Build a query string from the given parameters.
+
+    Keys are converted to camelCase and values are percent-encoded. `None`
+    values are skipped.
     """
-    return "&".join([f"{camel_case(k)}={v}" for k, v in params.items() if v is not None])
+    return "&".join([f"{camel_case(k)}={encode_query_value(v)}" for k, v in params.items() if v is not None])
+
 
+def encode_query_value(value) -> str:
+    """
+    Percent-encode a query string value.
+
+    Values made only of unreserved characters, the common case for ids,
+    statuses, numbers and ISO dates, are returned without calling `quote`.
+    """
+    value = value if isinstance(value, str) else str(value)
+    if _is_safe_query_value(value):
+        return value
+    return quote(value, safe=QUERY_SAFE_CHARS)
 
+
+def encode_path_segment(value) -> str:
+    """
+    Percent-encode a value used as a single URL path segment.
+    """
+    value = value if isinstance(value, str) else str(value)
+    if _is_safe_query_value(value) and "," not in value and ":" not in value:
+        return value
+    return quote(value, safe="")
+
+
+@functools.lru_cache(maxsize=256)
 def camel_case(name: str) -> str:
     """
     Convert snake_case to camelCase.
+
+    Results are memoized since the same handful of parameter names are
+    converted on every request.
     """
     parts = name.split('_')
     return parts[0] + ''.join(x.title() for x in parts[1:])
@@ -0,0 +1,124 @@
+"""
+Benchmark of the HTTP/1.1 and HTTP/2 transports against local stub servers.
+
+Two stub servers answer every request after a fixed delay (simulating API
+latency): a threaded HTTP/1.1 server and an asyncio HTTP/2 (h2c, prior
+knowledge) server built on `h2`. The same number of concurrent requests is
+sent through `RequestsTransport` and `HTTP2Transport`, and the wall time and
+the number of TCP connections opened are reported.
+
+Requires `httpx[http2]`.
+
+Usage:
+    PYTHONPATH=. python benchmarks/bench_http2.py [requests] [concurrency] [delay_ms]
+"""
+
+import asyncio
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import h2.config
+import h2.connection
+import h2.events
+import httpx
+
+from alanube.do.transports import HTTP2Transport, RequestsTransport
+
+
+BODY = b'{"id": "123", "status": "FINISHED"}'
+
+
+def start_http1_server(delay, counters):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def setup(self):
+            counters["http1"] += 1
+            super().setup()
+
+        def do_GET(self):
+            time.sleep(delay)
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(BODY)))
+            self.end_headers()
+            self.wfile.write(BODY)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server.server_address[1]
+
+
+class H2Protocol(asyncio.Protocol):
+    def __init__(self, delay, counters):
+        self.delay = delay
+        self.counters = counters
+
+    def connection_made(self, transport):
+        self.counters["http2"] += 1
+        self.transport = transport
+        self.conn = h2.connection.H2Connection(h2.config.H2Configuration(client_side=False))
+        self.conn.initiate_connection()
+        transport.write(self.conn.data_to_send())
+
+    def data_received(self, data):
+        for event in self.conn.receive_data(data):
+            if isinstance(event, h2.events.RequestReceived):
+                asyncio.get_running_loop().call_later(self.delay, self.respond, event.stream_id)
+        self.transport.write(self.conn.data_to_send())
+
+    def respond(self, stream_id):
+        self.conn.send_headers(stream_id, [
+            (":status", "200"),
+            ("content-type", "application/json"),
+            ("content-length", str(len(BODY))),
+        ])
+        self.conn.send_data(stream_id, BODY, end_stream=True)
+        self.transport.write(self.conn.data_to_send())
+
+
+def start_http2_server(delay, counters):
+    loop = asyncio.new_event_loop()
+    server = loop.run_until_complete(
+        loop.create_server(lambda: H2Protocol(delay, counters), "127.0.0.1", 0)
+    )
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+    return server.sockets[0].getsockname()[1]
+
+
+def run(transport, url, total, concurrency):
+    headers = {"Accept": "application/json"}
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        responses = list(executor.map(lambda _: transport.request("GET", url, headers=headers), range(total)))
+    elapsed = time.perf_counter() - start
+    assert all(r.status_code == 200 and r.json()["id"] == "123" for r in responses)
+    return elapsed
+
+
+def main(total=2000, concurrency=100, delay_ms=20):
+    delay = delay_ms / 1000
+    counters = {"http1": 0, "http2": 0}
+    http1_port = start_http1_server(delay, counters)
+    http2_port = start_http2_server(delay, counters)
+
+    elapsed = run(RequestsTransport(), f"http://127.0.0.1:{http1_port}/documents", total, concurrency)
+    print(f"HTTP/1.1 (requests): {total / elapsed:8.1f} req/s, {counters['http1']} connections")
+
+    # Cleartext HTTP/2 needs prior knowledge (no ALPN), hence http1=False.
+    client = httpx.Client(http1=False, http2=True, limits=httpx.Limits(max_connections=4))
+    transport = HTTP2Transport(client=client)
+    elapsed = run(transport, f"http://127.0.0.1:{http2_port}/documents", total, concurrency)
+    transport.close()
+    print(f"HTTP/2   (httpx):    {total / elapsed:8.1f} req/s, {counters['http2']} connections")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:4]))
@@ -0,0 +1,60 @@
+"""
+Import-time benchmark of the client.
+
+Measures, in fresh interpreters, the time taken by `import alanube.do` and
+by `from alanube.do import Alanube`, and checks that neither loads
+`requests` (which is deferred until the first request). Exits with a
+non-zero status when a measurement exceeds its budget, so it can guard
+regressions in CI.
+
+Usage:
+    PYTHONPATH=. python benchmarks/bench_import.py [runs]
+"""
+
+import subprocess
+import sys
+
+
+# Budgets in milliseconds, generous enough for slow CI machines.
+CASES = {
+    "import alanube.do": ("import alanube.do", 20),
+    "from alanube.do import Alanube": ("from alanube.do import Alanube", 150),
+}
+
+SCRIPT = """
+import sys, time
+start = time.perf_counter()
+{statement}
+elapsed = time.perf_counter() - start
+print(elapsed * 1000, "urllib3" in sys.modules)
+"""
+
+
+def measure(statement, runs):
+    timings = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, "-c", SCRIPT.format(statement=statement)],
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout.split()
+        timings.append(float(output[0]))
+        if output[1] == "True":
+            raise SystemExit(f"{statement!r} loaded requests eagerly")
+    return min(timings)
+
+
+def main(runs=5):
+    failed = False
+    for name, (statement, budget) in CASES.items():
+        elapsed = measure(statement, runs)
+        status = "ok" if elapsed <= budget else "OVER BUDGET"
+        failed = failed or elapsed > budget
+        print(f"{name:<32} {elapsed:8.2f} ms (budget {budget} ms) {status}")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
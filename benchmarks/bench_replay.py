@@ -0,0 +1,44 @@
+"""
+Replay a recorded cassette against the client, with no network.
+
+Every recorded GET is issued again through `AlanubeAPI.get` from a thread
+pool, with the recorded latencies scaled by `--latency-scale`, and the
+achieved throughput is reported. Use it to compare client settings
+(concurrency, coalescing, caching) on production-shaped traffic recorded
+with `alanube.do.replay.RecordingTransport`.
+
+Usage:
+    PYTHONPATH=. python benchmarks/bench_replay.py traffic.jsonl.gz [--workers 16] [--latency-scale 1.0]
+"""
+
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from alanube.do.api import AlanubeAPI
+from alanube.do.replay import ReplayTransport, load_cassette
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("cassette")
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--latency-scale", type=float, default=1.0)
+    args = parser.parse_args()
+
+    urls = [e["request"]["url"] for e in load_cassette(args.cassette) if e["request"]["method"] == "GET"]
+    AlanubeAPI.connect(
+        "replay",
+        developer_mode=True,
+        transport=ReplayTransport(args.cassette, latency_scale=args.latency_scale),
+    )
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.workers) as executor:
+        list(executor.map(AlanubeAPI.get, urls))
+    elapsed = time.perf_counter() - start
+    print(f"{len(urls)} requests in {elapsed:.2f} s: {len(urls) / elapsed:.1f} req/s with {args.workers} workers")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Benchmark of response validation (`alanube.do.responses`).
+
+Measures the cost of a 100-document page going through
+`AlanubeAPI.process_response` and `AlanubeAPI.decode`, with and without
+`validate_responses`, and reports the overhead of the validation relative
+to the client-side handling of the page and to a full page fetch with a
+simulated round trip (`RTT_MS`). Exits with a non-zero status when the
+latter exceeds `BUDGET`.
+
+Usage:
+    PYTHONPATH=. python benchmarks/bench_responses.py [iterations]
+"""
+
+import json
+import sys
+import timeit
+
+import requests
+
+from alanube.do.api import AlanubeAPI
+from alanube.do.types import ListDocumentResponse
+
+
+# Round trip assumed for a page request; the sandbox answers in 80-300 ms.
+RTT_MS = 80.0
+
+# Maximum overhead accepted relative to a page fetch.
+BUDGET = 0.05
+
+DOCUMENT = {
+    "stampDate": "15-01-2024",
+    "status": "FINISHED",
+    "legalStatus": "ACCEPTED",
+    "companyIdentification": "101010101",
+    "trackId": "3b1b7e5c-7c1e-4c3f-9b0a-1f9f5c1d2e3f",
+    "sequenceConsumed": True,
+    "signatureDate": "15-01-2024 10:30:00",
+    "securityCode": "Ab12Cd",
+    "documentStampUrl": "https://ecf.dgii.gov.do/ConsultaTimbre?RncEmisor=101010101",
+    "xml": "https://files.alanube.co/xml/doc.xml",
+    "pdf": "https://files.alanube.co/pdf/doc.pdf",
+    "governmentResponse": {"value": [{"valor": "Aceptado", "codigo": 1}], "code": 1},
+}
+
+PAGE = json.dumps({
+    "metadata": {"current_page": 1, "limit": 100, "from": 1, "to": 100},
+    "documents": [
+        {**DOCUMENT, "id": f"doc-{i}", "documentNumber": f"E31{i:010d}"} for i in range(100)
+    ],
+}).encode()
+
+
+def handle_page():
+    response = requests.Response()
+    response.status_code = 200
+    response._content = PAGE
+    response = AlanubeAPI.process_response(response, expected_response_code=200)
+    return AlanubeAPI.decode(response, ListDocumentResponse)
+
+
+def main(iterations=2_000):
+    AlanubeAPI.connect("token", True)
+    timings = {}
+    for validate in (False, True):
+        AlanubeAPI.validate_responses = validate
+        handle_page()
+        elapsed = min(timeit.repeat(handle_page, number=iterations, repeat=5))
+        timings[validate] = elapsed / iterations * 1e3
+        print(f"{'validated' if validate else 'plain':<10} {timings[validate]:8.3f} ms/page")
+
+    overhead = timings[True] - timings[False]
+    print(f"validation overhead: {overhead:.3f} ms/page")
+    print(f"  vs client-side handling: {overhead / timings[False]:6.1%}")
+    relative = overhead / (RTT_MS + timings[False])
+    print(f"  vs page fetch (RTT {RTT_MS:.0f} ms): {relative:6.1%} (budget {BUDGET:.0%})")
+    if relative > BUDGET:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 2_000)
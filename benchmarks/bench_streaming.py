@@ -0,0 +1,86 @@
+"""
+Benchmark of the streaming decode of list pages (`alanube.do.streaming`).
+
+Decodes a 100-document page with `response.json()` and with
+`DocumentStream`, with and without a `fields` projection, and reports the
+time per page and the peak memory allocated while decoding it.
+
+Usage:
+    PYTHONPATH=. python benchmarks/bench_streaming.py [iterations]
+"""
+
+import json
+import sys
+import timeit
+import tracemalloc
+
+import requests
+
+from alanube.do.streaming import DocumentStream
+
+
+FIELDS = ("id", "status", "legalStatus", "documentNumber")
+
+DOCUMENT = {
+    "stampDate": "15-01-2024",
+    "status": "FINISHED",
+    "legalStatus": "ACCEPTED",
+    "companyIdentification": "101010101",
+    "trackId": "3b1b7e5c-7c1e-4c3f-9b0a-1f9f5c1d2e3f",
+    "sequenceConsumed": True,
+    "signatureDate": "15-01-2024 10:30:00",
+    "securityCode": "Ab12Cd",
+    "documentStampUrl": "https://ecf.dgii.gov.do/ConsultaTimbre?RncEmisor=101010101&RncComprador=131313131",
+    "xml": "https://files.alanube.co/xml/" + "a" * 200,
+    "pdf": "https://files.alanube.co/pdf/" + "b" * 200,
+    "governmentResponse": {
+        "value": [{"valor": "Aceptado", "codigo": 1, "mensajes": [{"valor": "x" * 80, "codigo": i} for i in range(5)]}],
+        "code": 1,
+    },
+}
+
+PAGE = json.dumps({
+    "metadata": {"current_page": 1, "limit": 100, "from": 1, "to": 100},
+    "documents": [{**DOCUMENT, "id": f"doc-{i}", "documentNumber": f"E31{i:010d}"} for i in range(100)],
+}).encode()
+
+
+def make_response():
+    response = requests.Response()
+    response.status_code = 200
+    response._content = PAGE
+    response.encoding = "utf-8"
+    return response
+
+
+def full():
+    return make_response().json()["documents"]
+
+
+def streamed(fields=None):
+    return list(DocumentStream(make_response(), fields=fields))
+
+
+def peak_memory(func) -> int:
+    tracemalloc.start()
+    result = func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return peak
+
+
+def main(iterations=500):
+    cases = {
+        "json()": full,
+        "stream": streamed,
+        "stream+fields": lambda: streamed(FIELDS),
+    }
+    print(f"page: {len(PAGE) / 1024:.0f} KiB, 100 documents")
+    for name, func in cases.items():
+        elapsed = min(timeit.repeat(func, number=iterations, repeat=5)) / iterations
+        print(f"{name:<14} {elapsed * 1e3:7.3f} ms/page  peak {peak_memory(func) / 1024:7.0f} KiB")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 500)
@@ -0,0 +1,83 @@
+"""
+Micro-benchmark of endpoint URL and query string construction.
+
+Compares the per-call cost of building a list endpoint URL with the current
+implementation against the previous one (properties re-evaluated on every
+access and camel_case recomputed per key).
+
+Usage:
+    PYTHONPATH=. python benchmarks/bench_urls.py [iterations]
+"""
+
+import sys
+import timeit
+from dataclasses import dataclass
+
+from alanube.do.api import APIConfig
+from alanube.utils import build_url
+
+
+@dataclass(frozen=True)
+class LegacyAPIConfig:
+    token: str
+    developer_mode: bool
+    api_version: str = "v1"
+
+    @property
+    def base_url(self):
+        if self.developer_mode:
+            return 'https://sandbox.alanube.co/dom'
+        return 'https://api.alanube.co/dom'
+
+    @property
+    def api_url(self):
+        return f"{self.base_url}/{self.api_version}"
+
+    @property
+    def endpoint_fiscal_invoices(self):
+        return f"{self.api_url}/fiscal-invoices"
+
+    @property
+    def endpoint_reports_companies_emitted_documents(self):
+        return f"{self.api_url}/companies/{{id}}/emitted-documents"
+
+    @property
+    def endpoint_reports_companies_emitted_documents_monthly(self):
+        return f"{self.endpoint_reports_companies_emitted_documents}/monthly"
+
+
+def legacy_camel_case(name):
+    parts = name.split('_')
+    return parts[0] + ''.join(x.title() for x in parts[1:])
+
+
+def legacy_build_url(url, company_id=None, id_=None, **params):
+    if id_:
+        url += f'/{id_}'
+    if company_id:
+        url += f'/idCompany/{company_id}'
+    query_params = "&".join([f"{legacy_camel_case(k)}={v}" for k, v in params.items() if v is not None])
+    if query_params:
+        url += f"?{query_params}"
+    return url
+
+
+PARAMS = dict(status="FINISHED", legal_status="ACCEPTED,REJECTED", document_number=None,
+              limit=25, page=3, start="2024-01-01", end="2024-01-31")
+
+
+def main(iterations=200_000):
+    legacy, current = LegacyAPIConfig("token", True), APIConfig("token", True)
+    cases = {
+        "list url (legacy)": lambda: legacy_build_url(legacy.endpoint_fiscal_invoices, "company", **PARAMS),
+        "list url (current)": lambda: build_url(current.endpoint_fiscal_invoices, "company", **PARAMS),
+        "report url (legacy)": lambda: legacy.endpoint_reports_companies_emitted_documents_monthly.format(id="c"),
+        "report url (current)": lambda: current.endpoint_reports_companies_emitted_documents_monthly.format(id="c"),
+    }
+    for name, func in cases.items():
+        elapsed = min(timeit.repeat(func, number=iterations, repeat=3))
+        print(f"{name:<22} {elapsed / iterations * 1e6:8.3f} us/call")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000)